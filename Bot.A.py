@@ -2,6 +2,12 @@ import websocket
 import json
 import time
 
+from frames import classify
+from orders import buy_parameters
+from outbound import Outbound, Template
+from registry import Registry
+from supervisor import Supervisor
+
 """
 Deriv Digits Bot
 - Trades four contracts simultaneously: Under 3, Under 6, Over 5, Under 7
@@ -15,10 +21,22 @@ API_TOKEN = "PUT TOKEN HERE"
 SYMBOL = "R_10"
 DURATION_TICKS = 1
 TRADE_COOLDOWN_SEC = 1.0  # seconds
+BUY_MAX_DELAY = 0.5       # seconds the basket may wait for the rate limiter before it is skipped
+CONTRACT_TTL = 300.0      # seconds a contract with no result is tracked before it is dropped
 # ==========================
 
-open_contracts = {}
+
+def _untracked(contract_id, longcode):
+    print(f"[WARN] no result for #{contract_id} ({longcode}) after {CONTRACT_TTL:.0f}s; no longer tracked")
+
+
+# contract_id -> longcode; capped so contracts whose result never arrives cannot pile up
+open_contracts = Registry(CONTRACT_TTL, 1000, on_evict=_untracked)
 last_trade_time = 0.0
+current_ws = None   # socket of the live connection, replaced on reconnect
+# every send goes through one rate-limited queue: buys first, per-class token buckets
+outbound = Outbound(lambda raw: current_ws.send(raw))
+POC_SUBSCRIBE = Template({"proposal_open_contract": 1, "contract_id": 0, "subscribe": 1}, "contract_id")
 
 DIGIT_CONTRACTS = [
     {"type": "DIGITUNDER", "barrier": 3, "stake": 1.00},
@@ -26,46 +44,49 @@ DIGIT_CONTRACTS = [
     {"type": "DIGITOVER",  "barrier": 5, "stake": 0.75},
     {"type": "DIGITUNDER", "barrier": 7, "stake": 1.25}
 ]
+# the legs never change: serialize their buys once instead of on every tick
+BUY_PAYLOADS = [json.dumps(buy_parameters(c["type"], SYMBOL, c["stake"], DURATION_TICKS, c["barrier"]))
+                for c in DIGIT_CONTRACTS]
 
 
-def buy_contract(ws: websocket.WebSocketApp, contract_type: str, barrier: int, stake: float):
-    payload = {
-        "buy": 1,
-        "price": stake,
-        "parameters": {
-            "amount": stake,
-            "basis": "stake",
-            "contract_type": contract_type,
-            "barrier": str(barrier),
-            "currency": "USD",
-            "duration": DURATION_TICKS,
-            "duration_unit": "t",
-            "symbol": SYMBOL
-        }
-    }
-    ws.send(json.dumps(payload))
-    print(f"[TRADE] Sent {contract_type} (barrier {barrier}) @ ${stake:.2f}")
+def buy_contracts():
+    """Queue all four legs as one basket: every leg is bought or none is."""
+    outbound.submit_basket(BUY_PAYLOADS, "buy", max_delay=BUY_MAX_DELAY)
+    for contract in DIGIT_CONTRACTS:
+        print(f"[TRADE] Queued {contract['type']} (barrier {contract['barrier']}) @ ${contract['stake']:.2f}")
 
 
 def on_message(ws, message):
     global last_trade_time
 
-    data = json.loads(message)
-    msg_type = data.get("msg_type")
+    msg_type, data = classify(message)
+    if data is None:
+        return
 
     # --- Authorization ---
     if msg_type == "authorize":
         print(f"[AUTHORIZED] Logged in.")
-        ws.send(json.dumps({"ticks": SYMBOL}))
+        outbound.submit({"website_status": 1})   # the account's real rate limits
+        outbound.submit({"ticks": SYMBOL, "subscribe": 1})
         print("[BOT] Subscribed to tick stream.")
+        # contracts bought before a reconnect lost their streams with the old socket
+        for contract_id in open_contracts:
+            outbound.submit_raw(POC_SUBSCRIBE.render(contract_id), "proposal_open_contract")
+
+    elif msg_type == "website_status":
+        limits = data.get("website_status", {}).get("api_call_limits")
+        if limits:
+            outbound.apply_limits(limits)
+            print("[BOT] Rate limits from server:", {k: (round(b.rate, 2), b.burst) for k, b in outbound.buckets.items()})
 
     # --- Tick stream handler ---
     elif msg_type == "tick":
         now = time.time()
         if now - last_trade_time >= TRADE_COOLDOWN_SEC:
-            for contract in DIGIT_CONTRACTS:
-                buy_contract(ws, contract["type"], contract["barrier"], contract["stake"])
+            buy_contracts()
             last_trade_time = now
+        outbound.maybe_report()
+        open_contracts.sweep()
 
     # --- Buy confirmation ---
     elif msg_type == "buy":
@@ -75,11 +96,7 @@ def on_message(ws, message):
         if contract_id:
             open_contracts[contract_id] = longcode
             print(f"[BOUGHT] #{contract_id} | {longcode}")
-            ws.send(json.dumps({
-                "proposal_open_contract": 1,
-                "contract_id": contract_id,
-                "subscribe": 1
-            }))
+            outbound.submit_raw(POC_SUBSCRIBE.render(contract_id), "proposal_open_contract")
         else:
             print("[ERROR] No contract_id returned in buy response.")
 
@@ -96,9 +113,9 @@ def on_message(ws, message):
             print(f"[RESULT] {result} | {contract_desc} | Profit: ${profit:.2f}")
 
             # Forget stream
-            ws.send(json.dumps({
-                "forget": poc.get("subscription", {}).get("id")
-            }))
+            sub_id = (data.get("subscription") or {}).get("id")
+            if sub_id:
+                outbound.submit({"forget": sub_id})
             open_contracts.pop(contract_id, None)
 
     # --- Error handler ---
@@ -108,6 +125,8 @@ def on_message(ws, message):
 
 
 def on_open(ws):
+    global current_ws
+    current_ws = ws
     print("[CONNECTED] Authorizing...")
     ws.send(json.dumps({"authorize": API_TOKEN}))
 
@@ -121,11 +140,11 @@ def on_close(ws, close_status_code, close_msg):
 
 
 if __name__ == "__main__":
-    ws = websocket.WebSocketApp(
+    # reopened with backoff whenever the socket drops; on_open re-authorizes
+    Supervisor(lambda: websocket.WebSocketApp(
         f"wss://ws.derivws.com/websockets/v3?app_id={DERIV_APP_ID}",
         on_open=on_open,
         on_message=on_message,
         on_error=on_error,
         on_close=on_close
-    )
-    ws.run_forever(ping_interval=30)
+    ), ping_interval=30).run()
@@ -3,10 +3,8 @@
 # pip install websocket-client
 
 
-import json, time, uuid, threading, queue, csv, sys, random
-from collections import deque
-from dataclasses import dataclass
-from typing import Deque, Optional
+import json, os, time, threading, sys, random
+from typing import List, Tuple
 
 try:
     import websocket
@@ -14,6 +12,19 @@ except Exception:
     print("pip install websocket-client")
     sys.exit(1)
 
+from coljournal import open_journal
+from correlator import RequestCorrelator
+from frames import classify
+from journal import JournalWriter
+from lastdigit import DigitDecoder
+from latency import LatencyRecorder
+from orders import OrderRouter
+from proposal_book import ProposalBook, book_key
+from settlement import SettlementTracker
+from strategies import Candidate, DigitWindow, Strategy
+from supervisor import Backoff, Supervisor, gap_request, gap_ticks
+from tickmailbox import TickMailbox
+
 #CONFIG 
 API_TOKEN = "Asdfg"   # put demo token here
 SYMBOL = "R_10"
@@ -24,116 +35,56 @@ WARMUP = 10
 Z_THRESHOLD = 1.64
 MIN_EDGE = 0.01
 MIN_PAYOUT_RATIO = 0.9
+PROPOSAL_FANOUT = True      # price every qualifying (side, threshold) in one batch
+FANOUT_DEADLINE = 0.8
+USE_PROPOSAL_STREAMS = True # live payout table from "subscribe": 1 proposal streams
+PROPOSAL_MAX_AGE = 2.0
+DIRECT_BUY = True           # buy legs with a known payout straight away ("buy": 1 + parameters)
+PAYOUT_MAX_AGE = 30.0       # seconds a quoted payout is trusted for a direct buy
+SETTLEMENT_MODE = "all"     # one shared contract stream ("each": one per contract, auto-forget)
+MAX_OPEN_CONTRACTS = 5      # contracts in flight before the loop stops buying
+SETTLE_TIMEOUT = 90.0
 PING_INTERVAL = 30
+RECONNECT_MAX_DELAY = 30.0  # seconds; reconnect backoff doubles from 1s up to this
+TICK_MAILBOX = "latest"     # decide on the newest tick only ("fifo": every tick in order)
+MAX_TICK_AGE = 1.0          # seconds; decisions on an older tick are skipped
+LATENCY_REPORT_SEC = 60.0   # p50/p99/p999 per stage printed this often
+LATENCY_DUMP = "latency_zscore.json"  # same numbers plus raw buckets ("" disables it)
 CSV_LOG = "trades_log.csv"
+TRADE_COLUMNS_DIR = "journal/zscore"  # typed .npz trade journal ("" disables it)
 APP_ID = "Enter ID Here"
-WS_URL = f"wss://ws.derivws.com/websockets/v3?app_id={APP_ID}"
-
-
-#Functions
-def last_digit_from_quote(q: float) -> Optional[int]:
-    s = f"{q:.2f}"
-    for ch in reversed(s):
-        if ch.isdigit(): return int(ch)
-    return None
-
-def z_score(p_hat: float, p0: float, n: int) -> float:
-    if n <= 0: return 0.0
-    var = p0 * (1 - p0) / n
-    if var <= 0: return 0.0
-    return (p_hat - p0) / (var ** 0.5)
-
-class DigitWindow:
-    def __init__(self, size:int):
-        self.size = size
-        self.buf: Deque[int] = deque(maxlen=size)
-        self.counts = [0]*10
-        self.n = 0
-    def add(self,d:int):
-        if len(self.buf)==self.size:
-            old = self.buf[0]; self.counts[old]-=1
-        self.buf.append(d); self.counts[d]+=1; self.n=len(self.buf)
-    def freq(self): return self.counts, self.n
-
-@dataclass
-class Candidate:
-    side: str
-    threshold:int
-    p_hat:float
-    p0:float
-    z:float
-    edge:float
-    fair_b:float
-    fair_ev:float
-
-class Strategy:
-    def __init__(self, window: DigitWindow):
-        self.window = window
-    def find_best(self) -> Optional[Candidate]:
-        counts, n = self.window.freq()
-        if n < WARMUP: return None
-        freq = [c / n for c in counts]
-        pref=[0.0]*11; s=0.0
-        for i in range(10):
-            s+=freq[i]; pref[i+1]=s
-        best=None
-        for t in range(0,9):
-            p_over_hat = pref[10] - pref[t+1]
-            p_over0 = (9-t)/10.0
-            z_over = z_score(p_over_hat,p_over0,n)
-            edge_over = p_over_hat - p_over0
-            fair_b_over = (1.0/p_over_hat - 1.0) if p_over_hat>0 else 0.0
-            fair_ev_over = (p_over_hat*fair_b_over) - (1-p_over_hat)
+WS_URL = os.environ.get("DERIV_WS_URL") or f"wss://ws.derivws.com/websockets/v3?app_id={APP_ID}"  # ws://127.0.0.1:8765 for mockderiv.py
 
-            p_under_hat = pref[t]
-            p_under0 = t/10.0
-            z_under = z_score(p_under_hat,p_under0,n)
-            edge_under = p_under_hat - p_under0
-            fair_b_under = (1.0/p_under_hat - 1.0) if p_under_hat>0 else 0.0
-            fair_ev_under = (p_under_hat*fair_b_under) - (1-p_under_hat)
-
-            for side,p_hat,p0,z,edge,fair_b,fair_ev in [
-                ("over",p_over_hat,p_over0,z_over,edge_over,fair_b_over,fair_ev_over),
-                ("under",p_under_hat,p_under0,z_under,edge_under,fair_b_under,fair_ev_under),
-            ]:
-                if edge < MIN_EDGE: continue
-                if z < Z_THRESHOLD: continue
-                if fair_ev <= 0: continue
-                cand = Candidate(side,t,p_hat,p0,z,edge,fair_b,fair_ev)
-                if best is None or cand.fair_ev > best.fair_ev: best=cand
-        return best
 
 class Trader:
     def __init__(self):
         self.ws = None
         self.dwin = DigitWindow(WINDOW)
-        self.strategy = Strategy(self.dwin)
+        self.digit = DigitDecoder(SYMBOL)
+        self.strategy = Strategy(self.dwin, WARMUP, Z_THRESHOLD, MIN_EDGE)
         self.auth = False
-        self.proposal_waiters = {}
-        self.buy_q = queue.Queue()
-        self.pending_contracts = {}
+        self.requests = RequestCorrelator()
+        self.book = ProposalBook(self._send, SYMBOL, max_age=PROPOSAL_MAX_AGE)
+        self.settlements = SettlementTracker(self._send, SETTLEMENT_MODE, SETTLE_TIMEOUT)
+        self.router = OrderRouter(self._request, SYMBOL, self.book if USE_PROPOSAL_STREAMS else None,
+                                  payout_max_age=PAYOUT_MAX_AGE)
         self.trade_no = 0
         self.wins = 0
         self.losses = 0
         self.last_trade_ts = 0.0
-        self.tick_queue = queue.Queue(maxsize=200)
-        self._init_csv()
-
-    def _init_csv(self):
-        try:
-            with open(CSV_LOG,"a",newline="") as f:
-                w=csv.writer(f)
-                if f.tell()==0:
-                    w.writerow(["ts","trade_no","side","threshold","dur_ticks","p_hat","z","edge","payout","payout_ratio","stake","profit","wins","losses"])
-        except Exception as e:
-            print("CSV init err:",e)
+        self.tick_queue = TickMailbox(TICK_MAILBOX, maxsize=200)
+        self.lat = LatencyRecorder(LATENCY_REPORT_SEC, LATENCY_DUMP)
+        self.supervisor = None
+        self.last_epoch = None
+        self._gap = None    # last epoch before the drop, until the missed ticks are backfilled
+        self._held = []     # (epoch, digit) of live ticks that arrive before the backfill
+        self._pinging = False
+        # rows are written by the journal thread, never on the decision thread
+        self.cols = open_journal(TRADE_COLUMNS_DIR)
+        self.journal = JournalWriter(CSV_LOG, ["ts","trade_no","side","threshold","dur_ticks","p_hat","z","edge","payout","payout_ratio","stake","profit","wins","losses"])
 
     def _log(self,row):
-        try:
-            with open(CSV_LOG,"a",newline="") as f:
-                w=csv.writer(f); w.writerow(row)
-        except:
-            pass
+        self.journal.write(row)
 
     def on_open(self, ws):
         print("[WS] open")
@@ -142,56 +93,83 @@ class Trader:
             self.stop()
             return
         ws.send(json.dumps({"authorize": API_TOKEN}))
-        threading.Thread(target=self._pinger, daemon=True).start()
+        if not self._pinging:
+            self._pinging = True
+            threading.Thread(target=self._pinger, daemon=True).start()
+
+    def _on_down(self, reason):
+        # runs on the supervisor thread between run_forever returning and the next connect
+        self.auth = False
+        failed = self.requests.fail_all("connection lost")
+        if self.last_epoch is not None and self._gap is None:
+            self._gap = self.last_epoch
+        print(f"[WS] down ({reason}); failed {failed} in-flight requests")
+
+    def _backfill(self, history):
+        # on the socket thread, like every other push into dwin; the held live ticks go in
+        # after the gap so the window stays in epoch order
+        since, held = self._gap, self._held
+        self._gap, self._held = None, []
+        ticks = gap_ticks(history, since)
+        for _, quote in ticks:
+            self.dwin.add(self.digit(quote))
+        last = ticks[-1][0] if ticks else since
+        for epoch, d in held:
+            if not epoch or epoch > last: self.dwin.add(d)
+        if ticks: self.last_epoch = max(self.last_epoch or 0, last)
+        print(f"[WS] backfilled {len(ticks)} ticks missed while down")
 
     def on_message(self, ws, raw):
-        try: data=json.loads(raw)
-        except Exception: return
+        msg, data = classify(raw)
+        if msg == "tick":
+            q=data.get("quote")
+            if q is None: return
+            try: quote=float(q)
+            except: return
+            epoch = int(data.get("epoch") or 0)
+            if epoch:
+                if self.last_epoch is not None and epoch <= self.last_epoch: return   # already backfilled
+                self.last_epoch = epoch
+            self.digit.observe(data)
+            d = self.digit(quote)
+            if self._gap is not None: self._held.append((epoch, d))   # goes in after the backfill
+            else: self.dwin.add(d)
+            self.tick_queue.put(quote)
+            return
+        if data is None: return
         if "error" in data and data["error"]:
             print("[WS][ERROR]",data["error"])
+            if data.get("msg_type") == "history" and self._gap is not None:
+                print("[WS] backfill failed; the window keeps the gap")
+                self._backfill({})
+                return
+            key = RequestCorrelator.key_of(data)
+            if key is not None: self.requests.fail(key, data["error"])
+            else: self.book.on_error(data)
             return
-        msg = data.get("msg_type") or ("tick" if "tick" in data else None)
         if msg == "authorize":
             print("[WS] authorized")
             self.auth=True
+            # the missed ticks are asked for before the live stream restarts
+            if self._gap is not None: self._send(gap_request(SYMBOL, self._gap))
             ws.send(json.dumps({"ticks": SYMBOL, "subscribe": 1}))
+            self.settlements.start()
+            if self.book.resubscribe(): print("[WS] proposal streams reopened")
             print("[WS] subscribed", SYMBOL)
             return
-        if "tick" in data:
-            tick=data["tick"]; q=tick.get("quote")
-            if q is None: return
-            try: quote=float(q)
-            except: return
-            d = last_digit_from_quote(quote)
-            if d is None: return
-            self.dwin.add(d)
-            try: self.tick_queue.put_nowait(quote)
-            except: pass
+        if msg == "history":
+            if self._gap is not None: self._backfill(data.get("history") or {})
             return
-        if "proposal" in data:
-            passth = data.get("echo_req", {}).get("passthrough") or data.get("passthrough")
-            tag = passth.get("tag") if isinstance(passth,dict) else None
-            if tag and tag in self.proposal_waiters:
-                entry = self.proposal_waiters.pop(tag)
-                entry['proposal'] = data['proposal']
-                entry['event'].set()
-            else:
-                print("[DEBUG] Unmatched proposal:", data.get("proposal",{}).get("id"))
+        if "proposal" in data and self.book.on_frame(data):
             return
-        if "buy" in data:
-            self.buy_q.put(data["buy"])
+        if "proposal" in data or "buy" in data:
+            key = RequestCorrelator.key_of(data)
+            body = data.get("proposal") or data.get("buy")
+            if key is None or not self.requests.resolve(key, body):
+                print("[DEBUG] Unmatched reply:", data.get("msg_type"), key)
             return
         if "proposal_open_contract" in data:
-            poc = data["proposal_open_contract"]
-            cid = str(poc.get("contract_id") or poc.get("id") or poc.get("identifier"))
-            profit = None
-            if "profit" in poc:
-                try: profit=float(poc["profit"])
-                except: profit=None
-            sub_id = None
-            if "subscription" in data and isinstance(data["subscription"], dict):
-                sub_id = data["subscription"].get("id")
-            self.pending_contracts[cid] = {"update":poc,"profit":profit,"sub_id":sub_id}
+            self.settlements.on_frame(data)
             return
 
     def on_error(self, ws, err):
@@ -200,6 +178,10 @@ class Trader:
     def on_close(self, ws, code, reason):
         print("[WS] closed",code,reason)
 
+    def _send(self, payload):
+        try: self.ws.send(json.dumps(payload))
+        except Exception as e: print("[ERR] send:", e)
+
     def _pinger(self):
         while True:
             try:
@@ -207,9 +189,25 @@ class Trader:
             except: pass
             time.sleep(PING_INTERVAL)
 
-    def send_proposal_and_wait(self, side, threshold, stake, duration_ticks, timeout=5.0):
-        tag = uuid.uuid4().hex
-        payload = {
+    def _send_request(self, payload, what):
+        req_id = self.requests.next_req_id()
+        payload["req_id"] = req_id
+        waiter = self.requests.register(req_id)
+        try:
+            self.ws.send(json.dumps(payload))
+        except Exception as e:
+            print(f"[ERR] send {what}:", e)
+            self.requests.cancel(req_id)
+            return None
+        return waiter
+
+    def _request(self, payload, timeout, what="request"):
+        waiter = self._send_request(payload, what)
+        if waiter is None: return None
+        return self.requests.wait(waiter, timeout)
+
+    def _proposal_payload(self, side, threshold, stake, duration_ticks):
+        return {
             "proposal": 1,
             "amount": float(stake),
             "basis": "stake",
@@ -219,98 +217,162 @@ class Trader:
             "duration_unit": "t",
             "symbol": SYMBOL,
             "barrier": str(threshold),
-            "passthrough": {"tag": tag,"side":side,"threshold":threshold,"duration":duration_ticks}
         }
-        waiter = {"event": threading.Event(), "proposal": None}
-        self.proposal_waiters[tag] = waiter
-        try:
-            self.ws.send(json.dumps(payload))
-        except Exception as e:
-            print("[ERR] send proposal:", e)
-            self.proposal_waiters.pop(tag, None)
-            return None
-        ok = waiter['event'].wait(timeout)
-        if not ok:
-            self.proposal_waiters.pop(tag, None)
-            return None
-        return waiter['proposal']
 
-    def buy_and_wait(self, proposal, stake, timeout=6.0):
-        pid = proposal.get("id") or proposal.get("proposal_id")
-        if not pid: return None
-        buy_req = {"buy": pid, "price": float(stake)}
-        try: self.ws.send(json.dumps(buy_req))
-        except Exception as e: print("[ERR] send buy:", e); return None
-        try:
-            buy = self.buy_q.get(timeout=timeout)
-            cid = buy.get("contract_id")
-            return str(cid) if cid else None
-        except queue.Empty: return None
+    def _book_key(self, side, threshold, stake, duration_ticks):
+        return book_key("DIGITOVER" if side=="over" else "DIGITUNDER", threshold, duration_ticks, stake)
 
-    def await_settlement(self, contract_id, timeout=90.0):
-        try: self.ws.send(json.dumps({"proposal_open_contract":1,"contract_id":contract_id,"subscribe":1}))
-        except: pass
-        deadline = time.time() + timeout
-        profit = None; sub_id = None
-        while time.time()<deadline:
-            info = self.pending_contracts.get(str(contract_id))
-            if info and "profit" in info and info["profit"] is not None:
-                profit = info["profit"]
-                sub_id = info.get("sub_id")
-                break
-            time.sleep(0.1)
-        if sub_id:
-            try: self.ws.send(json.dumps({"forget": sub_id}))
-            except: pass
-        self.pending_contracts.pop(str(contract_id),None)
-        return profit
+    def send_proposal_and_wait(self, side, threshold, stake, duration_ticks, timeout=5.0):
+        if USE_PROPOSAL_STREAMS:
+            key = self._book_key(side, threshold, stake, duration_ticks)
+            self.book.ensure(key)
+            prop = self.book.take(key)
+            if prop is not None: return prop
+        waiter = self._send_request(self._proposal_payload(side, threshold, stake, duration_ticks), "proposal")
+        if waiter is None: return None
+        return self.requests.wait(waiter, timeout)
+
+    def scan_proposals(self, cands, stake, duration_ticks, timeout=FANOUT_DEADLINE) -> List[Tuple[Candidate, dict]]:
+        # all legs go out back-to-back over the one socket, answers are collected against one deadline
+        legs = {}; out = []
+        for cand in cands:
+            if USE_PROPOSAL_STREAMS:
+                key = self._book_key(cand.side, cand.threshold, stake, duration_ticks)
+                self.book.ensure(key)
+                prop = self.book.get(key)
+                if prop is not None: out.append((cand, prop)); continue
+            w = self._send_request(self._proposal_payload(cand.side, cand.threshold, stake, duration_ticks), "proposal")
+            if w is not None: legs[w.key] = (w, cand)
+        out += [(legs[w.key][1], w.result) for w in self.requests.wait_all([w for w,_ in legs.values()], timeout)]
+        for cand, prop in out:
+            self.router.note(self._book_key(cand.side, cand.threshold, stake, duration_ticks), prop)
+        return out
+
+    def cached_quotes(self, cands, stake, duration_ticks) -> List[Tuple[Candidate, dict]]:
+        # payouts remembered from earlier quotes: no pricing round trip at all
+        out = []
+        for cand in cands:
+            payout = self.router.payout(self._book_key(cand.side, cand.threshold, stake, duration_ticks))
+            if payout is not None: out.append((cand, {"payout": payout}))
+        return out
+
+    def pick(self, quotes, stake):
+        """Best (cand, prop, payout, plat_ev, payout_ratio) by platform EV, None if no leg qualifies."""
+        best = None
+        for cand, prop in quotes:
+            payout, plat_ev, payout_ratio = self.platform_ev(cand, prop, stake)
+            if payout_ratio < MIN_PAYOUT_RATIO or plat_ev <= 0: continue
+            if best is None or plat_ev > best[3]: best = (cand, prop, payout, plat_ev, payout_ratio)
+        return best
+
+    @staticmethod
+    def platform_ev(cand, prop, stake):
+        payout = float(prop.get("payout",0))
+        plat_b = (payout-stake)/stake
+        plat_ev = (cand.p_hat*plat_b)-(1-cand.p_hat)
+        fair_payout = stake / max(1e-12,cand.p_hat)
+        payout_ratio = payout / fair_payout if fair_payout>0 else 0.0
+        return payout, plat_ev, payout_ratio
+
+    def _on_settled(self, contract):
+        # runs on the socket thread as soon as the contract is sold
+        cand, duration, stake, payout, payout_ratio, plat_ev, tl = contract.meta
+        profit = contract.profit
+        if profit is None: print(f"[WARN] no settlement for {contract.contract_id}"); return
+        tl.mark("settle", contract.done_at)
+        self.trade_no +=1
+        if profit>0: self.wins+=1
+        else: self.losses+=1
+        print(f"[TRADE {self.trade_no}] {cand.side.upper()}>{cand.threshold} dur={duration}t stake={stake} p_hat={cand.p_hat:.4f} z={cand.z:.2f} edge={cand.edge:.4f} payout={payout:.2f} profit={profit:+.2f} wins={self.wins} losses={self.losses}")
+        self._log([int(time.time()),self.trade_no,cand.side,cand.threshold,duration,f"{cand.p_hat:.6f}",f"{cand.z:.4f}",f"{cand.edge:.6f}",f"{payout:.4f}",f"{payout_ratio:.4f}",stake,profit,self.wins,self.losses])
+        if self.cols: self.cols.write({"ts":time.time(),"side":cand.side,"threshold":cand.threshold,"stake":stake,"payout":payout,
+                                       "profit":profit,"p_hat":cand.p_hat,"z":cand.z,"ev":plat_ev})
 
     def main_loop(self):
         while True:
-            try: _ = self.tick_queue.get(timeout=2.0)
-            except queue.Empty: continue
+            item = self.tick_queue.get(timeout=2.0)
+            if item is None: continue
+            t_tick, _ = item
+            self.lat.maybe_report()
             if not self.auth: continue
             if time.time() - self.last_trade_ts < 0.25: continue
-            cand = self.strategy.find_best()
-            if cand is None: continue
+            self.settlements.expire()
+            if self.settlements.in_flight() >= MAX_OPEN_CONTRACTS: continue
+            if self.tick_queue.expired(t_tick, MAX_TICK_AGE): continue
             duration = random.choice(DURATION_CHOICES)
             stake = STAKE
-            prop = self.send_proposal_and_wait(cand.side, cand.threshold, stake, duration, timeout=5.0)
-            if not prop: continue
-            payout = float(prop.get("payout",0))
-            plat_b = (payout-stake)/stake
-            plat_ev = (cand.p_hat*plat_b)-(1-cand.p_hat)
-            fair_payout = stake / max(1e-12,cand.p_hat)
-            payout_ratio = payout / fair_payout if fair_payout>0 else 0.0
-            if payout_ratio < MIN_PAYOUT_RATIO: continue
-            if plat_ev <=0: continue
-            cid = self.buy_and_wait(prop, stake, timeout=6.0)
+            # stages: tick receipt -> dequeued (tick_age) -> eval -> proposal -> buy -> settle
+            tl = self.lat.timeline(SYMBOL, "zscore", t_tick)
+            tl.mark("tick_age")
+            if PROPOSAL_FANOUT:
+                # rank every qualifying leg by the platform EV of its real quote
+                cands = self.strategy.candidates()
+                tl.mark("eval")
+                if not cands: continue
+                best = self.pick(self.cached_quotes(cands, stake, duration), stake) if DIRECT_BUY else None
+                if best is None: best = self.pick(self.scan_proposals(cands, stake, duration), stake)
+                tl.mark("proposal")
+                if best is None: continue
+                cand, prop, payout, plat_ev, payout_ratio = best
+            else:
+                cand = self.strategy.find_best()
+                tl.mark("eval")
+                if cand is None: continue
+                key = self._book_key(cand.side, cand.threshold, stake, duration)
+                payout = self.router.payout(key) if DIRECT_BUY else None
+                if payout is not None: prop = {"payout": payout}
+                else:
+                    prop = self.send_proposal_and_wait(cand.side, cand.threshold, stake, duration, timeout=5.0)
+                    self.router.note(key, prop)
+                tl.mark("proposal")
+                if not prop: continue
+                payout, plat_ev, payout_ratio = self.platform_ev(cand, prop, stake)
+                if payout_ratio < MIN_PAYOUT_RATIO: continue
+                if plat_ev <=0: continue
+            if self.tick_queue.expired(t_tick, MAX_TICK_AGE):
+                print("[SKIP] tick went stale while pricing"); continue
+            key = self._book_key(cand.side, cand.threshold, stake, duration)
+            if USE_PROPOSAL_STREAMS:
+                prop = self.book.take(key) or prop
+            # a fresh proposal id if there is one, else a direct buy guarded at the break-even stake
+            cid = self.router.submit(key, cand.p_hat, prop, timeout=6.0)
+            tl.mark("buy")
             if not cid: print("[WARN] buy timed out/no response"); continue
-            profit = self.await_settlement(cid, timeout=max(20,duration*20))
-            if profit is None: print(f"[WARN] no settlement for {cid}"); continue
-            self.trade_no +=1
-            if profit>0: self.wins+=1
-            else: self.losses+=1
+            tl.total("tick_to_buy")
+            # settlement comes back through _on_settled; keep trading meanwhile
+            self.settlements.track(cid, self._on_settled, (cand, duration, stake, payout, payout_ratio, plat_ev, tl))
             self.last_trade_ts=time.time()
-            print(f"[TRADE {self.trade_no}] {cand.side.upper()}>{cand.threshold} dur={duration}t stake={stake} p_hat={cand.p_hat:.4f} z={cand.z:.2f} edge={cand.edge:.4f} payout={payout:.2f} profit={profit:+.2f} wins={self.wins} losses={self.losses}")
-            self._log([int(time.time()),self.trade_no,cand.side,cand.threshold,duration,f"{cand.p_hat:.6f}",f"{cand.z:.4f}",f"{cand.edge:.6f}",f"{payout:.4f}",f"{payout_ratio:.4f}",stake,profit,self.wins,self.losses])
 
     def start(self):
-        def run_ws():
+        def make_ws():
             self.ws = websocket.WebSocketApp(WS_URL,on_open=self.on_open,on_message=self.on_message,on_error=self.on_error,on_close=self.on_close)
-            self.ws.run_forever(ping_interval=25,ping_timeout=10)
-        threading.Thread(target=run_ws,daemon=True).start()
+            return self.ws
+        # reconnects with backoff; on_open/authorize resubscribe on every new socket
+        self.supervisor = Supervisor(make_ws, self._on_down, Backoff(maximum=RECONNECT_MAX_DELAY), ping_interval=25, ping_timeout=10)
+        self.supervisor.start()
         self.main_loop_thread = threading.Thread(target=self.main_loop,daemon=True)
         self.main_loop_thread.start()
 
     def stop(self):
+        try:
+            if self.ws: self.book.forget_all(); self.settlements.forget_all()
+        except: pass
         try:
             if self.ws: self.ws.send(json.dumps({"ticks": SYMBOL, "subscribe": 0}))
         except: pass
+        if self.supervisor: self.supervisor.stop()
         try:
             if self.ws: self.ws.close()
         except: pass
+        self.journal.close()
+        if self.cols: self.cols.close()
         print(f"Stopped. trades={self.trade_no} wins={self.wins} losses={self.losses}")
+        print("[TICKS]", self.tick_queue.summary())
+        if self.supervisor: print("[WS]", self.supervisor.summary())
+        print("[ORDERS]", self.router.summary())
+        print("[LATENCY]\n" + self.lat.report())
+        try: self.lat.dump()
+        except OSError as e: print("[LATENCY] dump failed:", e)
 
 # -------------- RUN --------------
 if __name__=="__main__":
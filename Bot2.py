@@ -1,8 +1,14 @@
 import websocket
 import json
 import time
-import random
-from collections import deque
+
+from digitstats import DigitStats
+from frames import classify
+from lastdigit import DigitDecoder
+from orders import buy_parameters
+from staking import martingale_stake
+from strategies import inverse_frequency_digit
+from supervisor import Supervisor
 
 #USER CONFIG
 DERIV_APP_ID = "PUT ID HERE"
@@ -18,77 +24,49 @@ RECENT_TICKS = 50               # how many ticks to track for probability
 balance = 0.0
 last_trade_won = True
 current_stake = STAKE
-recent_digits = deque(maxlen=RECENT_TICKS)
+recent_digits = DigitStats((RECENT_TICKS,))
+digit_decoder = DigitDecoder(SYMBOL)
 
 def weighted_stake(last_win, last_stake):
     """Adjust stake based on win/loss using weighted recovery."""
-    if last_win:
-        return STAKE
-    else:
-        # stake increase
-        return min(last_stake * LOSS_RECOVERY_MULTIPLIER, MAX_STAKE)
+    return martingale_stake(last_win, last_stake, STAKE, LOSS_RECOVERY_MULTIPLIER, MAX_STAKE)
 
 def select_digit_probability():
     """Choose a digit based on inverse frequency (1-8)."""
-    if len(recent_digits) < 5:
-        # not enough data, pick random
-        return random.randint(1, 8)
-
-    freq = {d: recent_digits.count(d) for d in range(1, 9)}
-    max_freq = max(freq.values())
-    weights = {d: max_freq - freq[d] + 1 for d in freq}  # inverse frequency weight
-
-    # Weighted random selection
-    digits = list(weights.keys())
-    probs = [weights[d] for d in digits]
-    total = sum(probs)
-    probs = [p / total for p in probs]
-    return random.choices(digits, probs)[0]
+    return inverse_frequency_digit(recent_digits.counts(RECENT_TICKS), len(recent_digits))
 
 def on_message(ws, message):
     global balance, last_trade_won, current_stake
 
-    data = json.loads(message)
+    msg, data = classify(message)
 
     # Handle authorization
-    if data.get("msg_type") == "authorize":
+    if msg == "authorize":
         print(f"[AUTHORIZED] Logged in as: {data['authorize']['loginid']}")
         ws.send(json.dumps({
-            "ticks": SYMBOL
+            "ticks": SYMBOL,
+            "subscribe": 1
         }))
         print("[BOT] Starting trades...")
 
     # Handle ticks
-    elif data.get("msg_type") == "tick":
-        last_digit = int(str(data["tick"]["quote"])[-1])
+    elif msg == "tick":
+        last_digit = digit_decoder.decode(data)
         if 1 <= last_digit <= 8:
-            recent_digits.append(last_digit)
+            recent_digits.push(last_digit)
 
         digit_to_trade = select_digit_probability()
 
-        contract = {
-            "buy": 1,
-            "price": current_stake,
-            "parameters": {
-                "amount": current_stake,
-                "basis": "stake",
-                "contract_type": "DIGITMATCH",
-                "currency": "USD",
-                "duration": 1,
-                "duration_unit": "t",
-                "symbol": SYMBOL,
-                "barrier": str(digit_to_trade)
-            }
-        }
+        contract = buy_parameters("DIGITMATCH", SYMBOL, current_stake, 1, digit_to_trade)
         ws.send(json.dumps(contract))
         print(f"[TRADE] Buying DIGITMATCH {digit_to_trade} @ ${current_stake:.2f}")
 
     # Handle buy confirmation
-    elif data.get("msg_type") == "buy":
+    elif msg == "buy":
         print(f"[BOUGHT] Contract #{data['buy']['contract_id']}")
 
     # Handle proposal_open_contract
-    elif data.get("msg_type") == "proposal_open_contract":
+    elif msg == "proposal_open_contract":
         poc = data["proposal_open_contract"]
         if poc.get("is_sold"):
             profit = poc.get("profit", 0)
@@ -112,11 +90,11 @@ def on_close(ws, close_status_code, close_msg):
     print("[CLOSED] Connection closed.")
 
 if __name__ == "__main__":
-    ws = websocket.WebSocketApp(
+    # reopened with backoff whenever the socket drops; on_open re-authorizes
+    Supervisor(lambda: websocket.WebSocketApp(
         f"wss://ws.derivws.com/websockets/v3?app_id={DERIV_APP_ID}",
         on_message=on_message,
         on_open=on_open,
         on_error=on_error,
         on_close=on_close
-    )
-    ws.run_forever()
+    )).run()
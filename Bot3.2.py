@@ -3,6 +3,12 @@ import json
 import time
 from typing import Optional
 
+from frames import classify
+from orders import buy_parameters
+from outbound import Outbound, Template
+from registry import Registry
+from supervisor import Supervisor
+
 """
 Deriv Rise/Fall bot via WebSocket.
 - Trades both directions (Rise and Fall) at the same time using FIXED stakes (no recovery / martingale).
@@ -17,55 +23,67 @@ DURATION_TICKS = 1
 RISE_STAKE = 1.00            
 FALL_STAKE = 1.00            
 TRADE_COOLDOWN_SEC = 0.5     
+BUY_MAX_DELAY = 0.25         # seconds the hedge may wait for the rate limiter before it is skipped
+CONTRACT_TTL = 300.0         # seconds a contract with no result is tracked before it is dropped
 # ==========================
 
 
-open_contracts = {} 
+def _untracked(contract_id, side):
+    print(f"[WARN] no result for #{contract_id} ({side}) after {CONTRACT_TTL:.0f}s; no longer tracked")
+
+
+# contract_id -> side; capped so contracts whose result never arrives cannot pile up
+open_contracts = Registry(CONTRACT_TTL, 1000, on_evict=_untracked)
 last_trade_time: float = 0.0
+current_ws = None   # socket of the live connection, replaced on reconnect
+# every send goes through one rate-limited queue: buys first, per-class token buckets
+outbound = Outbound(lambda raw: current_ws.send(raw))
+POC_SUBSCRIBE = Template({"proposal_open_contract": 1, "contract_id": 0, "subscribe": 1}, "contract_id")
+# both legs are fixed: serialized once instead of on every tick
+BUY_PAYLOADS = {side: json.dumps(buy_parameters(side, SYMBOL, stake, DURATION_TICKS, allow_equals=1))
+                for side, stake in (("CALL", RISE_STAKE), ("PUT", FALL_STAKE))}
 
 
-def buy_contract(ws: websocket.WebSocketApp, side: str, stake: float):
-    """Send a buy order for CALL (rise) or PUT (fall) with fixed stake."""
-    payload = {
-        "buy": 1,
-        "price": stake,
-        "parameters": {
-            "amount": stake,
-            "basis": "stake",
-            "contract_type": side,          # CALL (rise) or PUT (fall)
-            "currency": "USD",
-            "duration": DURATION_TICKS,
-            "duration_unit": "t",
-            "symbol": SYMBOL,
-            "allow_equals": 1
-        }
-    }
-    ws.send(json.dumps(payload))
-    print(f"[TRADE] Sent {side} @ ${stake:.2f} | {DURATION_TICKS}t on {SYMBOL}")
+def buy_hedge():
+    """Queue CALL (rise) and PUT (fall) as one basket: both legs are bought or neither is."""
+    outbound.submit_basket(BUY_PAYLOADS.values(), "buy", max_delay=BUY_MAX_DELAY)
+    print(f"[TRADE] Queued CALL @ ${RISE_STAKE:.2f} + PUT @ ${FALL_STAKE:.2f} | {DURATION_TICKS}t on {SYMBOL}")
 
 
 def on_message(ws, message):
     global last_trade_time
 
-    data = json.loads(message)
-    msg_type = data.get("msg_type")
+    msg_type, data = classify(message)
+    if data is None:
+        return
 
     # --- Authorization ---
     if msg_type == "authorize":
         auth = data.get("authorize", {})
         loginid = auth.get("loginid")
         print(f"[AUTHORIZED] Logged in as: {loginid}")
+        outbound.submit({"website_status": 1})   # the account's real rate limits
         # Subscribe to ticks so we have a heartbeat from the market
-        ws.send(json.dumps({"ticks": SYMBOL}))
+        outbound.submit({"ticks": SYMBOL, "subscribe": 1})
         print("[BOT] Waiting for first tick to begin trading...")
+        # contracts bought before a reconnect lost their streams with the old socket
+        for contract_id in open_contracts:
+            outbound.submit_raw(POC_SUBSCRIBE.render(contract_id), "proposal_open_contract")
+
+    elif msg_type == "website_status":
+        limits = data.get("website_status", {}).get("api_call_limits")
+        if limits:
+            outbound.apply_limits(limits)
+            print("[BOT] Rate limits from server:", {k: (round(b.rate, 2), b.burst) for k, b in outbound.buckets.items()})
 
     # --- Tick stream ---
     elif msg_type == "tick":
         if (time.time() - last_trade_time) >= TRADE_COOLDOWN_SEC:
             # Buy both CALL and PUT simultaneously
-            buy_contract(ws, "CALL", RISE_STAKE)
-            buy_contract(ws, "PUT", FALL_STAKE)
+            buy_hedge()
             last_trade_time = time.time()
+        outbound.maybe_report()
+        open_contracts.sweep()
 
     # --- Buy confirmation ---
     elif msg_type == "buy":
@@ -76,11 +94,7 @@ def on_message(ws, message):
             open_contracts[contract_id] = side
             print(f"[BOUGHT] Contract #{contract_id} ({side})")
             # Subscribe to updates for this contract
-            ws.send(json.dumps({
-                "proposal_open_contract": 1,
-                "contract_id": contract_id,
-                "subscribe": 1
-            }))
+            outbound.submit_raw(POC_SUBSCRIBE.render(contract_id), "proposal_open_contract")
         else:
             print("[WARN] No contract_id returned on buy.")
 
@@ -98,9 +112,9 @@ def on_message(ws, message):
                 print(f"[RESULT] {status} ({side}) | buy={buy_price:.2f} sell={sell_price:.2f} profit={profit:.2f}")
 
                 # Stop updates for this contract
-                ws.send(json.dumps({
-                    "forget": poc.get("subscription", {}).get("id")
-                }))
+                sub_id = (data.get("subscription") or {}).get("id")
+                if sub_id:
+                    outbound.submit({"forget": sub_id})
                 open_contracts.pop(contract_id, None)
 
     # --- Errors from API ---
@@ -110,6 +124,8 @@ def on_message(ws, message):
 
 
 def on_open(ws):
+    global current_ws
+    current_ws = ws
     print("[CONNECTED] Authorizing...")
     ws.send(json.dumps({"authorize": API_TOKEN}))
 
@@ -123,11 +139,11 @@ def on_close(ws, close_status_code, close_msg):
 
 
 if __name__ == "__main__":
-    ws = websocket.WebSocketApp(
+    # reopened with backoff whenever the socket drops; on_open re-authorizes
+    Supervisor(lambda: websocket.WebSocketApp(
         f"wss://ws.derivws.com/websockets/v3?app_id={DERIV_APP_ID}",
         on_message=on_message,
         on_open=on_open,
         on_error=on_error,
         on_close=on_close,
-    )
-    ws.run_forever(ping_interval=30)
+    ), ping_interval=30).run()
@@ -1,26 +1,32 @@
 import websocket
 import json
+import os
 import threading
 import time
-import csv
 import random
 from datetime import datetime
 
+from coljournal import open_journal
+from digitstats import DigitStats
+from frames import classify
+from journal import JournalWriter
+from lastdigit import DigitDecoder
+from registry import Registry
+from staking import martingale_stake
+from supervisor import Supervisor, gap_request, gap_ticks
+from tickstore import TickStore
+
 DERIV_API_TOKEN = "JDKYPoc3aLSHjiY"
 APP_ID = "96437"
+WS_URL = os.environ.get("DERIV_WS_URL") or f"wss://ws.derivws.com/websockets/v3?app_id={APP_ID}"  # ws://127.0.0.1:8765 for mockderiv.py
+SYMBOL = "R_10"
+TICK_STORE_DIR = "ticks"    # local tick archive ("" disables it)
+WARM_MAX_AGE = 120.0        # seconds; older archives mean a ticks_history fetch, newer ones a gap backfill
+TICK_WINDOW = 1000          # digits in the rolling parity statistics (10k-100k cost the same per tick)
+CSV_LOG = "oddeven_trades.csv"        # was trades_log.csv, which Bot.py also writes
+TRADE_COLUMNS_DIR = "journal/oddeven"  # typed .npz trade journal ("" disables it)
+CONTRACT_TTL = 300.0        # seconds a contract with no result is tracked before it is dropped
 
-def last_digit_from_quote(q):
-    """
-    Robustly get the last decimal digit from a numeric tick quote.
-    Works even if q is float/int by scanning the string from the end
-    and picking the first digit encountered.
-    """
-    s = f"{q}"
-    for ch in reversed(s):
-        if ch.isdigit():
-            return int(ch)
-    # fallback (shouldn't happen), default to 0
-    return 0
 
 class DynamicOddEvenBot:
     def __init__(self, token):
@@ -29,91 +35,163 @@ class DynamicOddEvenBot:
         self.stake = 1.0
         self.loss_count = 0
         self.ws = None
-        self.lock = threading.Lock()
+        self.lock = threading.Lock()  # socket thread pushes digits, decision thread snapshots them
+        self.supervisor = None
+        self.deciding = False
+        # resubscribed after a reconnect; bounded so results that never arrive cannot pile up
+        self.open_contracts = Registry(CONTRACT_TTL, 1000, on_evict=self._untracked)
+        self.last_epoch = None
+        self._gap = None    # last archived epoch, until the warm-up gap is backfilled
+        self._held = []     # (epoch, quote, digit) of live ticks that arrive before the backfill
 
         # tick storage
-        self.ticks = []
+        self.stats = DigitStats((TICK_WINDOW,))
+        self.digit = DigitDecoder(SYMBOL)  # digit at the symbol's pip size, not str(quote)
+        self.store = TickStore(TICK_STORE_DIR) if TICK_STORE_DIR else None
+        self.tick_writer = self.store.writer(SYMBOL) if self.store else None
 
         # win/loss tracking
         self.total_trades = 0
         self.total_wins = 0
         self.total_losses = 0
 
-        # logging
-        self.csv_file = open("trades_log.csv", "a", newline="")
-        self.csv_writer = csv.writer(self.csv_file)
-        if self.csv_file.tell() == 0:
-            self.csv_writer.writerow(["Time", "Contract", "Result", "Profit", "Balance", "StrikeRate"])
+        # logging (written by the journal thread, not the socket callback)
+        self.last_choice = None
+        self.cols = open_journal(TRADE_COLUMNS_DIR)
+        self.journal = JournalWriter(CSV_LOG, ["Time", "Contract", "Result", "Profit", "Balance", "StrikeRate"])
 
     def connect(self):
-        self.ws = websocket.WebSocketApp(
-            f"wss://ws.derivws.com/websockets/v3?app_id={APP_ID}",
-            on_open=self.on_open,
-            on_message=self.on_message,
-            on_error=self.on_error,
-            on_close=self.on_close,
-        )
-        threading.Thread(target=self.ws.run_forever, daemon=True).start()
+        def make_ws():
+            self.ws = websocket.WebSocketApp(
+                WS_URL,
+                on_open=self.on_open,
+                on_message=self.on_message,
+                on_error=self.on_error,
+                on_close=self.on_close,
+            )
+            return self.ws
+        # reopened with backoff whenever the socket drops; on_open re-authorizes
+        self.supervisor = Supervisor(make_ws)
+        self.supervisor.start()
 
     def on_open(self, ws):
         print("[WS] open")
         self.send({"authorize": self.token})
 
-    def on_message(self, ws, msg):
-        data = json.loads(msg)
+    def on_message(self, ws, raw):
+        msg, data = classify(raw)
+
+        if msg == "tick":
+            quote = data.get("quote")
+            if quote is not None:
+                epoch = data.get("epoch")
+                if epoch:
+                    epoch = int(epoch)
+                    if self.last_epoch is not None and epoch <= self.last_epoch:
+                        return  # already backfilled
+                    self.last_epoch = epoch
+                self.digit.observe(data)
+                d = self.digit(float(quote))
+                if self._gap is not None:
+                    self._held.append((epoch, float(quote), d))   # goes in after the backfill
+                    return
+                with self.lock:
+                    self.stats.push(d)
+                if self.tick_writer and epoch:
+                    self.tick_writer.append(int(epoch), float(quote))
+            return
+
+        if data is None:
+            return
 
         if "error" in data and data["error"]:
             print("[WS][ERROR]", data["error"])
+            if data.get("msg_type") == "history" and self._gap is not None:
+                print("[WS] backfill failed; the window keeps the gap")
+                self._backfill({})
             return
 
-        if data.get("msg_type") == "authorize":
+        if msg == "authorize":
             print("[WS] authorized")
             try:
                 self.balance = float(data["authorize"]["balance"])
             except Exception:
                 self.balance = None
             print(f"[START] start balance: {self.balance}")
+            for contract_id in list(self.open_contracts):
+                self.send({"proposal_open_contract": 1, "contract_id": contract_id, "subscribe": 1})
+            # after a reconnect the disk archive stops where the socket did: refetch the window
+            warm = []
+            if self.store and not self.deciding:
+                warm = self.store.warm(SYMBOL, TICK_WINDOW, WARM_MAX_AGE, time.time())
+            if warm:
+                with self.lock:
+                    self.stats.clear()
+                    self.stats.extend(d for _, _, d in warm)
+                print("[STORE] warmup ticks loaded from disk:", len(self.stats))
+                # decisions wait for the ticks between the archive's last one and now
+                self.last_epoch = warm[-1][0]
+                self._gap = self.last_epoch
+                self.send(gap_request(SYMBOL, self.last_epoch))
+                self.send({"ticks": SYMBOL, "subscribe": 1})
+                return
             # get a block of history for warmup
             self.send({
-                "ticks_history": "R_10",
-                "count": 1000,
+                "ticks_history": SYMBOL,
+                "count": min(TICK_WINDOW, 5000),   # the API's limit; a bigger window fills up live
                 "end": "latest",
                 "style": "ticks"
             })
             # subscribe to live ticks (history is NOT a live subscription)
-            self.send({"ticks": "R_10", "subscribe": 1})
+            self.send({"ticks": SYMBOL, "subscribe": 1})
 
-        elif data.get("msg_type") == "history":
-            # prices are floats; do NOT subscript floats. Extract last digit safely.
-            prices = data.get("history", {}).get("prices", []) or []
-            self.ticks = [last_digit_from_quote(p) for p in prices]
-            print("[WS] warmup ticks loaded:", len(self.ticks))
-            print("[BOT] warmup complete, starting decision loop.")
-            threading.Thread(target=self.decision_loop, daemon=True).start()
+        elif msg == "history" and self._gap is not None:
+            self._backfill(data)
 
-        elif data.get("msg_type") == "tick":
-            quote = data.get("tick", {}).get("quote")
-            if quote is not None:
-                self.ticks.append(last_digit_from_quote(quote))
-                if len(self.ticks) > 1000:
-                    self.ticks.pop(0)
+        elif msg == "history":
+            prices = data.get("history", {}).get("prices", []) or []
+            times = data.get("history", {}).get("times", []) or []
+            self.digit.observe(data)
+            digits = self.digit.batch(prices)
+            with self.lock:
+                self.stats.clear()
+                self.stats.extend(digits)
+            if self.tick_writer:
+                for epoch, p in zip(times, prices):
+                    if self.last_epoch is None or int(epoch) > self.last_epoch:
+                        self.tick_writer.append(int(epoch), float(p))
+            print("[WS] warmup ticks loaded:", len(self.stats))
+            self._start_decisions()
 
-        elif data.get("msg_type") == "proposal":
+        elif msg == "proposal":
             # buy immediately with the quoted proposal id
             prop = data.get("proposal", {})
             pid = prop.get("id")
             if pid:
-                self.send({"buy": pid, "price": self.stake})
+                # passthrough carries this decision's side, p_hat and stake on to the buy reply
+                pt = data.get("passthrough") or {}
+                self.send({"buy": pid, "price": pt.get("stake", self.stake), "passthrough": pt})
 
-        elif data.get("msg_type") == "buy":
+        elif msg == "buy":
             contract_id = data.get("buy", {}).get("contract_id")
             if contract_id:
-                print(f"[BOT] Bought contract {contract_id}, stake={self.stake}")
+                pt = data.get("passthrough") or {}
+                side, p_hat = self.last_choice or (None, None)
+                trade = (pt.get("side", side), pt.get("p_hat", p_hat), pt.get("stake", self.stake))
+                print(f"[BOT] Bought contract {contract_id}, stake={trade[2]}")
+                # kept with the contract: a later decision must not relabel this one's journal row
+                self.open_contracts[contract_id] = trade
                 self.send({"proposal_open_contract": 1, "contract_id": contract_id, "subscribe": 1})
 
-        elif data.get("msg_type") == "proposal_open_contract":
+        elif msg == "proposal_open_contract":
             poc = data.get("proposal_open_contract", {})
             if poc.get("is_sold"):
+                if poc.get("contract_id") not in self.open_contracts:
+                    return  # already counted (a reconnect can repeat the final update)
+                side, p_hat, stake = self.open_contracts.pop(poc.get("contract_id"))
+                sub_id = (data.get("subscription") or {}).get("id")
+                if sub_id:
+                    self.send({"forget": sub_id})
                 try:
                     profit = float(poc.get("profit", 0.0))
                 except Exception:
@@ -132,9 +210,9 @@ class DynamicOddEvenBot:
                 self.total_trades += 1
                 strike_rate = (self.total_wins / self.total_trades) * 100 if self.total_trades > 0 else 0.0
 
-                print(f"[BOT] {result} Profit={profit:.2f}, Balance={self.balance:.2f if self.balance is not None else 0.0}, SR={strike_rate:.2f}%")
+                print(f"[BOT] {result} Profit={profit:.2f}, Balance={self.balance or 0.0:.2f}, SR={strike_rate:.2f}%")
 
-                self.csv_writer.writerow([
+                self.journal.write([
                     datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     "ODD/EVEN",
                     result,
@@ -142,13 +220,49 @@ class DynamicOddEvenBot:
                     f"{self.balance:.2f}" if self.balance is not None else "",
                     f"{strike_rate:.2f}%"
                 ])
-                self.csv_file.flush()
+                if self.cols:
+                    self.cols.write({"ts": time.time(), "side": side, "stake": stake, "p_hat": p_hat,
+                                     "profit": profit, "balance": self.balance})
 
                 # stake adjustment (unchanged logic)
-                if profit > 0:
-                    self.stake = 1.0
-                else:
-                    self.stake = min(10.0, self.stake * 1.5)
+                self.stake = martingale_stake(profit > 0, self.stake, 1.0, 1.5, 10.0)
+
+    def _backfill(self, data):
+        # on the socket thread, like every other push into stats; the gap goes in before the
+        # live ticks held meanwhile, so the window and the archive stay in epoch order
+        since, held = self._gap, self._held
+        self._gap, self._held = None, []
+        ticks = gap_ticks(data.get("history") or {}, since)
+        self.digit.observe(data)
+        last = ticks[-1][0] if ticks else since
+        rows = [(epoch, q, self.digit(q)) for epoch, q in ticks]
+        rows += [t for t in held if not t[0] or t[0] > last]
+        with self.lock:
+            self.stats.extend(d for _, _, d in rows)
+        if self.tick_writer:
+            for epoch, q, _ in rows:
+                if epoch:
+                    self.tick_writer.append(epoch, q)
+        if ticks:
+            self.last_epoch = max(self.last_epoch or 0, last)
+        if data:
+            print(f"[WS] backfilled {len(ticks)} ticks since the archived warm-up")
+        self._start_decisions()
+
+    def snapshot(self):
+        """Counts, odd and n of the window as of one tick (never half-way through a push)."""
+        with self.lock:
+            return self.stats.snapshot(TICK_WINDOW)
+
+    def _start_decisions(self):
+        if self.deciding:
+            return
+        self.deciding = True
+        print("[BOT] warmup complete, starting decision loop.")
+        threading.Thread(target=self.decision_loop, daemon=True).start()
+
+    def _untracked(self, contract_id, trade):
+        print(f"[WARN] no result for contract {contract_id} ({trade[0]}, stake {trade[2]}) after {CONTRACT_TTL:.0f}s; no longer tracked")
 
     def on_error(self, ws, err):
         print("[WS][ERROR]", err)
@@ -164,13 +278,14 @@ class DynamicOddEvenBot:
 
     def decision_loop(self):
         while True:
-            if len(self.ticks) < 100:
+            snap = self.snapshot()
+            if snap.n < 100:
                 time.sleep(1)
                 continue
 
-            odd_count = sum(1 for d in self.ticks if d % 2 == 1)
-            even_count = len(self.ticks) - odd_count
-            total = len(self.ticks)
+            odd_count = snap.odd
+            even_count = snap.even
+            total = snap.n
             odd_prob = odd_count / total if total else 0.5
             even_prob = even_count / total if total else 0.5
 
@@ -183,6 +298,8 @@ class DynamicOddEvenBot:
                 print("[BOT] Anti-trap flip ->", choice)
 
             # request a proposal for the chosen side
+            self.last_choice = (choice, odd_prob if choice == "DIGITODD" else even_prob)
+            side, p_hat = self.last_choice
             self.send({
                 "proposal": 1,
                 "amount": self.stake,
@@ -191,7 +308,8 @@ class DynamicOddEvenBot:
                 "currency": "USD",
                 "duration": 1,
                 "duration_unit": "t",
-                "symbol": "R_10"
+                "symbol": SYMBOL,
+                "passthrough": {"side": side, "p_hat": round(p_hat, 6), "stake": self.stake}
             })
 
             time.sleep(3)  # pacing between trades
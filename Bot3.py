@@ -8,20 +8,17 @@ Trade R_10 Over/Under dynamically using last-1000-tick digit stats.
 - Uses live ticks_history (count=1000) to compute digit stats
 - Weighted stake recovery after losses (conservative caps)
 - Small randomization to avoid pattern traps
-- CSV logging and safety controls
+- CSV logging (background journal thread) and safety controls
 - Live console log of decisions and rolling summary
 """
 
 import json
+import os
 import time
-import uuid
 import threading
-import queue
-import csv
-import random
 from collections import deque
 from dataclasses import dataclass
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, List, Tuple
 
 try:
     import websocket
@@ -29,10 +26,26 @@ except Exception:
     print("pip install websocket-client")
     exit(1)
 
+from coljournal import open_journal
+from correlator import RequestCorrelator
+from digitstats import DigitStats
+from frames import classify
+from journal import JournalWriter
+from lastdigit import DigitDecoder, decimals_for, update_pips
+from latency import LatencyRecorder
+from orders import OrderRouter
+from proposal_book import ProposalBook, book_key
+from settlement import SettlementTracker
+from staking import streak_recovery_stake
+from strategies import overunder_scan
+from supervisor import Backoff, Supervisor, gap_request, gap_ticks
+from tickmailbox import TickMailbox
+from tickstore import TickStore
+
 # CONFIG
 DERIV_APP_ID = "PUT ID HERE"
 DERIV_API_TOKEN = "PUT TOKEN HERE"  # demo token
-WS_URL = f"wss://ws.derivws.com/websockets/v3?app_id={DERIV_APP_ID}"
+WS_URL = os.environ.get("DERIV_WS_URL") or f"wss://ws.derivws.com/websockets/v3?app_id={DERIV_APP_ID}"  # ws://127.0.0.1:8765 for mockderiv.py
 
 SYMBOL = "R_10"
 BASE_STAKE = 10.0
@@ -45,8 +58,18 @@ MIN_STAKE = 0.5
 
 WARMUP_TICKS = 20
 SCAN_THRESHOLDS = list(range(1, 9))
+STATS_WINDOW = 1000         # digits in the rolling over/under statistics
 PROPOSAL_TIMEOUT = 2.0
+PROPOSAL_FANOUT = True      # price every (side, threshold) in one pipelined batch
+FANOUT_DEADLINE = 0.8       # legs not answered by then are left out of the scan
+USE_PROPOSAL_STREAMS = True # keep a live payout table instead of one proposal per trade
+PROPOSAL_MAX_AGE = 2.0
 BUY_TIMEOUT = 5.0
+DIRECT_BUY = True           # buy legs with a known payout straight away ("buy": 1 + parameters)
+PAYOUT_MAX_AGE = 30.0       # seconds a quoted payout is trusted for a direct buy
+SETTLEMENT_MODE = "all"     # one shared contract stream ("each": one per contract, auto-forget)
+MAX_OPEN_CONTRACTS = 5      # contracts in flight before the loop stops buying
+SETTLE_TIMEOUT = 60.0
 
 EXPLORATION_PROB = 0.08
 TEMPERATURE = 0.9
@@ -56,9 +79,17 @@ DAILY_SL = -20.0
 LOSS_STREAK_PAUSE = 3
 PAUSE_TICKS = 6
 COOLDOWN = 0.05
+TICK_MAILBOX = "latest"     # decide on the newest tick only ("fifo": every tick in order)
+MAX_TICK_AGE = 1.0          # seconds; decisions on an older tick are skipped
 PING_INTERVAL = 25
+RECONNECT_MAX_DELAY = 30.0  # seconds; reconnect backoff doubles from 1s up to this
+LATENCY_REPORT_SEC = 60.0   # p50/p99/p999 per stage printed this often
+LATENCY_DUMP = "latency_overunder.json"  # same numbers plus raw buckets ("" disables it)
 
 CSV_FILE = "dynamic_overunder_trades.csv"
+TRADE_COLUMNS_DIR = "journal/overunder"  # typed .npz trade journal ("" disables it)
+TICK_STORE_DIR = "ticks"    # local tick archive ("" disables it)
+WARM_MAX_AGE = 120.0        # seconds; older archives are not used for warm-up
 MIN_EV = 0.0
 
 # Helpers & dataclasses
@@ -71,21 +102,6 @@ class Candidate:
     net_b: float
     ev: float
 
-def last_digit_from_quote(q: float) -> Optional[int]:
-    s = f"{q:.2f}"
-    for ch in reversed(s):
-        if ch.isdigit():
-            return int(ch)
-    return None
-
-def _next_req_id(self):
-    if not hasattr(self, "_req_counter"):
-        self._req_counter = 1
-    else:
-        self._req_counter += 1
-    return self._req_counter
-
-
 # Bot class
 class DynamicOverUnderBot:
     def __init__(self, token: str, ws_url: str = WS_URL):
@@ -93,13 +109,15 @@ class DynamicOverUnderBot:
         self.ws_url = ws_url
         self.ws: Optional[websocket.WebSocketApp] = None
 
-        self.tick_q: "queue.Queue[float]" = queue.Queue(maxsize=2000)
-        self.proposal_waiters: Dict[str, dict] = {}
-        self.buy_q: "queue.Queue[dict]" = queue.Queue()
-        self.pending_contracts: Dict[str, dict] = {}
+        self.ticks = TickMailbox(TICK_MAILBOX, maxsize=2000)
+        self.requests = RequestCorrelator()
+        self.book = ProposalBook(self._send, SYMBOL, max_age=PROPOSAL_MAX_AGE)
+        self.settlements = SettlementTracker(self._send, SETTLEMENT_MODE, SETTLE_TIMEOUT)
+        self.router = OrderRouter(self._request, SYMBOL, self.book if USE_PROPOSAL_STREAMS else None,
+                                  payout_max_age=PAYOUT_MAX_AGE)
 
-        self.recent_ticks: deque = deque(maxlen=1000)
-        self.live_digit_counts = [0]*10
+        self.stats = DigitStats((STATS_WINDOW,))
+        self.digit = DigitDecoder(SYMBOL)
 
         self.trade_no = 0
         self.wins = 0
@@ -112,30 +130,37 @@ class DynamicOverUnderBot:
         self.total_profit = 0.0
         self.last_trade_ts = 0.0
         self._tick_count = 0
+        self.lat = LatencyRecorder(LATENCY_REPORT_SEC, LATENCY_DUMP)
+        self.supervisor: Optional[Supervisor] = None
+        self.last_epoch: Optional[int] = None
+        self._gap: Optional[int] = None   # last epoch before the drop, until the missed ticks are backfilled
+        self._held: List[Tuple[int, int]] = []   # (epoch, digit) of live ticks that arrive before the backfill
+        self._pinging = False
         self.pause_until_tick = 0
         self.recent_profits: deque = deque(maxlen=50)
         self.current_min_ev = MIN_EV
         self._lock = threading.Lock()
-        self._init_csv()
+        self.tick_writer = None
+        if TICK_STORE_DIR:
+            store = TickStore(TICK_STORE_DIR)
+            # archived records already carry the digit at the symbol's pip size
+            warm = store.warm(SYMBOL, STATS_WINDOW, WARM_MAX_AGE, time.time())
+            self.stats.extend(d for _, _, d in warm)
+            self._tick_count = len(self.stats)
+            if warm:
+                # the ticks since the archive's last one are backfilled on connect, like a reconnect gap
+                self.last_epoch = warm[-1][0]
+                self._gap = self.last_epoch
+                print(f"[STORE] warm-up from disk: {self._tick_count} ticks")
+            self.tick_writer = store.writer(SYMBOL)
+        self.cols = open_journal(TRADE_COLUMNS_DIR)
+        self.journal = JournalWriter(CSV_FILE, ["ts","trade_no","side","threshold","stake","payout","profit",
+                                                "p_win","net_b","ev","balance","note"])
         self.last_trades: deque = deque(maxlen=10)  # rolling summary
 
     # CSV
-    def _init_csv(self):
-        try:
-            with open(CSV_FILE, "a", newline="") as f:
-                w = csv.writer(f)
-                if f.tell() == 0:
-                    w.writerow(["ts","trade_no","side","threshold","stake","payout","profit",
-                                "p_win","net_b","ev","balance","note"])
-        except Exception as e:
-            print("[CSV] init error:", e)
-
     def _log(self, row: List):
-        try:
-            with open(CSV_FILE, "a", newline="") as f:
-                csv.writer(f).writerow(row)
-        except Exception:
-            pass
+        self.journal.write(row)
 
     
     # WebSocket callbacks
@@ -146,15 +171,74 @@ class DynamicOverUnderBot:
             self.stop()
             return
         ws.send(json.dumps({"authorize": self.token}))
-        threading.Thread(target=self._pinger, daemon=True).start()
+        if not self._pinging:
+            self._pinging = True
+            threading.Thread(target=self._pinger, daemon=True).start()
+
+    def _on_down(self, reason):
+        # supervisor thread, between the old socket closing and the next connect
+        failed = self.requests.fail_all("connection lost")
+        with self._lock:
+            if self.last_epoch is not None and self._gap is None:
+                self._gap = self.last_epoch
+        print(f"[WS] down ({reason}); failed {failed} in-flight requests")
+
+    def _backfill(self):
+        since = self._gap
+        hist = self._request(gap_request(SYMBOL, since), 10.0)
+        if hist is None:
+            print("[WS] backfill failed; the window keeps the gap")
+        with self._lock:
+            # gap first, then the live ticks held meanwhile, so the window stays in epoch order
+            ticks = gap_ticks(hist or {}, since)
+            held, self._held = self._held, []
+            self._gap = None
+            for epoch, quote in ticks:
+                self.stats.push(self.digit(quote))
+            last = ticks[-1][0] if ticks else since
+            for epoch, d in held:
+                if not epoch or epoch > last:
+                    self.stats.push(d)
+            if ticks:
+                self.last_epoch = max(self.last_epoch or 0, last)
+        self._tick_count += len(ticks)
+        if hist is not None:
+            print(f"[WS] backfilled {len(ticks)} ticks missed while down")
 
     def _on_message(self, ws, raw):
-        try:
-            data = json.loads(raw)
-        except Exception:
+        msg, data = classify(raw)
+        # tick: only the fields below are decoded
+        if msg == "tick":
+            q = data.get("quote")
+            if q is not None:
+                try:
+                    quote = float(q)
+                except: return
+                epoch = int(data.get("epoch") or 0)
+                self.digit.observe(data)
+                d = self.digit(quote)
+                with self._lock:
+                    if epoch:
+                        if self.last_epoch is not None and epoch <= self.last_epoch: return  # already backfilled
+                        self.last_epoch = epoch
+                    if self._gap is not None:
+                        self._held.append((epoch, d))   # goes in after the backfill
+                    else:
+                        self.stats.push(d)
+                self._tick_count += 1
+                if self.tick_writer and epoch:
+                    self.tick_writer.append(int(epoch), quote)
+                self.ticks.put(quote)
+            return
+        if data is None:
             return
         if "error" in data:
             print("[WS][ERROR]", data["error"])
+            key = RequestCorrelator.key_of(data)
+            if key is not None:
+                self.requests.fail(key, data["error"])
+            else:
+                self.book.on_error(data)
             return
         # authorize
         if data.get("msg_type") == "authorize" or "authorize" in data:
@@ -164,89 +248,64 @@ class DynamicOverUnderBot:
                 for k,v in auth.items():
                     try:
                         if isinstance(v,(int,float)) and "balance" in k.lower():
-                            self.start_balance = float(v)
+                            if self.start_balance is None:  # a reconnect keeps the day's baseline
+                                self.start_balance = float(v)
                             self.balance = float(v)
                             print(f"[START] start balance: {self.balance:.2f}")
                             break
                     except: pass
+            ws.send(json.dumps({"active_symbols": "brief", "product_type": "basic"}))
+            # the missed ticks are asked for before the live stream restarts
+            if self._gap is not None:
+                threading.Thread(target=self._backfill, daemon=True).start()
             ws.send(json.dumps({"ticks": SYMBOL, "subscribe": 1}))
+            self.settlements.start()
+            if self.book.resubscribe(): print("[WS] proposal streams reopened")
             print(f"[WS] subscribed {SYMBOL}")
             return
-        # tick
-        if "tick" in data:
-            q = data["tick"].get("quote")
-            if q is not None:
-                try:
-                    quote = float(q)
-                except: return
-                self._tick_count += 1
-                d = last_digit_from_quote(quote)
-                if d is not None:
-                    with self._lock:
-                        if len(self.recent_ticks) == self.recent_ticks.maxlen:
-                            oldq = self.recent_ticks[0]
-                            oldd = last_digit_from_quote(oldq)
-                            if oldd is not None:
-                                self.live_digit_counts[oldd]-=1
-                        self.recent_ticks.append(quote)
-                        self.live_digit_counts[d]+=1
-                try: self.tick_q.put_nowait(quote)
-                except queue.Full: pass
+        if "active_symbols" in data:
+            update_pips(data["active_symbols"])
+            self.digit.set_decimals(decimals_for(SYMBOL, self.digit.decimals))
             return
-        # history response
-        if "history" in data and ("echo_req" in data and data["echo_req"].get("tag")):
-            tag = data["echo_req"].get("tag")
-            with self._lock:
-                self.proposal_waiters[tag]={"history":data["history"]}
+        # history / proposal / buy responses wake their waiter directly
+        if "proposal" in data and self.book.on_frame(data):
             return
-        # proposal
-        if "proposal" in data:
-            echo = data.get("echo_req") or {}
-            passth = echo.get("passthrough") or data.get("passthrough") or {}
-            tag = None
-            if isinstance(passth,dict):
-                tag = passth.get("tag")
-            if tag and tag in self.proposal_waiters:
-                entry=self.proposal_waiters.pop(tag)
-                entry["proposal"]=data["proposal"]
-                with self._lock:
-                    self.proposal_waiters[tag]=entry
-            else:
-                echo_req=data.get("echo_req",{})
-                req_id=echo_req.get("req_id")
-                if req_id is not None:
-                    with self._lock:
-                        self.proposal_waiters[int(req_id)]={"proposal":data["proposal"]}
+        if "history" in data or "proposal" in data or "buy" in data:
+            key = RequestCorrelator.key_of(data)
+            if key is not None:
+                body = data.get("history") or data.get("proposal") or data.get("buy")
+                self.requests.resolve(key, body)
             return
-        # buy
-        if "buy" in data:
-            try: self.buy_q.put_nowait(data["buy"])
-            except queue.Full: pass
+        # contract updates settle through the tracker
+        self.settlements.on_frame(data)
+
+    def _on_settled(self, contract):
+        row, tl = contract.meta
+        profit = contract.profit
+        if profit is None:
+            print(f"[WARN] no settlement for {contract.contract_id}")
             return
-        # contract update
-        if "proposal_open_contract" in data or "contract_update" in data:
-            poc = data.get("proposal_open_contract") or data.get("contract_update")
-            if not isinstance(poc,dict): return
-            cid = str(poc.get("contract_id") or poc.get("id") or poc.get("identifier"))
-            profit = None
-            if "profit" in poc:
-                try: profit = float(poc["profit"])
-                except: profit=None
-            with self._lock:
-                prev=self.pending_contracts.get(cid,{})
-                prev.update({"update":poc,"profit":profit})
-                self.pending_contracts[cid]=prev
-                if profit is not None:
-                    self.total_profit += profit
-                    self.balance += profit
-                    self.recent_profits.append(profit)
-                    if profit>0: self.wins+=1; self.loss_streak=0
-                    else: self.losses+=1; self.loss_streak+=1
+        tl.mark("settle", contract.done_at)
+        with self._lock:
+            self.total_profit += profit
+            self.balance += profit
+            self.recent_profits.append(profit)
+            if profit>0: self.wins+=1; self.loss_streak=0
+            else: self.losses+=1; self.loss_streak+=1
+        row[6] = profit     # for the rolling summary; the journal gets its own copy below
+        self._log(row[:10]+[self.balance,"settled"])
+        if self.cols:
+            self.cols.write({"ts":time.time(),"side":row[2],"threshold":row[3],"stake":row[4],"payout":row[5],
+                             "profit":profit,"p_hat":row[7],"ev":row[9],"balance":self.balance})
 
     def _on_error(self, ws, err):
         print("[WS][ERROR]", err)
     def _on_close(self, ws, code, reason):
         print("[WS] closed", code, reason)
+    def _send(self, payload:dict):
+        try: self.ws.send(json.dumps(payload))
+        except Exception as e: print("[WS][ERROR] send failed:", e)
+
     def _pinger(self):
         while True:
             try:
@@ -257,123 +316,130 @@ class DynamicOverUnderBot:
 
     
     # Request helpers
-    def request_ticks_history(self, count:int=1000,timeout:float=3.0)->Optional[List[float]]:
-        tag=uuid.uuid4().hex
-        req={"ticks_history":SYMBOL,"end":"latest","count":int(count),
-             "style":"ticks","passthrough":{"tag":tag},
-             "req_id":int(tag) if tag.isdigit() else _next_req_id(self)}
-        waiter={"event":threading.Event(),"history":None}
-        with self._lock: self.proposal_waiters[tag]=waiter
-        try: self.ws.send(json.dumps(req))
+    def _send_request(self, payload:dict):
+        req_id=self.requests.next_req_id()
+        payload["req_id"]=req_id
+        waiter=self.requests.register(req_id)
+        try: self.ws.send(json.dumps(payload))
         except:
-            with self._lock: self.proposal_waiters.pop(tag,None)
+            self.requests.cancel(req_id)
             return None
-        deadline=time.time()+timeout
-        while time.time()<deadline:
-            with self._lock:
-                entry=self.proposal_waiters.get(tag)
-                if entry and entry.get("history"):
-                    hist=entry["history"]
-                    self.proposal_waiters.pop(tag,None)
-                    quotes=[]
-                    for p in hist.get("prices") or hist.get("candles") or []:
-                        try: quotes.append(float(p))
-                        except: pass
-                    return quotes
-            time.sleep(0.05)
-        with self._lock: self.proposal_waiters.pop(tag,None)
-        return None
+        return waiter
 
-    def request_proposal(self, side:str, threshold:int, stake:float, timeout:float=PROPOSAL_TIMEOUT)->Optional[dict]:
-        tag=uuid.uuid4().hex
+    def _request(self, payload:dict, timeout:float)->Optional[dict]:
+        waiter=self._send_request(payload)
+        if waiter is None: return None
+        return self.requests.wait(waiter,timeout)
+
+    def request_ticks_history(self, count:int=1000,timeout:float=3.0)->Optional[List[float]]:
+        hist=self._request({"ticks_history":SYMBOL,"end":"latest","count":int(count),
+                            "style":"ticks"},timeout)
+        if hist is None: return None
+        quotes=[]
+        for p in hist.get("prices") or hist.get("candles") or []:
+            try: quotes.append(float(p))
+            except: pass
+        return quotes
+
+    def _proposal_req(self, side:str, threshold:int, stake:float)->dict:
         contract_type="DIGITOVER" if side=="over" else "DIGITUNDER"
-        req={"proposal":1,"amount":float(stake),"basis":"stake","contract_type":contract_type,
-             "symbol":SYMBOL,"duration":1,"duration_unit":"t","currency":"USD",
-             "barrier":str(threshold),
-             "passthrough":{"tag":tag,"side":side,"threshold":threshold}}
-        waiter={"event":threading.Event(),"proposal":None}
-        with self._lock: self.proposal_waiters[tag]=waiter
-        try: self.ws.send(json.dumps(req))
-        except:
-            with self._lock: self.proposal_waiters.pop(tag,None)
-            return None
-        deadline=time.time()+timeout
-        while time.time()<deadline:
-            with self._lock:
-                entry=self.proposal_waiters.get(tag)
-                if entry and entry.get("proposal"):
-                    prop=entry["proposal"]
-                    self.proposal_waiters.pop(tag,None)
-                    return prop
-            time.sleep(0.03)
-        with self._lock: self.proposal_waiters.pop(tag,None)
-        return None
-
-    def buy_proposal(self, proposal:dict, stake:float, timeout:float=BUY_TIMEOUT)->Optional[str]:
-        pid=proposal.get("id") or proposal.get("proposal_id")
-        if not pid: return None
-        buy_req={"buy":pid,"price":float(stake)}
-        try: self.ws.send(json.dumps(buy_req))
-        except: return None
-        try:
-            buy_resp=self.buy_q.get(timeout=timeout)
-            cid=buy_resp.get("contract_id") or buy_resp.get("purchase",{}).get("contract_id")
-            return str(cid) if cid else None
-        except queue.Empty: return None
+        return {"proposal":1,"amount":float(stake),"basis":"stake","contract_type":contract_type,
+                "symbol":SYMBOL,"duration":1,"duration_unit":"t","currency":"USD",
+                "barrier":str(threshold)}
+
+    def _book_key(self, side:str, threshold:int, stake:float):
+        return book_key("DIGITOVER" if side=="over" else "DIGITUNDER",threshold,1,stake)
+
+    def _cached_quote(self, key, stake:float)->Optional[dict]:
+        # payout remembered from an earlier quote: enough for the EV gate and a direct buy
+        payout=self.router.payout(key) if DIRECT_BUY else None
+        return {"payout":payout,"ask_price":stake} if payout is not None else None
+
+    def request_proposal(self, side:str, threshold:int, stake:float, timeout:float=PROPOSAL_TIMEOUT)->Optional[dict]:
+        key=self._book_key(side,threshold,stake)
+        if USE_PROPOSAL_STREAMS:
+            self.book.ensure(key)
+            prop=self.book.take(key)
+            if prop is not None: return prop
+        prop=self._cached_quote(key,stake)
+        if prop is not None: return prop
+        prop=self._request(self._proposal_req(side,threshold,stake),timeout)
+        self.router.note(key,prop)
+        return prop
+
+    def scan_proposals(self, stake:float, timeout:float=FANOUT_DEADLINE)->Optional[Tuple[Candidate,dict]]:
+        # send every leg back-to-back, then collect whatever arrived by the deadline
+        legs={}
+        best=None
+        for cand in self.compute_candidates():
+            key=self._book_key(cand.side,cand.threshold,stake)
+            prop=None
+            if USE_PROPOSAL_STREAMS:
+                # legs with a live quote cost nothing, only the gaps go over the wire
+                self.book.ensure(key)
+                prop=self.book.get(key)
+            if prop is None:
+                prop=self._cached_quote(key,stake)
+            if prop is not None:
+                if self.apply_platform_ev(cand,prop,stake) and (best is None or cand.ev>best[0].ev):
+                    best=(cand,prop)
+                continue
+            w=self._send_request(self._proposal_req(cand.side,cand.threshold,stake))
+            if w is not None: legs[w.key]=(w,cand,key)
+        for w in self.requests.wait_all([leg[0] for leg in legs.values()],timeout):
+            _,cand,key=legs[w.key]
+            self.router.note(key,w.result)
+            if not self.apply_platform_ev(cand,w.result,stake): continue
+            if best is None or cand.ev>best[0].ev: best=(cand,w.result)
+        return best
+
+    def buy_proposal(self, cand:Candidate, proposal:dict, stake:float, timeout:float=BUY_TIMEOUT)->Optional[str]:
+        # a fresh proposal id if there is one, else a direct buy guarded at the break-even stake
+        return self.router.submit(self._book_key(cand.side,cand.threshold,stake),cand.p_win,proposal,timeout)
 
     def wait_for_settlement(self, contract_id:str,timeout:float=30.0)->Optional[Tuple[float,dict]]:
-        try: self.ws.send(json.dumps({"proposal_open_contract":1,"contract_id":contract_id,"subscribe":1}))
-        except: pass
-        deadline=time.time()+timeout
-        profit=None; info=None
-        while time.time()<deadline:
-            with self._lock:
-                entry=self.pending_contracts.get(str(contract_id))
-                if entry and "profit" in entry and entry["profit"] is not None:
-                    profit=entry["profit"]
-                    info=entry.get("update",{})
-                    self.pending_contracts.pop(str(contract_id),None)
-                    break
-            time.sleep(0.05)
-        return (profit,info) if profit is not None else None
+        c=self.settlements.track(contract_id)
+        profit=c.wait(timeout)
+        return (profit,c.poc) if profit is not None else None
 
     # Decision & stats
-    def compute_digit_stats_from_history(self, history_quotes:List[float])->List[float]:
-        counts=[0]*10
-        for q in history_quotes:
-            d=last_digit_from_quote(q)
-            if d is not None: counts[d]+=1
-        total=sum(counts)
-        return [c/total if total>0 else 0.1 for c in counts]
+    def compute_candidates(self)->List[Candidate]:
+        # O(1) snapshot of the last STATS_WINDOW digits
+        with self._lock:
+            if self.stats.n(STATS_WINDOW)<10: return []
+            snap=self.stats.snapshot(STATS_WINDOW)
+        cands=[]
+        for side,t,p in overunder_scan(snap,SCAN_THRESHOLDS):
+            net_b=9*(1-0.0)/1-0.0  # approx, dummy
+            ev=p*net_b-(1-p)
+            cands.append(Candidate(side=side,threshold=t,p_win=p,payout=0,net_b=net_b,ev=ev))
+        return cands
 
     def compute_stats_and_choose(self)->Optional[Candidate]:
-        # get last 1000 ticks
-        with self._lock:
-            if len(self.recent_ticks)<10: return None
-            hist=list(self.recent_ticks)
-        counts=self.compute_digit_stats_from_history(hist)
-        best_ev=-999
         best_cand=None
-        for t in SCAN_THRESHOLDS:
-            # digit over t
-            p_over=sum(counts[t:])
-            p_under=sum(counts[:t])
-            for side,p in [("over",p_over),("under",p_under)]:
-                net_b=9*(1-0.0)/1-0.0  # approx, dummy
-                ev=p*net_b-(1-p)
-                if ev>best_ev:
-                    best_ev=ev
-                    best_cand=Candidate(side=side,threshold=t,p_win=p,payout=0,net_b=net_b,ev=ev)
+        for cand in self.compute_candidates():
+            if best_cand is None or cand.ev>best_cand.ev:
+                best_cand=cand
         return best_cand
 
-    def suggest_stake(self, base:float, cand:Candidate)->float:
-        stake=base
-        if self.loss_streak>0:
-            stake=min(base*RECOVERY_MULTIPLIER**self.loss_streak, MAX_STAKE)
-        stake=min(stake, self.balance*MAX_STAKE_PCT_BAL)
-        stake=max(stake, MIN_STAKE)
-        stake+=random.uniform(-0.05,0.05)
-        return round(stake,2)
+    def apply_platform_ev(self, cand:Candidate, prop:dict, stake:float)->bool:
+        payout=None
+        for f in ("payout","ask_price","quote"):
+            if f in prop:
+                try: payout=float(prop[f]); break
+                except: continue
+        if payout is None: return False
+        ask=prop.get("ask_price") or prop.get("price") or stake
+        try: ask=float(ask)
+        except: ask=stake
+        net_b=(payout-ask)/ask if ask>0 else 0.0
+        cand.payout=payout; cand.net_b=net_b; cand.ev=cand.p_win*net_b-(1-cand.p_win)
+        return True
+
+    def suggest_stake(self, base:float, cand:Optional[Candidate]=None)->float:
+        # no jitter with streams: it would give every trade its own stream key
+        return streak_recovery_stake(base,self.loss_streak,self.balance,RECOVERY_MULTIPLIER,MAX_STAKE,
+                                     MAX_STAKE_PCT_BAL,MIN_STAKE,0.0 if USE_PROPOSAL_STREAMS else 0.05)
         
     # Decision loop with console log
     def decision_loop(self):
@@ -381,12 +447,19 @@ class DynamicOverUnderBot:
             time.sleep(0.2)
         print("[BOT] warmup complete, starting decision loop.")
         while True:
-            if time.time()-self.last_trade_ts<COOLDOWN:
-                time.sleep(0.01)
-                continue
-            if self._tick_count<self.pause_until_tick:
-                time.sleep(0.01)
-                continue
+            # one decision per new tick; ticks that came in meanwhile are coalesced
+            item=self.ticks.get(timeout=1.0)
+            if item is None: continue
+            t_tick,_=item
+            if time.time()-self.last_trade_ts<COOLDOWN: continue
+            if self._tick_count<self.pause_until_tick: continue
+            self.settlements.expire()
+            if self.settlements.in_flight()>=MAX_OPEN_CONTRACTS: continue
+            if self.ticks.expired(t_tick,MAX_TICK_AGE): continue
+            self.lat.maybe_report()
+            # stages: tick receipt -> dequeued (tick_age) -> eval -> proposal -> buy -> settle
+            tl=self.lat.timeline(SYMBOL,"overunder",t_tick)
+            tl.mark("tick_age")
             if self.start_balance is not None:
                 daily_pnl=self.balance-self.start_balance
                 if daily_pnl<=DAILY_SL or daily_pnl>=DAILY_TP:
@@ -394,80 +467,118 @@ class DynamicOverUnderBot:
                     self.stop()
                     return
 
-            cand=self.compute_stats_and_choose()
-            if cand is None:
-                time.sleep(0.05)
-                continue
-
-            stake=self.suggest_stake(BASE_STAKE,cand)
+            if PROPOSAL_FANOUT:
+                stake=self.suggest_stake(BASE_STAKE)
+                picked=self.scan_proposals(stake)
+                tl.mark("proposal")  # the fan-out prices while it evaluates, so eval lands here
+                if picked is None:
+                    time.sleep(0.05)
+                    continue
+                cand,prop=picked
+            else:
+                cand=self.compute_stats_and_choose()
+                tl.mark("eval")
+                if cand is None:
+                    time.sleep(0.05)
+                    continue
+                stake=self.suggest_stake(BASE_STAKE,cand)
+                prop=self.request_proposal(cand.side,cand.threshold,stake)
+                tl.mark("proposal")
+                if not prop or not self.apply_platform_ev(cand,prop,stake):
+                    time.sleep(0.01)
+                    continue
+            payout=cand.payout; net_b=cand.net_b; ev=cand.ev
 
             # Console log of the decision before buying
             print(f"[TRADE DECISION] Side: {cand.side.upper()} | Threshold: {cand.threshold} | "
                   f"P_win: {cand.p_win:.3f} | EV: {cand.ev:.3f} | Stake: ${stake:.2f} | "
                   f"Balance: ${self.balance:.2f} | Loss streak: {self.loss_streak}")
 
-            prop=self.request_proposal(cand.side,cand.threshold,stake)
-            if not prop:
-                time.sleep(0.01)
-                continue
-
-            payout=None
-            for f in ("payout","ask_price","quote"):
-                if f in prop:
-                    try: payout=float(prop[f]); break
-                    except: continue
-            if payout is None:
-                time.sleep(0.01)
-                continue
-
-            ask=prop.get("ask_price") or prop.get("price") or stake
-            try: ask=float(ask)
-            except: ask=stake
-            net_b=(payout-ask)/ask if ask>0 else 0.0
-            ev=cand.p_win*net_b-(1-cand.p_win)
-            cand.payout=payout; cand.net_b=net_b; cand.ev=ev
-
             if cand.ev<=self.current_min_ev:
                 time.sleep(0.01)
                 continue
 
-            cid=self.buy_proposal(prop,stake)
+            if self.ticks.expired(t_tick,MAX_TICK_AGE):
+                print("[SKIP] tick went stale while pricing")
+                continue
+            if USE_PROPOSAL_STREAMS:
+                # spend the id so the next trade waits for a fresh one
+                prop=self.book.take(self._book_key(cand.side,cand.threshold,stake)) or prop
+            cid=self.buy_proposal(cand,prop,stake)
+            tl.mark("buy")
             self.last_trade_ts=time.time()
 
             if cid:
+                tl.total("tick_to_buy")
                 profit_note="pending"
                 row=[time.time(),self.trade_no,cand.side,cand.threshold,stake,payout,
                      profit_note,cand.p_win,net_b,ev,self.balance,""]
-                self._log(row)
+                # a copy: the writer thread may still hold it when _on_settled fills in the profit
+                self._log(list(row))
                 self.trade_no+=1
+                # settled from the socket thread; decisions carry on meanwhile
+                self.settlements.track(cid,self._on_settled,(row,tl))
                 # add to rolling summary
                 self.last_trades.append(row)
                 self._print_rolling_summary()
 
-            time.sleep(0.05)
-
     def _print_rolling_summary(self):
         print("=== Rolling last trades summary ===")
         for t in list(self.last_trades)[-10:]:
-            print(f"{int(t[1])}: {t[2].upper()} T{t[3]} Stake:${t[4]:.2f} EV:{t[9]:.2f} Profit:{t[5]}")
+            print(f"{int(t[1])}: {t[2].upper()} T{t[3]} Stake:${t[4]:.2f} EV:{t[9]:.2f} Profit:{t[6]}")
+        r=self.requests.summary()
+        print(f"[REQ] avg wait {r['avg_wait_ms']:.1f}ms | max {r['max_wait_ms']:.1f}ms | "
+              f"last {r['last_wait_ms']:.1f}ms | timeouts {r['timeouts']} | failed {r['failed']}")
+        if USE_PROPOSAL_STREAMS:
+            b=self.book.summary()
+            print(f"[BOOK] streams {b['streams']} | updates {b['updates']} | hits {b['hits']} | misses {b['misses']}")
+        m=self.ticks.summary()
+        print(f"[TICKS] {m['mode']} | taken {m['taken']}/{m['posted']} | coalesced {m['coalesced']} | "
+              f"dropped {m['dropped']} | stale {m['stale']}")
+        s=self.settlements.summary()
+        print(f"[SETTLE] in flight {s['in_flight']} | settled {s['settled']} | expired {s['expired']} | "
+              f"avg lag {s['avg_lag_ms']:.0f}ms | max {s['max_lag_ms']:.0f}ms")
+        o=self.router.summary()
+        print(f"[ORDERS] proposal {o['proposal']['filled']}/{o['proposal']['sent']} ({o['proposal']['avg_rtt_ms']:.0f}ms) | "
+              f"direct {o['direct']['filled']}/{o['direct']['sent']} ({o['direct']['avg_rtt_ms']:.0f}ms)")
         print("===============================")
 
     # Start / Stop
     def start(self):
-        self.ws=websocket.WebSocketApp(self.ws_url,
-                                       on_open=self._on_open,
-                                       on_message=self._on_message,
-                                       on_error=self._on_error,
-                                       on_close=self._on_close)
-        self.thread_ws=threading.Thread(target=self.ws.run_forever,daemon=True)
-        self.thread_ws.start()
+        def make_ws():
+            self.ws=websocket.WebSocketApp(self.ws_url,
+                                           on_open=self._on_open,
+                                           on_message=self._on_message,
+                                           on_error=self._on_error,
+                                           on_close=self._on_close)
+            return self.ws
+        # reconnects with backoff; _on_open/authorize resubscribe on every new socket
+        self.supervisor=Supervisor(make_ws,self._on_down,Backoff(maximum=RECONNECT_MAX_DELAY))
+        self.thread_ws=self.supervisor.start()
         threading.Thread(target=self.decision_loop,daemon=True).start()
 
     def stop(self):
+        try:
+            if self.ws:
+                self.book.forget_all()
+                self.settlements.forget_all()
+        except: pass
+        if self.tick_writer:
+            self.tick_writer.close()
+            self.tick_writer = None
+        self.journal.close()
+        if self.cols:
+            self.cols.close()
+        if self.supervisor:
+            self.supervisor.stop()
+            print("[WS]", self.supervisor.summary())
         try:
             if self.ws:
                 self.ws.close()
         except: pass
+        print("[LATENCY]\n"+self.lat.report())
+        try: self.lat.dump()
+        except OSError as e: print("[LATENCY] dump failed:", e)
         print("[BOT] stopped.")
 
 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+aio_client.py
+
+asyncio transport for the Deriv WebSocket API, shared by all bots.
+- One reader task per connection; replies are routed by req_id to awaitable futures
+- Subscriptions (ticks, proposals, contracts) are async iterators; tick frames are
+  routed from frames.parse_tick without a full JSON parse
+- Bots run as coroutines on one event loop: no per-bot threads, locks or sleep pacing
+- pip install websockets
+"""
+
+import asyncio
+import json
+import sys
+from typing import Any, Dict, Optional
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from frames import FAST_TICKS, loads, parse_tick
+
+APP_ID = "PUT ID HERE"
+API_TOKEN = "PUT TOKEN HERE"
+WS_URL = f"wss://ws.derivws.com/websockets/v3?app_id={APP_ID}"
+
+_CLOSED = object()
+
+
+class ApiError(Exception):
+    def __init__(self, error: dict):
+        super().__init__(error.get("message") or str(error))
+        self.code = error.get("code")
+        self.error = error
+
+
+class Subscription:
+    """Async iterator over one server stream; the oldest item is dropped when the consumer lags."""
+
+    def __init__(self, client: "DerivAsyncClient", req_id: int, maxsize: int):
+        self.client = client
+        self.req_id = req_id
+        self.id: Optional[str] = None
+        self.dropped = 0
+        self._q: "asyncio.Queue[Any]" = asyncio.Queue(maxsize)
+
+    def _put(self, item: Any) -> None:
+        if self._q.full():
+            self._q.get_nowait()
+            self.dropped += 1
+        self._q.put_nowait(item)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        item = await self._q.get()
+        if item is _CLOSED:
+            raise StopAsyncIteration
+        if isinstance(item, ApiError):
+            raise item
+        return item
+
+    async def forget(self) -> None:
+        self.client._subs.pop(self.req_id, None)
+        if self.id:
+            try:
+                await self.client.send({"forget": self.id})
+            except Exception:
+                pass
+        self._put(_CLOSED)
+
+
+class DerivAsyncClient:
+    def __init__(self, url: str = WS_URL, token: Optional[str] = None, ping_interval: float = 25.0):
+        self.url = url
+        self.token = token
+        self.ping_interval = ping_interval
+        self.ws = None
+        self.authorize_info: Optional[dict] = None
+        self._req_id = 0
+        self._futures: Dict[int, asyncio.Future] = {}
+        self._subs: Dict[int, Subscription] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self) -> "DerivAsyncClient":
+        if websockets is None:
+            raise RuntimeError("pip install websockets")
+        self.ws = await websockets.connect(self.url, ping_interval=self.ping_interval, max_size=None)
+        self._reader = asyncio.create_task(self._read_loop())
+        if self.token:
+            self.authorize_info = await self.request({"authorize": self.token})
+        return self
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def next_req_id(self) -> int:
+        self._req_id += 1
+        return self._req_id
+
+    async def send(self, payload: dict) -> None:
+        await self.ws.send(json.dumps(payload))
+
+    async def request(self, payload: dict, timeout: float = 5.0) -> Any:
+        """Send one request and await the body of its reply (the field named by msg_type)."""
+        req_id = self.next_req_id()
+        payload["req_id"] = req_id
+        fut = asyncio.get_running_loop().create_future()
+        self._futures[req_id] = fut
+        try:
+            await self.send(payload)
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._futures.pop(req_id, None)
+
+    async def subscribe(self, payload: dict, maxsize: int = 1024) -> Subscription:
+        req_id = self.next_req_id()
+        payload["req_id"] = req_id
+        payload["subscribe"] = 1
+        sub = Subscription(self, req_id, maxsize)
+        self._subs[req_id] = sub
+        await self.send(payload)
+        return sub
+
+    async def ticks(self, symbol: str, maxsize: int = 1024) -> Subscription:
+        return await self.subscribe({"ticks": symbol}, maxsize)
+
+    def _dispatch(self, data: dict) -> None:
+        req_id = data.get("req_id")
+        sub = self._subs.get(req_id)
+        if sub is not None:
+            if data.get("error"):
+                self._subs.pop(req_id, None)
+                sub._put(ApiError(data["error"]))
+                return
+            if sub.id is None:
+                sub.id = (data.get("subscription") or {}).get("id")
+            sub._put(data.get(data.get("msg_type")) or data)
+            return
+        fut = self._futures.get(req_id)
+        if fut is None or fut.done():
+            return
+        if data.get("error"):
+            fut.set_exception(ApiError(data["error"]))
+        else:
+            fut.set_result(data.get(data.get("msg_type")))
+
+    async def _read_loop(self) -> None:
+        try:
+            async for raw in self.ws:
+                tick = parse_tick(raw) if FAST_TICKS and isinstance(raw, str) else None
+                if tick is not None and tick.req_id in self._subs:
+                    sub = self._subs[tick.req_id]
+                    if sub.id is None:
+                        sub.id = tick.sub_id
+                    sub._put(tick)
+                    continue
+                try:
+                    data = loads(raw)
+                except ValueError:
+                    continue
+                self._dispatch(data)
+        except Exception as e:
+            print("[AIO] reader stopped:", e)
+        finally:
+            err = ConnectionError("connection closed")
+            for fut in self._futures.values():
+                if not fut.done():
+                    fut.set_exception(err)
+            for sub in self._subs.values():
+                sub._put(_CLOSED)
+            self._subs.clear()
+
+    async def close(self) -> None:
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+async def run_bots(*coros) -> None:
+    """Run bot coroutines side by side on the current loop; the first failure stops them all."""
+    tasks = [asyncio.create_task(c) for c in coros]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def _print_ticks(client: DerivAsyncClient, symbol: str, n: int) -> None:
+    sub = await client.ticks(symbol)
+    async for tick in sub:
+        print(f"[{symbol}] {tick.get('epoch')} {tick.get('quote')}")
+        n -= 1
+        if n <= 0:
+            await sub.forget()
+            break
+
+
+async def _main() -> None:
+    async with DerivAsyncClient(WS_URL, API_TOKEN) as client:
+        await run_bots(_print_ticks(client, "R_10", 5), _print_ticks(client, "R_25", 5))
+
+
+if __name__ == "__main__":
+    if websockets is None:
+        print("pip install websockets")
+        sys.exit(1)
+    asyncio.run(_main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+backtest.py
+
+Offline tick-replay backtester for the digit strategies.
+- Streams recorded ticks (CSV "epoch,quote", packed binary "<qd" records or tickstore.py
+  .ticks archives) through
+  the same strategy code the bots run (strategies.py)
+- Simulated payout model (fair payout minus a house margin) and tick-exact settlement:
+  a d-tick contract bought on tick i settles on the last digit of tick i+d
+- Reports PnL, hit rate, max drawdown and replay speed
+
+usage: python backtest.py ticks.csv --strategy zscore --margin 0.05
+"""
+
+import argparse
+import csv
+import struct
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lastdigit import FILE_DECIMALS, DigitDecoder
+from strategies import (DynamicOverUnder, FixedBasket, InverseFrequencyMatch, OddEven, Order,
+                        TickStrategy, ZScoreOverUnder)
+from tickstore import TickReader
+
+Tick = Tuple[int, float, int]  # epoch, quote, digit
+
+BIN_RECORD = struct.Struct("<qd")
+
+
+def win_probability(contract_type: str, barrier: Optional[str]) -> float:
+    b = int(barrier) if barrier not in (None, "") else 0
+    if contract_type == "DIGITOVER": return (9 - b) / 10.0
+    if contract_type == "DIGITUNDER": return b / 10.0
+    if contract_type == "DIGITMATCH": return 0.1
+    if contract_type == "DIGITDIFF": return 0.9
+    if contract_type in ("DIGITODD", "DIGITEVEN"): return 0.5
+    raise ValueError(f"unsupported contract type {contract_type}")
+
+
+def wins(contract_type: str, barrier: Optional[str], digit: int) -> bool:
+    b = int(barrier) if barrier not in (None, "") else 0
+    if contract_type == "DIGITOVER": return digit > b
+    if contract_type == "DIGITUNDER": return digit < b
+    if contract_type == "DIGITMATCH": return digit == b
+    if contract_type == "DIGITDIFF": return digit != b
+    if contract_type == "DIGITODD": return digit & 1 == 1
+    if contract_type == "DIGITEVEN": return digit & 1 == 0
+    raise ValueError(f"unsupported contract type {contract_type}")
+
+
+class PayoutModel:
+    """payout = stake / p0 * (1 - margin), p0 being the contract's no-edge win probability."""
+
+    def __init__(self, margin: float = 0.05):
+        self.margin = margin
+        self._cache: Dict[Tuple[str, Optional[str]], float] = {}
+
+    def payout(self, order: Order) -> float:
+        key = (order.contract_type, order.barrier)
+        mult = self._cache.get(key)
+        if mult is None:
+            p0 = win_probability(order.contract_type, order.barrier)
+            mult = (1.0 - self.margin) / p0 if p0 > 0 else 0.0
+            self._cache[key] = mult
+        return order.stake * mult
+
+
+def read_csv(path: str) -> Iterator[Tuple[int, float]]:
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            try:
+                yield int(float(row[0])), float(row[1])
+            except (IndexError, ValueError):
+                continue  # header / junk line
+
+
+def read_bin(path: str, chunk: int = 1 << 16) -> Iterator[Tuple[int, float]]:
+    size = BIN_RECORD.size
+    with open(path, "rb") as f:
+        while True:
+            buf = f.read(size * chunk)
+            if not buf:
+                return
+            yield from BIN_RECORD.iter_unpack(buf[:len(buf) - len(buf) % size])
+
+
+def load_ticks(path: str, decimals: int = FILE_DECIMALS) -> Iterator[Tick]:
+    if path.endswith(".ticks"):
+        r = TickReader(path)
+        try:
+            yield from r.iter_ticks()
+        finally:
+            r.close()
+        return
+    src = read_bin(path) if path.endswith(".bin") else read_csv(path)
+    digit = DigitDecoder(decimals=decimals)
+    for epoch, quote in src:
+        yield epoch, quote, digit(quote)
+
+
+@dataclass
+class Report:
+    strategy: str
+    ticks: int = 0
+    trades: int = 0
+    wins: int = 0
+    skipped: int = 0
+    staked: float = 0.0
+    pnl: float = 0.0
+    max_drawdown: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.wins / self.trades if self.trades else 0.0
+
+    def format(self) -> str:
+        rate = self.ticks / self.seconds * 60 if self.seconds > 0 else 0.0
+        return (f"[{self.strategy}] ticks={self.ticks} trades={self.trades} skipped={self.skipped} "
+                f"hit={self.hit_rate*100:.2f}% staked={self.staked:.2f} pnl={self.pnl:+.2f} "
+                f"max_dd={self.max_drawdown:.2f} speed={rate/1e6:.2f}M ticks/min")
+
+
+class Backtest:
+    def __init__(self, strategy: TickStrategy, payout: Optional[PayoutModel] = None):
+        self.strategy = strategy
+        self.payout = payout or PayoutModel()
+
+    def run(self, ticks: Iterable[Tick]) -> Report:
+        strat = self.strategy
+        payout_of = self.payout.payout
+        rep = Report(strat.name)
+        pending: Dict[int, List[Tuple[Order, float]]] = {}
+        pnl = peak = max_dd = 0.0
+        i = -1
+        t0 = time.perf_counter()
+        for i, (epoch, quote, digit) in enumerate(ticks):
+            due = pending.pop(i, None)
+            if due:
+                for order, payout in due:
+                    profit = payout - order.stake if wins(order.contract_type, order.barrier, digit) else -order.stake
+                    if profit > 0: rep.wins += 1
+                    pnl += profit
+                    strat.on_settle(order, profit)
+                if pnl > peak: peak = pnl
+                elif peak - pnl > max_dd: max_dd = peak - pnl
+            for order in strat.on_tick(quote, digit, epoch):
+                payout = payout_of(order)
+                if order.min_payout is not None and payout < order.min_payout:
+                    rep.skipped += 1
+                    continue
+                rep.trades += 1
+                rep.staked += order.stake
+                pending.setdefault(i + order.duration, []).append((order, payout))
+        rep.seconds = time.perf_counter() - t0
+        rep.ticks = i + 1
+        rep.pnl = pnl
+        rep.max_drawdown = max_dd
+        return rep
+
+
+STRATEGIES = {
+    "zscore": ZScoreOverUnder,
+    "overunder": DynamicOverUnder,
+    "match": InverseFrequencyMatch,
+    "oddeven": OddEven,
+    "basket": FixedBasket,
+}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline tick-replay backtester for the digit strategies.")
+    ap.add_argument("ticks", help="tick file (.csv epoch,quote, .bin packed <qd or .ticks archive)")
+    ap.add_argument("--strategy", choices=sorted(STRATEGIES), action="append",
+                    help="repeat for several; default: all")
+    ap.add_argument("--margin", type=float, default=0.05, help="house margin of the payout model")
+    ap.add_argument("--decimals", type=int, default=FILE_DECIMALS,
+                    help="quote decimals (pip size) of .csv/.bin input (default: R_10's 3); .ticks files carry their own")
+    args = ap.parse_args()
+    for name in args.strategy or sorted(STRATEGIES):
+        ticks = load_ticks(args.ticks, args.decimals)
+        print(Backtest(STRATEGIES[name](), PayoutModel(args.margin)).run(ticks).format())
+
+
+if __name__ == "__main__":
+    main()
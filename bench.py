@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+bench.py
+
+End-to-end throughput and latency benchmark of every bot, with no network and no token.
+- Each bot runs through its usual WebSocketApp / Supervisor path, one bot per process;
+  websocket.WebSocketApp is swapped for LoopbackApp, whose run_forever() is the
+  exchange: a seeded mockderiv market plus mockderiv.Session's replies
+- Per bot: ticks/s the socket thread can absorb (ticks over its CPU time in on_message),
+  on_message time per frame type, tick -> order latency (first proposal or buy sent
+  after a tick), strategy scan time, process CPU per tick (the exchange's own CPU taken
+  out) and RSS growth over the second half of the run
+- Results go to one JSON file; --compare old.json prints the change per metric and exits 1
+  on a regression beyond --tolerance, so a slower on_message or scan fails before deploy
+
+usage: python bench.py --ticks 5000 --rate 500 --out bench.json
+       python bench.py --compare bench.json
+       python bench.py --only Trader,Bot2
+pip install websocket-client
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from latency import Histogram
+from mockderiv import MockServer, Session, dumps
+from supervisor import Supervisor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (script, config overrides that keep the bot trading for the whole run)
+TARGETS: Dict[str, tuple] = {
+    "Trader": ("Bot.py", {}),
+    "DynamicOverUnderBot": ("Bot3.py", {"DAILY_TP": 1e9, "DAILY_SL": -1e9}),
+    "DynamicOddEvenBot": ("Bot3.3.py", {}),
+    "Bot2": ("Bot2.py", {}),
+    "Bot.A": ("Bot.A.py", {}),
+    "Bot3.2": ("Bot3.2.py", {}),
+}
+# metric path -> +1 when higher is better, -1 when lower is better
+COMPARED = {
+    ("ticks_per_s",): +1,
+    ("cpu_us_per_tick",): -1,
+    ("on_message", "tick", "p50_ms"): -1,
+    ("tick_to_order", "p50_ms"): -1,
+    ("scan", "p50_ms"): -1,
+    ("rss_kb", "growth_per_10k_ticks"): -1,
+}
+RSS_SLACK_KB = 1024     # RSS moves by whole pages and allocator arenas; smaller changes are noise
+
+
+def rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # peak, not current, off Linux
+
+
+class _Session(Session):
+    """mockderiv.Session that hands its frames to the bench loop instead of a socket."""
+
+    def __init__(self, server: MockServer, inbox: deque):
+        super().__init__(server, None)
+        self.inbox = inbox
+
+    def emit(self, frame: dict) -> None:
+        self.inbox.append((frame.get("msg_type", ""), dumps(frame)))
+
+
+class Bench:
+    def __init__(self, ticks: int, rate: float, seed: int, symbol: str = "R_10"):
+        self.ticks = ticks
+        self.rate = rate
+        self.server = MockServer([symbol], seed=seed, balance=1e9)
+        self.market = self.server.markets[symbol]
+        self.inbox: deque = deque()                 # exchange -> bot
+        self.outbox: queue.SimpleQueue = queue.SimpleQueue()   # bot -> exchange, (sent at, raw)
+        self.session = _Session(self.server, self.inbox)
+        self.on_message: Dict[str, Histogram] = {}
+        self.tick_to_order = Histogram()
+        self.scan = Histogram()
+        self.busy = {"tick": 0.0}
+        self.delivered = 0
+        self.orders = 0
+        self.exchange_cpu = 0.0
+        self.rss = []
+        self.last_tick_at: Optional[float] = None
+        self.started = self.finished = None
+        self.done = threading.Event()
+        self.closed = threading.Event()
+
+    def timed(self, owner, name: str) -> None:
+        """Wrap owner.name so every call is recorded as a strategy scan."""
+        fn = getattr(owner, name)
+        scan = self.scan
+
+        def wrapper(*a, **kw):
+            t = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                scan.record(int((time.perf_counter() - t) * 1e6))
+        setattr(owner, name, wrapper)
+
+    # exchange side, all on the bot's socket thread
+    def _deliver(self, app, kind: str, text: str) -> None:
+        c = time.thread_time()
+        t = time.perf_counter()
+        if kind == "tick":
+            self.last_tick_at = t
+            self.delivered += 1
+        try:
+            app.on_message(app, text)
+        except Exception as e:
+            app.on_error(app, e)
+        dt = time.perf_counter() - t
+        h = self.on_message.get(kind)
+        if h is None:
+            h = self.on_message[kind] = Histogram()
+        h.record(int(dt * 1e6))
+        # CPU, not wall time: waiting for the GIL held by a decision thread is not on_message's cost
+        self.busy[kind] = self.busy.get(kind, 0.0) + time.thread_time() - c
+
+    def _request(self, sent_at: float, raw: str) -> None:
+        c = time.thread_time()
+        try:
+            req = json.loads(raw)
+        except ValueError:
+            return
+        if "buy" in req or ("proposal" in req and "contract_type" in req):
+            self.orders += 1
+            if self.last_tick_at is not None and sent_at >= self.last_tick_at:
+                self.tick_to_order.record(int((sent_at - self.last_tick_at) * 1e6))
+                self.last_tick_at = None
+        self.session.handle(req)
+        self.exchange_cpu += time.thread_time() - c
+
+    def _serve(self, app, until: float = 0.0) -> None:
+        """Deliver queued frames and answer requests until nothing is left and until has passed."""
+        while True:
+            while self.inbox:
+                kind, text = self.inbox.popleft()
+                self._deliver(app, kind, text)
+            wait = until - time.perf_counter()
+            try:
+                item = self.outbox.get(timeout=wait) if wait > 0 else self.outbox.get_nowait()
+            except queue.Empty:
+                return
+            self._request(*item)
+
+    def loop(self, app) -> None:
+        """LoopbackApp.run_forever(): the market runs once, then the socket idles until close()."""
+        app.on_open(app)
+        if self.started is None:
+            deadline = time.perf_counter() + 10.0
+            while not self.session.tick_subs and time.perf_counter() < deadline:
+                self._serve(app, time.perf_counter() + 0.01)
+            self._run_market(app)
+            self.done.set()
+        while not self.closed.is_set():
+            self._serve(app, time.perf_counter() + 0.05)
+        app.on_close(app, 1000, "bench finished")
+
+    def _run_market(self, app) -> None:
+        period = 1.0 / self.rate if self.rate else 0.0
+        sample_every = max(1, self.ticks // 10)
+        self.rss.append(rss_kb())
+        self.started = (time.perf_counter(), time.process_time())
+        next_at = time.perf_counter()
+        for i in range(1, self.ticks + 1):
+            if period:
+                next_at += period
+                self._serve(app, next_at)
+            c = time.thread_time()
+            epoch, quote = self.market.step()
+            self.session.on_tick(self.market, epoch, quote)
+            self.exchange_cpu += time.thread_time() - c
+            self._serve(app)
+            if i % sample_every == 0:
+                self.rss.append(rss_kb())
+        self._serve(app, time.perf_counter() + 0.2)    # replies and settlements still in flight
+        self.finished = (time.perf_counter(), time.process_time())
+
+    def result(self) -> dict:
+        wall = self.finished[0] - self.started[0]
+        cpu = self.finished[1] - self.started[1] - self.exchange_cpu
+        n = max(1, self.delivered)
+        tail = self.rss[len(self.rss) // 2:]     # second half only: caches and buffers fill up first
+        span = max(1, (len(tail) - 1) * max(1, self.ticks // 10))
+        return {
+            "ticks": self.delivered,
+            "wall_s": round(wall, 3),
+            "fed_per_s": round(self.delivered / wall, 1) if wall else 0.0,
+            "ticks_per_s": round(self.delivered / self.busy["tick"], 1) if self.busy["tick"] else 0.0,
+            "cpu_us_per_tick": round(cpu / n * 1e6, 2),
+            "orders": self.orders,
+            "bought": self.server.bought,
+            "settled": self.server.settled,
+            "on_message": {k: h.stats() for k, h in sorted(self.on_message.items())},
+            "tick_to_order": self.tick_to_order.stats(),
+            "scan": self.scan.stats(),
+            "rss_kb": {"start": self.rss[0], "end": self.rss[-1], "series": self.rss,
+                       "growth_per_10k_ticks": round((tail[-1] - tail[0]) * 10000 / span, 1)},
+        }
+
+
+class LoopbackApp:
+    """websocket.WebSocketApp stand-in; run_forever() runs the bench exchange."""
+    bench: Optional[Bench] = None
+
+    def __init__(self, url="", on_open=None, on_message=None, on_error=None, on_close=None, **_):
+        self.url = url
+        self.on_open = on_open or (lambda ws: None)
+        self.on_message = on_message
+        self.on_error = on_error or (lambda ws, e: None)
+        self.on_close = on_close or (lambda ws, code, reason: None)
+
+    def send(self, raw: str) -> None:
+        self.bench.outbox.put((time.perf_counter(), raw))
+
+    def close(self) -> None:
+        self.bench.closed.set()
+
+    def run_forever(self, **_) -> None:
+        self.bench.loop(self)
+
+
+def _start(name: str, M, bench: Bench) -> Callable[[], None]:
+    """Start the bot the way its __main__ does; returns its stop()."""
+    if name == "Trader":
+        bot = M.Trader()
+        bench.timed(bot.strategy, "candidates")
+        bench.timed(bot.strategy, "find_best")
+        bot.start()
+        return bot.stop
+    if name == "DynamicOverUnderBot":
+        bot = M.DynamicOverUnderBot("bench")
+        bench.timed(bot, "compute_candidates")
+        bot.start()
+        return bot.stop
+    if name == "DynamicOddEvenBot":
+        bot = M.DynamicOddEvenBot("bench")
+        bench.timed(bot.stats, "snapshot")
+        bot.connect()
+        return bot.supervisor.stop
+    if name == "Bot2":
+        bench.timed(M, "select_digit_probability")
+    sup = Supervisor(lambda: LoopbackApp("", on_open=M.on_open, on_message=M.on_message,
+                                         on_error=M.on_error, on_close=M.on_close))
+    sup.start()
+    return sup.stop
+
+
+def run_one(name: str, ticks: int, rate: float, seed: int) -> dict:
+    """Runs in the child process, from a scratch directory (the bots write journals to cwd)."""
+    try:
+        import websocket
+    except ImportError:
+        return {"error": "pip install websocket-client"}
+    script, overrides = TARGETS[name]
+    bench = LoopbackApp.bench = Bench(ticks, rate, seed)
+    websocket.WebSocketApp = LoopbackApp
+    spec = importlib.util.spec_from_file_location("bench_" + name.replace(".", "_"), os.path.join(HERE, script))
+    M = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(M)
+    for key, value in overrides.items():
+        setattr(M, key, value)
+    stop = _start(name, M, bench)
+    if not bench.done.wait(ticks / rate + 120.0 if rate else 600.0):
+        return {"error": "timed out"}
+    out = bench.result()
+    try:
+        stop()
+    except Exception as e:
+        out["stop_error"] = str(e)
+    bench.closed.set()
+    return out
+
+
+def _child(args) -> None:
+    real_stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")     # the bots print every trade
+    try:
+        out = run_one(args.child, args.ticks, args.rate, args.seed)
+    except Exception as e:
+        out = {"error": f"{type(e).__name__}: {e}"}
+    with open(args.result, "w") as f:
+        json.dump(out, f)
+    real_stdout.flush()
+    os._exit(0)     # the bots' daemon threads are not worth a clean shutdown
+
+
+def _metric(row: dict, path: tuple):
+    for key in path:
+        if not isinstance(row, dict) or key not in row:
+            return None
+        row = row[key]
+    return row
+
+
+def compare(new: dict, old: dict, tolerance: float) -> list:
+    """[(bot, metric, old, new, regressed)] for every metric present in both runs."""
+    rows = []
+    for name, cur in new["bots"].items():
+        base = old.get("bots", {}).get(name)
+        if not base or "error" in cur or "error" in base:
+            continue
+        for path, sign in COMPARED.items():
+            a, b = _metric(base, path), _metric(cur, path)
+            if a is None or b is None or (a == 0 and b == 0):
+                continue
+            if path[0] == "rss_kb":
+                worse = b - a > RSS_SLACK_KB
+            elif sign > 0:
+                worse = b < a / (1.0 + tolerance)
+            else:
+                worse = b > a * (1.0 + tolerance)
+            rows.append((name, ".".join(path), a, b, worse))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="End-to-end benchmark of the bots against an in-process exchange.")
+    ap.add_argument("--ticks", type=int, default=5000)
+    ap.add_argument("--rate", type=float, default=500.0, help="ticks per second fed to each bot (0: as fast as possible)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--only", default="", help="comma separated bot names")
+    ap.add_argument("--out", default="", help="results JSON (default bench.json, or none with --compare)")
+    ap.add_argument("--compare", default="", help="baseline JSON to check this run against")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown before failing")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--result", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return _child(args)
+
+    names = [n for n in args.only.split(",") if n] or list(TARGETS)
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        ap.error(f"unknown bot(s) {', '.join(unknown)}; choose from {', '.join(TARGETS)}")
+    report = {"meta": {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                       "platform": platform.platform(), "ticks": args.ticks, "rate": args.rate, "seed": args.seed},
+              "bots": {}}
+    print(f"{'bot':<20} {'ticks':>6} {'ticks/s':>10} {'cpu us/tick':>11} {'on_msg p50':>10} "
+          f"{'order p50':>10} {'order p99':>10} {'scan p50':>9} {'rss +kB/10k':>11}")
+    for name in names:
+        with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+            result = os.path.join(scratch, "result.json")
+            cmd = [sys.executable, os.path.abspath(__file__), "--child", name, "--result", result,
+                   "--ticks", str(args.ticks), "--rate", str(args.rate), "--seed", str(args.seed)]
+            proc = subprocess.run(cmd, cwd=scratch, capture_output=True, text=True)
+            try:
+                with open(result) as f:
+                    row = json.load(f)
+            except (OSError, ValueError):
+                row = {"error": (proc.stderr.strip().splitlines() or ["no result"])[-1]}
+        report["bots"][name] = row
+        if "error" in row:
+            print(f"{name:<20} error: {row['error']}")
+            continue
+        tick = row["on_message"].get("tick", {})
+        print(f"{name:<20} {row['ticks']:>6} {row['ticks_per_s']:>10.0f} {row['cpu_us_per_tick']:>11.1f} "
+              f"{tick.get('p50_ms', 0) * 1000:>8.1f}us {row['tick_to_order']['p50_ms']:>8.2f}ms "
+              f"{row['tick_to_order']['p99_ms']:>8.2f}ms {row['scan']['p50_ms'] * 1000:>7.1f}us "
+              f"{row['rss_kb']['growth_per_10k_ticks']:>11.0f}")
+
+    failed = False
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        print(f"\n[COMPARE] against {args.compare} (tolerance {args.tolerance:.0%})")
+        for name, metric, a, b, worse in compare(report, old, args.tolerance):
+            change = (b - a) / a * 100.0 if a else float("inf")
+            print(f"  {'REGRESSION' if worse else 'ok':<10} {name:<20} {metric:<28} {a:>12.4g} -> {b:<12.4g} ({change:+.0f}%)")
+            failed |= worse
+    out = args.out or ("" if args.compare else "bench.json")
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print("\n[BENCH] written to", out)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+bench_digits.py
+
+Correctness and speed of the last-digit decoders in lastdigit.py against the string
+scans the bots used before.
+- Quotes are random decimals at the given pip size; the reference digit comes from the
+  exact decimal text
+- Reports ns per quote and how often each old variant gave the wrong digit
+- digit_from_text is also checked against last_digit on text it has to round: more
+  decimals than the pip size, and whole-number pip sizes; any mismatch exits 1
+
+usage: python bench_digits.py --decimals 3 --n 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from lastdigit import FILE_DECIMALS, digit_from_text, digits_array, digits_batch, last_digit
+
+
+def scan_2f(q):  # Bot.py / Bot3.py
+    s = f"{q:.2f}"
+    for ch in reversed(s):
+        if ch.isdigit(): return int(ch)
+    return None
+
+def scan_repr(q):  # Bot3.3.py
+    s = f"{q}"
+    for ch in reversed(s):
+        if ch.isdigit(): return int(ch)
+    return 0
+
+def str_last(q):  # Bot2.py
+    try: return int(str(q)[-1])
+    except ValueError: return None
+
+
+def make_quotes(n: int, decimals: int, seed: int = 1):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        whole = rng.randint(100, 99999)
+        frac = rng.randrange(10 ** decimals)
+        texts.append(f"{whole}.{frac:0{decimals}d}")
+    # JSON encoders drop trailing zeros
+    sent = [t.rstrip("0").rstrip(".") if "." in t else t for t in texts]
+    return [float(t) for t in texts], sent, [int(t[-1]) for t in texts]
+
+
+def text_mismatches(n: int, seed: int = 2):
+    """digit_from_text vs last_digit on quotes with 0-3 more decimals than the pip size."""
+    rng = random.Random(seed)
+    bad = []
+    for _ in range(n):
+        dec = rng.randrange(5)
+        extra = rng.randrange(4)
+        whole = rng.randint(0, 99999)
+        text = f"{whole}.{rng.randrange(10 ** (dec + extra)):0{dec + extra}d}" if dec + extra else str(whole)
+        if digit_from_text(text, dec) != last_digit(float(text), dec):
+            bad.append((text, dec))
+    return bad
+
+
+def timed(fn, n):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) / n * 1e9
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the last-digit decoders.")
+    ap.add_argument("--decimals", type=int, default=FILE_DECIMALS)
+    ap.add_argument("--n", type=int, default=200000)
+    args = ap.parse_args()
+    dec = args.decimals
+    quotes, texts, ref = make_quotes(args.n, dec)
+    n = len(quotes)
+
+    rows = [
+        ("f'{q:.2f}' scan (old Bot.py/Bot3.py)", lambda: [scan_2f(q) for q in quotes]),
+        ("f'{q}' scan (old Bot3.3.py)", lambda: [scan_repr(q) for q in quotes]),
+        ("str(q)[-1] (old Bot2.py)", lambda: [str_last(q) for q in quotes]),
+        ("last_digit(q, decimals)", lambda: [last_digit(q, dec) for q in quotes]),
+        ("digit_from_text(raw json)", lambda: [digit_from_text(t, dec) for t in texts]),
+        ("digits_batch(quotes)", lambda: digits_batch(quotes, dec)),
+    ]
+    try:
+        import numpy as np
+        arr = np.asarray(quotes)
+        rows.append(("digits_array(ndarray)", lambda: digits_array(arr, dec).tolist()))
+    except Exception:
+        print("numpy not installed; skipping digits_array")
+
+    base = None
+    print(f"{n} quotes at {dec} decimals")
+    for name, fn in rows:
+        out, ns = timed(fn, n)
+        wrong = sum(1 for a, b in zip(out, ref) if a != b)
+        base = base or ns
+        print(f"{name:<38} {ns:8.1f} ns/quote  x{base / ns:5.2f}  wrong={wrong / n * 100:6.2f}%")
+
+    bad = text_mismatches(min(n, 100000))
+    print(f"digit_from_text vs last_digit on extra decimals: {len(bad)} mismatches {bad[:5] if bad else ''}")
+    if bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
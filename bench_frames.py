@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+bench_frames.py
+
+Per-frame decode cost of frames.classify against the plain json.loads the handlers used.
+- Tick frames in the server's compact layout, plus a proposal frame for the slow path
+- Runs the json regex fast path and, when installed, the orjson backend
+
+usage: python bench_frames.py --n 200000
+"""
+
+import argparse
+import json
+import timeit
+
+import frames
+
+TICK = json.dumps({
+    "echo_req": {"req_id": 7, "subscribe": 1, "ticks": "R_10"}, "msg_type": "tick", "req_id": 7,
+    "subscription": {"id": "c84a793b-8a87-7999-ce10-9b22f7ceead3"},
+    "tick": {"ask": 6543.212, "bid": 6543.012, "epoch": 1700000000, "id": "c84a793b-8a87-7999-ce10-9b22f7ceead3",
+             "pip_size": 3, "quote": 6543.112, "symbol": "R_10"}}, separators=(",", ":"))
+PROPOSAL = json.dumps({
+    "echo_req": {"amount": 1, "basis": "stake", "contract_type": "DIGITOVER", "barrier": "4", "currency": "USD",
+                 "duration": 1, "duration_unit": "t", "proposal": 1, "symbol": "R_10", "req_id": 9},
+    "msg_type": "proposal", "req_id": 9,
+    "proposal": {"ask_price": 1, "display_value": "1.00", "id": "2b88e20f-f976-a380-904d-04db08e10eeb",
+                 "longcode": "Win payout if the last digit of Volatility 10 Index is strictly higher than 4.",
+                 "payout": 1.9, "spot": 6543.112, "spot_time": 1700000000}}, separators=(",", ":"))
+
+
+def old_handler(raw):
+    data = json.loads(raw)
+    if "error" in data and data["error"]: return None
+    if "tick" in data: return data["tick"].get("quote")
+    return data.get("msg_type")
+
+
+def new_handler(raw):
+    msg, data = frames.classify(raw)
+    if msg == "tick": return data.get("quote")
+    return msg
+
+
+def best(fn, n, repeat=5):
+    """ns per call of the fastest of repeat runs; single runs vary by 10-15% here."""
+    return min(timeit.repeat(fn, number=max(1, n // repeat), repeat=repeat)) / max(1, n // repeat) * 1e9
+
+
+def run(n):
+    out = {}
+    for label, raw in (("tick", TICK), ("proposal", PROPOSAL)):
+        out[label] = [("json.loads + key checks", best(lambda: old_handler(raw), n))]
+        frames.loads, frames.FAST_TICKS = json.loads, True
+        out[label].append(("classify (json, fast ticks)", best(lambda: new_handler(raw), n)))
+        if frames.orjson is not None:
+            frames.loads, frames.FAST_TICKS = frames.orjson.loads, False
+            out[label].append(("classify (orjson)", best(lambda: new_handler(raw), n)))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark inbound frame decoding.")
+    ap.add_argument("--n", type=int, default=200000)
+    args = ap.parse_args()
+    backend = (frames.loads, frames.FAST_TICKS)
+    try:
+        res = run(args.n)
+    finally:
+        frames.loads, frames.FAST_TICKS = backend
+    if frames.orjson is None:
+        print("orjson not installed (pip install orjson); json backend only")
+    for label, rows in res.items():
+        base = rows[0][1]
+        print(f"{label} frame")
+        for name, ns in rows:
+            print(f"  {name:<30} {ns:8.0f} ns/frame  x{base / ns:5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+check_digits.py
+
+Equivalence check of the incremental digit statistics against a plain recomputation.
+- Replays a seeded random-walk quote stream, digits from lastdigit.last_digit, through
+  DigitStats and FeatureEngine and keeps the same digits in a list
+- At every checkpoint each window's snapshot (n, counts, prefix, odd, tails) and last()
+  must equal what the list tail gives; checkpoints fall on a fixed stride and on every
+  tick around a ring wrap, where the negative ring index takes over
+- FeatureEngine adds parity flips, digit repeats and streaks recounted from the list, and
+  its EWMA against an unscaled per-tick update; horizon 2 halves the shared scale every
+  tick, so the renormalization path runs too
+- clear() followed by extend() must give the same state as a fresh object
+- Any mismatch is printed and exits 1, so ring arithmetic changes can be re-verified
+
+usage: python check_digits.py --ticks 20000 --windows 7,50,300 --horizons 2,25,500,5000 --seed 1
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Sequence
+
+from digitstats import DigitStats
+from features import FeatureEngine
+from lastdigit import last_digit
+
+
+def make_digits(n: int, decimals: int = 3, seed: int = 1) -> List[int]:
+    rng = random.Random(seed)
+    q = 1000.0 + rng.random() * 9000.0
+    out = []
+    for _ in range(n):
+        q = round(q + rng.gauss(0.0, q * 1e-4), decimals)
+        out.append(last_digit(q, decimals))
+    return out
+
+
+def checkpoints(n: int, capacity: int, every: int) -> set:
+    """Ticks (1-based counts) to compare at: a stride, plus both sides of each ring wrap."""
+    at = set(range(1, n + 1, every)) | {n}
+    for k in range(capacity, n + 1, capacity):
+        at.update((k - 1, k, k + 1, k + 2))
+    return at
+
+
+def compare_stats(st: DigitStats, history: List[int], where: str) -> List[str]:
+    bad = []
+    for w in st.windows:
+        tail = history[-w:]
+        sn = st.snapshot(w)
+        want = [tail.count(k) for k in range(10)]
+        if sn.n != len(tail) or sn.counts != want:
+            bad.append(f"{where} window {w}: n/counts {sn.n} {sn.counts} != {len(tail)} {want}")
+        if sn.prefix != [sum(1 for x in tail if x < k) for k in range(11)]:
+            bad.append(f"{where} window {w}: prefix {sn.prefix}")
+        if sn.odd != sum(x & 1 for x in tail):
+            bad.append(f"{where} window {w}: odd {sn.odd}")
+        if tail and any(sn.p_over(t) != sum(1 for x in tail if x > t) / len(tail) for t in range(9)):
+            bad.append(f"{where} window {w}: p_over")
+        if st.last(w) != tail:
+            bad.append(f"{where} window {w}: last() differs from the history tail")
+    return bad
+
+
+def check_digitstats(digits: Sequence[int], windows: Sequence[int], every: int) -> List[str]:
+    st = DigitStats(windows)
+    at = checkpoints(len(digits), st.capacity, every)
+    history: List[int] = []
+    bad = []
+    for i, d in enumerate(digits, 1):
+        st.push(d)
+        history.append(d)
+        if i in at:
+            bad += compare_stats(st, history, f"tick {i}")
+    # a reused object must not remember anything from before clear()
+    cut = min(len(digits), 2 * st.capacity + 3)
+    st.clear()
+    st.extend(digits[:cut])
+    bad += compare_stats(st, list(digits[:cut]), "clear+extend")
+    return bad
+
+
+def _streak(history: List[int], same) -> int:
+    n = 1 if history else 0
+    for k in range(len(history) - 1, 0, -1):
+        if not same(history[k - 1], history[k]):
+            break
+        n += 1
+    return n
+
+
+def _ewma_push(ewma: dict, d: int) -> None:
+    """The textbook update, ten products per horizon per tick."""
+    for w, ew in ewma.items():
+        a = 1.0 / w
+        for k in range(10):
+            ew[k] *= 1.0 - a
+        ew[d] += a
+
+
+def compare_features(fe: FeatureEngine, history: List[int], ewma: dict, where: str) -> List[str]:
+    bad = compare_stats(fe, history, where)
+    for w in fe.windows:
+        tail = history[-w:]
+        pairs = list(zip(tail, tail[1:]))
+        f = fe.features(w)
+        flips = sum((a ^ b) & 1 for a, b in pairs)
+        repeats = sum(1 for a, b in pairs if a == b)
+        if f.flips != flips or f.repeats != repeats:
+            bad.append(f"{where} horizon {w}: flips/repeats {f.flips} {f.repeats} != {flips} {repeats}")
+        mass = sum(ewma[w])
+        want = [v / mass for v in ewma[w]] if mass > 0 else [0.1] * 10
+        if max(abs(a - b) for a, b in zip(f.ewma, want)) > 1e-9:
+            bad.append(f"{where} horizon {w}: ewma {f.ewma} != {want}")
+    streaks = (_streak(history, lambda a, b: a == b), _streak(history, lambda a, b: (a ^ b) & 1 == 0),
+               _streak(history, lambda a, b: (a >= 5) == (b >= 5)))
+    if (fe.streak, fe.parity_streak, fe.half_streak) != streaks:
+        bad.append(f"{where}: streaks {(fe.streak, fe.parity_streak, fe.half_streak)} != {streaks}")
+    if len(fe.vector()) != len(fe.names()):
+        bad.append(f"{where}: vector() and names() differ in length")
+    return bad
+
+
+def check_features(digits: Sequence[int], horizons: Sequence[int], every: int) -> List[str]:
+    fe = FeatureEngine(horizons)
+    at = checkpoints(len(digits), fe.capacity, every)
+    history: List[int] = []
+    ewma = {w: [0.0] * 10 for w in fe.windows}
+    bad = []
+    for i, d in enumerate(digits, 1):
+        fe.push(d)
+        history.append(d)
+        _ewma_push(ewma, d)
+        if i in at:
+            bad += compare_features(fe, history, ewma, f"tick {i}")
+    cut = min(len(digits), 2 * fe.capacity + 3)
+    fe.clear()
+    fe.extend(digits[:cut])
+    ewma = {w: [0.0] * 10 for w in fe.windows}
+    for d in digits[:cut]:
+        _ewma_push(ewma, d)
+    bad += compare_features(fe, list(digits[:cut]), ewma, "clear+extend")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check DigitStats and FeatureEngine against a plain recomputation.")
+    ap.add_argument("--ticks", type=int, default=20000)
+    ap.add_argument("--windows", default="7,50,300")
+    ap.add_argument("--horizons", default="2,25,500,5000")
+    ap.add_argument("--every", type=int, default=97, help="stride between checkpoints, in ticks")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    windows = [int(w) for w in args.windows.split(",")]
+    digits = make_digits(args.ticks, seed=args.seed)
+
+    bad = check_digitstats(digits, windows, args.every)
+    st = DigitStats(windows)
+    t0 = time.perf_counter()
+    st.extend(digits)
+    ns = (time.perf_counter() - t0) / len(digits) * 1e9
+    print(f"DigitStats {windows}: {len(digits)} ticks, {len(bad)} mismatches, {ns:.0f} ns/push")
+
+    horizons = [int(h) for h in args.horizons.split(",")]
+    bad_fe = check_features(digits, horizons, args.every)
+    fe = FeatureEngine(horizons)
+    t0 = time.perf_counter()
+    fe.extend(digits)
+    ns = (time.perf_counter() - t0) / len(digits) * 1e9
+    print(f"FeatureEngine {horizons}: {len(digits)} ticks, {len(bad_fe)} mismatches, {ns:.0f} ns/push")
+    bad += bad_fe
+
+    for line in bad[:20]:
+        print("  " + line)
+    if bad:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+coljournal.py
+
+Columnar trade journal: typed NumPy columns in chunked .npz files, one directory per bot.
+- Columns: ts, side, threshold, stake, payout, profit, p_hat, z, ev, balance
+  (missing values are NaN / -1 / "")
+- ColumnarJournal runs on the journal.py writer thread; rows (dicts) are buffered and
+  written as one chunk-NNNNNN.npz per chunk_rows rows (or max_chunk_age seconds)
+- load() concatenates every chunk, optionally filtered by ts, into one dict of arrays
+- from_csv() converts the old CSV journals (Bot.py, Bot3.py, Bot3.3.py layouts)
+- The bots write one through open_journal(), which is a no-op without numpy
+
+usage: python coljournal.py convert trades_log.csv journal/zscore
+       python coljournal.py show journal/zscore
+pip install numpy
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from journal import JournalWriter
+
+COLUMNS = [
+    ("ts", "f8"), ("side", "U16"), ("threshold", "i1"), ("stake", "f8"), ("payout", "f8"),
+    ("profit", "f8"), ("p_hat", "f8"), ("z", "f8"), ("ev", "f8"), ("balance", "f8"),
+]
+_MISSING = {"f8": float("nan"), "i1": -1, "U16": ""}
+DTYPES = dict(COLUMNS)
+
+
+def _convert(name: str, value):
+    kind = DTYPES[name]
+    if value is None or value == "":
+        return _MISSING[kind]
+    if kind == "U16":
+        return str(value)
+    try:
+        return int(value) if kind == "i1" else float(value)
+    except (TypeError, ValueError):
+        return _MISSING[kind]
+
+
+def to_columns(rows: List[dict]) -> Dict[str, "np.ndarray"]:
+    return {name: np.array([_convert(name, r.get(name)) for r in rows], dtype=kind) for name, kind in COLUMNS}
+
+
+def chunk_paths(root: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(root, "chunk-*.npz")))
+
+
+class ColumnarJournal(JournalWriter):
+    def __init__(self, root: str, chunk_rows: int = 4096, max_chunk_age: float = 60.0, **kw):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.max_chunk_age = max_chunk_age
+        self.chunks = 0
+        self._rows: List[dict] = []
+        self._since = 0.0
+        existing = chunk_paths(root)
+        self._seq = int(os.path.basename(existing[-1])[6:12]) + 1 if existing else 1
+        kw.setdefault("rotate_bytes", None)
+        super().__init__(root, **kw)
+
+    def _write(self, rows) -> None:
+        if not self._rows:
+            self._since = time.monotonic()
+        self._rows.extend(rows)
+        self.written += len(rows)
+        self.batches += 1
+        while len(self._rows) >= self.chunk_rows:
+            self._flush_chunk(self._rows[:self.chunk_rows])
+            self._rows = self._rows[self.chunk_rows:]
+
+    def _idle(self) -> None:
+        if self._rows and time.monotonic() - self._since >= self.max_chunk_age:
+            self._flush_chunk(self._rows)
+            self._rows = []
+
+    def _finish(self) -> None:
+        if self._rows:
+            self._flush_chunk(self._rows)
+            self._rows = []
+
+    def _flush_chunk(self, rows: List[dict]) -> None:
+        path = os.path.join(self.root, f"chunk-{self._seq:06d}.npz")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **to_columns(rows))
+            f.flush()
+            if self.fsync != "never":
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._seq += 1
+        self.chunks += 1
+
+
+def open_journal(root: str, **kw) -> Optional[ColumnarJournal]:
+    """ColumnarJournal for a bot, or None when root is "" or numpy is missing."""
+    if not root:
+        return None
+    if np is None:
+        print("[COLS] pip install numpy for the columnar journal; CSV only")
+        return None
+    return ColumnarJournal(root, **kw)
+
+
+def load(root: str, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, "np.ndarray"]:
+    """All chunks under root as one dict of column arrays, rows with start <= ts < end."""
+    parts: Dict[str, list] = {name: [] for name, _ in COLUMNS}
+    for path in chunk_paths(root):
+        with np.load(path) as z:
+            ts = z["ts"]
+            if start is not None or end is not None:
+                if len(ts) and ((start is not None and ts.max() < start) or (end is not None and ts.min() >= end)):
+                    continue
+                mask = np.ones(len(ts), dtype=bool)
+                if start is not None: mask &= ts >= start
+                if end is not None: mask &= ts < end
+            else:
+                mask = None
+            for name, _ in COLUMNS:
+                col = z[name]
+                parts[name].append(col if mask is None else col[mask])
+    return {name: (np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=kind))
+            for name, kind in COLUMNS}
+
+
+# old CSV headers -> columns
+_ALIASES = {"p_win": "p_hat", "Time": "ts", "Contract": "side", "Profit": "profit", "Balance": "balance"}
+
+
+def _csv_rows(path: str) -> Iterable[dict]:
+    with open(path, newline="") as f:
+        for rec in csv.DictReader(f):
+            row = {}
+            for k, v in rec.items():
+                k = _ALIASES.get(k, k)
+                if k in DTYPES:
+                    row[k] = v
+            ts = row.get("ts")
+            if ts and not ts.replace(".", "", 1).isdigit():
+                try: row["ts"] = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S").timestamp()
+                except ValueError: row["ts"] = None
+            if "profit" in row and row["profit"] == "pending":
+                row["profit"] = None
+            yield row
+
+
+def from_csv(path: str, root: str, chunk_rows: int = 65536) -> int:
+    j = ColumnarJournal(root, chunk_rows=chunk_rows, fsync="never")
+    n = 0
+    for row in _csv_rows(path):
+        while not j.write(row):
+            time.sleep(0.01)
+        n += 1
+    j.close(timeout=60.0)
+    return n
+
+
+def main():
+    if np is None:
+        print("pip install numpy")
+        sys.exit(1)
+    ap = argparse.ArgumentParser(description="Columnar trade journals.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("convert", help="append an old CSV journal to a columnar journal")
+    c.add_argument("csv")
+    c.add_argument("root")
+    s = sub.add_parser("show", help="load a columnar journal and print a summary")
+    s.add_argument("root")
+    args = ap.parse_args()
+    if args.cmd == "convert":
+        print(f"[COLS] {from_csv(args.csv, args.root)} rows -> {args.root}")
+        return
+    t0 = time.perf_counter()
+    cols = load(args.root)
+    took = time.perf_counter() - t0
+    n = len(cols["ts"])
+    settled = ~np.isnan(cols["profit"])
+    print(f"[COLS] {n} trades from {len(chunk_paths(args.root))} chunks in {took * 1000:.1f} ms")
+    if n:
+        print(f"  from {datetime.fromtimestamp(cols['ts'].min())} to {datetime.fromtimestamp(cols['ts'].max())}")
+        print(f"  settled={int(settled.sum())} pnl={np.nansum(cols['profit']):+.2f} "
+              f"staked={np.nansum(cols['stake']):.2f} wins={int((cols['profit'][settled] > 0).sum())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+correlator.py
+
+Request/response correlation for the Deriv WebSocket bots.
+- One registry of waiters keyed by req_id, passthrough tag or any hashable key
+- The socket thread resolves a waiter the moment its frame arrives (no polling)
+- Per-request timeouts; error frames fail the waiter straight away
+- Records how long every request waited
+- wait_all() collects a pipelined batch of requests against one deadline
+- fail_all() releases every waiter at once when the connection drops
+- Waiters nobody waits for (a reply that never comes, a caller that gave up without
+  cancel) are failed and dropped after ttl seconds; at most maxsize are kept
+"""
+
+import threading
+import time
+from typing import Any, Hashable, List, Optional
+
+from registry import Registry
+
+
+class Waiter:
+    __slots__ = ("key", "event", "result", "error", "sent_at", "done_at")
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+        self.sent_at = time.monotonic()
+        self.done_at: Optional[float] = None
+
+    @property
+    def waited(self) -> float:
+        end = self.done_at if self.done_at is not None else time.monotonic()
+        return end - self.sent_at
+
+
+class RequestCorrelator:
+    def __init__(self, ttl: float = 120.0, maxsize: int = 4096):
+        self._lock = threading.Lock()
+        self._waiters = Registry(ttl, maxsize, on_evict=self._evicted)
+        self._req_id = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+    @staticmethod
+    def key_of(data: dict) -> Optional[Hashable]:
+        """req_id first, passthrough tag second (both are echoed by the API)."""
+        echo = data.get("echo_req") or {}
+        req_id = data.get("req_id", echo.get("req_id"))
+        if req_id is not None:
+            return int(req_id)
+        passth = data.get("passthrough") or echo.get("passthrough")
+        if isinstance(passth, dict):
+            return passth.get("tag")
+        return None
+
+    def next_req_id(self) -> int:
+        with self._lock:
+            self._req_id += 1
+            return self._req_id
+
+    def register(self, key: Hashable) -> Waiter:
+        w = Waiter(key)
+        with self._lock:
+            self._waiters[key] = w
+        return w
+
+    @staticmethod
+    def _evicted(key: Hashable, w: Waiter) -> None:
+        # under _lock, from register(): release anyone still blocked on it
+        w.error = "expired"
+        w.done_at = time.monotonic()
+        w.event.set()
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._waiters.sweep()
+
+    def cancel(self, key: Hashable) -> None:
+        with self._lock:
+            self._waiters.pop(key, None)
+
+    def _finish(self, key: Hashable, result: Any, error: Any) -> bool:
+        with self._lock:
+            w = self._waiters.pop(key, None)
+        if w is None:
+            return False
+        w.result = result
+        w.error = error
+        w.done_at = time.monotonic()
+        w.event.set()
+        return True
+
+    def resolve(self, key: Hashable, result: Any) -> bool:
+        return self._finish(key, result, None)
+
+    def fail(self, key: Hashable, error: Any) -> bool:
+        return self._finish(key, None, error or "failed")
+
+    def fail_all(self, error: Any) -> int:
+        """Fail every pending waiter (the socket they were sent on is gone)."""
+        with self._lock:
+            waiters = list(self._waiters)
+        return sum(self.fail(key, error) for key in waiters)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+    def wait(self, waiter: Waiter, timeout: float) -> Optional[Any]:
+        ok = waiter.event.wait(timeout)
+        if not ok:
+            self.cancel(waiter.key)
+        waited = waiter.waited
+        with self._lock:
+            self.last_wait = waited
+            if not ok:
+                self.timeouts += 1
+                return None
+            if waiter.error is not None:
+                self.failed += 1
+                return None
+            self.completed += 1
+            self.total_wait += waited
+            if waited > self.max_wait:
+                self.max_wait = waited
+        return waiter.result
+
+    def wait_all(self, waiters: List[Waiter], timeout: float) -> List[Waiter]:
+        """Wait for a fan-out batch until one shared deadline; returns the waiters that succeeded."""
+        deadline = time.monotonic() + timeout
+        done = []
+        for w in waiters:
+            if self.wait(w, max(0.0, deadline - time.monotonic())) is not None:
+                done.append(w)
+        return done
+
+    def summary(self) -> dict:
+        with self._lock:
+            n = self.completed
+            return {"completed": n, "failed": self.failed, "timeouts": self.timeouts,
+                    "pending": len(self._waiters), "expired": self._waiters.expired,
+                    "evicted": self._waiters.evicted,
+                    "avg_wait_ms": (self.total_wait / n * 1000.0) if n else 0.0,
+                    "max_wait_ms": self.max_wait * 1000.0,
+                    "last_wait_ms": self.last_wait * 1000.0}
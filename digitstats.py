@@ -0,0 +1,110 @@
+"""
+digitstats.py
+
+Incremental rolling digit statistics shared by all strategies.
+- One bytearray ring of recent digits serves several window sizes at once
+- Per window: digit counts and odd count, two or three integer updates per tick and no
+  allocation, so a 100k-tick window costs the same per tick as a 1k one (plus 100 kB)
+- snapshot(window) copies the 10-slot table and sums the prefix counts (digits < k) from
+  it, so any strategy reads a frozen view in O(1): probabilities, over/under tails and
+  parity without touching the tick history
+- Not locked: a bot whose decision thread snapshots while the socket thread pushes
+  holds its own lock around both
+"""
+
+from itertools import accumulate
+from typing import Dict, Iterable, List, Sequence
+
+
+class DigitSnapshot:
+    __slots__ = ("window", "n", "counts", "prefix", "odd")
+
+    def __init__(self, window: int, n: int, counts: List[int], prefix: List[int], odd: int):
+        self.window = window
+        self.n = n
+        self.counts = counts
+        self.prefix = prefix  # prefix[k] = number of digits < k
+        self.odd = odd
+
+    @property
+    def even(self) -> int:
+        return self.n - self.odd
+
+    def probs(self) -> List[float]:
+        n = self.n
+        return [c / n for c in self.counts] if n else [0.1] * 10
+
+    def p_over(self, t: int) -> float:
+        """P(d > t)"""
+        return (self.n - self.prefix[t + 1]) / self.n if self.n else 0.0
+
+    def p_under(self, t: int) -> float:
+        """P(d < t)"""
+        return self.prefix[t] / self.n if self.n else 0.0
+
+    def p_odd(self) -> float:
+        return self.odd / self.n if self.n else 0.5
+
+
+class DigitStats:
+    def __init__(self, windows: Sequence[int] = (1000,)):
+        self.windows = sorted(set(int(w) for w in windows))
+        if not self.windows or self.windows[0] <= 0:
+            raise ValueError("window sizes must be positive")
+        self.capacity = self.windows[-1]
+        self._ring = bytearray(self.capacity)
+        self._pos = 0
+        self.total = 0
+        self._counts: Dict[int, List[int]] = {w: [0] * 10 for w in self.windows}
+        self._odd: Dict[int, int] = {w: 0 for w in self.windows}
+        self._tables = [(w, self._counts[w]) for w in self.windows]
+
+    def push(self, d: int) -> None:
+        ring, pos, total, odd = self._ring, self._pos, self.total, self._odd
+        bit = d & 1
+        for w, counts in self._tables:
+            if total >= w:
+                old = ring[pos - w]     # a negative index wraps around the ring
+                counts[old] -= 1
+                odd[w] += bit - (old & 1)
+            else:
+                odd[w] += bit
+            counts[d] += 1
+        ring[pos] = d
+        pos += 1
+        self._pos = 0 if pos == self.capacity else pos
+        self.total = total + 1
+
+    def extend(self, digits: Iterable[int]) -> None:
+        for d in digits:
+            self.push(d)
+
+    def clear(self) -> None:
+        self._pos = 0
+        self.total = 0
+        for w, counts in self._tables:
+            counts[:] = [0] * 10
+            self._odd[w] = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def n(self, window: int) -> int:
+        return min(self.total, window)
+
+    def counts(self, window: int) -> List[int]:
+        """Live count table of a window (not a copy)."""
+        return self._counts[window]
+
+    def snapshot(self, window: int = None) -> DigitSnapshot:
+        w = self.capacity if window is None else window
+        counts = self._counts[w][:]
+        return DigitSnapshot(w, min(self.total, w), counts, [0, *accumulate(counts)], self._odd[w])
+
+    def last(self, n: int) -> List[int]:
+        """Most recent n digits, oldest first."""
+        n = min(n, len(self))
+        start = (self._pos - n) % self.capacity
+        if start + n <= self.capacity:
+            return list(self._ring[start:start + n])
+        return list(self._ring[start:]) + list(self._ring[:self._pos])
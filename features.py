@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+features.py
+
+Multi-horizon last-digit features, all horizons updated in one pass per tick.
+- FeatureEngine is a DigitStats (same ring, counts, odd, snapshot, last), so it drops in
+  wherever a strategy takes one; its push() updates every horizon in a single loop:
+    digit histogram and odd count (over/under tails come from the histogram prefix)
+    parity flips and digit repeats between neighbouring ticks inside the horizon
+    exponentially weighted digit frequencies, alpha = 1 / horizon
+- Each update is O(1) per horizon and allocation-free: pairs leaving the horizon are
+  subtracted, and the EWMA decays through one shared scale factor instead of ten products
+- Streak lengths (same digit, same parity, same high/low half) are horizon-free and
+  kept once
+- features(horizon) is a frozen FeatureSnapshot; vector() flattens every horizon into
+  one list of floats with matching names()
+
+usage: python features.py ticks.csv --horizons 25,100,500,5000
+"""
+
+import argparse
+import time
+from itertools import accumulate
+from typing import List, Sequence
+
+from digitstats import DigitSnapshot, DigitStats
+
+HORIZONS = (25, 100, 500, 5000)
+_RESCALE = 1e-150     # renormalize an EWMA once its shared scale factor gets this small
+
+
+class FeatureSnapshot(DigitSnapshot):
+    __slots__ = ("flips", "repeats", "ewma", "streak", "parity_streak", "half_streak")
+
+    def __init__(self, window: int, n: int, counts: List[int], prefix: List[int], odd: int, flips: int,
+                 repeats: int, ewma: List[float], streak: int, parity_streak: int, half_streak: int):
+        super().__init__(window, n, counts, prefix, odd)
+        self.flips = flips
+        self.repeats = repeats
+        self.ewma = ewma    # normalized: sums to 1 once any tick was seen
+        self.streak = streak
+        self.parity_streak = parity_streak
+        self.half_streak = half_streak
+
+    def flip_rate(self) -> float:
+        """Share of neighbouring ticks whose parity differs (0.5 for a fair stream)."""
+        return self.flips / (self.n - 1) if self.n > 1 else 0.5
+
+    def repeat_rate(self) -> float:
+        """Share of ticks whose digit equals the previous one (0.1 for a fair stream)."""
+        return self.repeats / (self.n - 1) if self.n > 1 else 0.1
+
+    def mean_parity_run(self) -> float:
+        return self.n / (self.flips + 1) if self.n else 0.0
+
+    def vector(self) -> List[float]:
+        return [*self.probs(), self.p_odd(), *(self.p_over(t) for t in range(9)),
+                self.flip_rate(), self.repeat_rate(), *self.ewma]
+
+    @staticmethod
+    def names(window: int) -> List[str]:
+        return ([f"p{d}_{window}" for d in range(10)] + [f"odd_{window}"] +
+                [f"over{t}_{window}" for t in range(9)] + [f"flip_{window}", f"repeat_{window}"] +
+                [f"ewma{d}_{window}" for d in range(10)])
+
+
+class FeatureEngine(DigitStats):
+    def __init__(self, horizons: Sequence[int] = HORIZONS):
+        if any(int(h) < 2 for h in horizons):
+            raise ValueError("horizons need at least two ticks")
+        super().__init__(horizons)
+        # per horizon: [window, counts, odd, flips, repeats, alpha, scale, ewma values]
+        self._state = [[w, self._counts[w], 0, 0, 0, 1.0 / w, 1.0, [0.0] * 10] for w in self.windows]
+        self._by_window = {s[0]: s for s in self._state}
+        self.prev = -1
+        self.streak = 0
+        self.parity_streak = 0
+        self.half_streak = 0
+
+    def push(self, d: int) -> None:
+        ring, pos, total, prev = self._ring, self._pos, self.total, self.prev
+        bit = d & 1
+        flip = 1 if total and (prev ^ d) & 1 else 0
+        same = 1 if total and prev == d else 0
+        for st in self._state:
+            w, counts = st[0], st[1]
+            if total >= w:
+                old = ring[pos - w]         # a negative index wraps around the ring
+                nxt = ring[pos - w + 1]     # its neighbour stays in the horizon
+                counts[old] -= 1
+                st[2] += bit - (old & 1)
+                st[3] += flip - ((old ^ nxt) & 1)
+                st[4] += same - (old == nxt)
+            else:
+                st[2] += bit
+                st[3] += flip
+                st[4] += same
+            counts[d] += 1
+            scale = st[6] * (1.0 - st[5])
+            ew = st[7]
+            if scale < _RESCALE:
+                for k in range(10):
+                    ew[k] *= scale
+                scale = 1.0
+            ew[d] += st[5] / scale
+            st[6] = scale
+        ring[pos] = d
+        pos += 1
+        self._pos = 0 if pos == self.capacity else pos
+        self.total = total + 1
+        self.streak = self.streak + 1 if same else 1
+        self.parity_streak = self.parity_streak + 1 if total and not flip else 1
+        self.half_streak = self.half_streak + 1 if total and (prev >= 5) == (d >= 5) else 1
+        self.prev = d
+
+    def clear(self) -> None:
+        super().clear()
+        for st in self._state:
+            st[2:] = [0, 0, 0, st[5], 1.0, [0.0] * 10]
+        self.prev = -1
+        self.streak = self.parity_streak = self.half_streak = 0
+
+    def snapshot(self, window: int = None) -> DigitSnapshot:
+        return self.features(self.capacity if window is None else window)
+
+    def features(self, horizon: int) -> FeatureSnapshot:
+        st = self._by_window[horizon]
+        counts = st[1][:]
+        scale = st[6]
+        ewma = [v * scale for v in st[7]]
+        mass = sum(ewma)
+        ewma = [v / mass for v in ewma] if mass > 0 else [0.1] * 10
+        return FeatureSnapshot(horizon, min(self.total, horizon), counts, [0, *accumulate(counts)], st[2],
+                               st[3], st[4], ewma, self.streak, self.parity_streak, self.half_streak)
+
+    def vector(self) -> List[float]:
+        out: List[float] = []
+        for w in self.windows:
+            out.extend(self.features(w).vector())
+        return out + [float(self.streak), float(self.parity_streak), float(self.half_streak)]
+
+    def names(self) -> List[str]:
+        out: List[str] = []
+        for w in self.windows:
+            out.extend(FeatureSnapshot.names(w))
+        return out + ["streak", "parity_streak", "half_streak"]
+
+
+def main():
+    from backtest import load_ticks
+    from lastdigit import FILE_DECIMALS
+
+    ap = argparse.ArgumentParser(description="Multi-horizon digit features of a recorded tick file.")
+    ap.add_argument("ticks", help="tick file (.csv epoch,quote, .bin packed <qd or .ticks archive)")
+    ap.add_argument("--horizons", default=",".join(map(str, HORIZONS)))
+    ap.add_argument("--decimals", type=int, default=FILE_DECIMALS,
+                    help="quote decimals (pip size) of .csv/.bin input (default: R_10's 3); .ticks files carry their own")
+    args = ap.parse_args()
+    engine = FeatureEngine([int(h) for h in args.horizons.split(",")])
+    t0 = time.perf_counter()
+    for _, _, d in load_ticks(args.ticks, args.decimals):
+        engine.push(d)
+    dt = time.perf_counter() - t0
+    print(f"[FEATURES] {engine.total} ticks in {dt:.2f}s ({engine.total / dt if dt else 0:,.0f} ticks/s, file read included)")
+    print(f"{'horizon':>8} {'n':>6} {'odd':>6} {'over4':>6} {'under5':>6} {'flip':>6} {'repeat':>6} "
+          f"{'ewma top':>9} {'parity run':>10}")
+    for w in engine.windows:
+        f = engine.features(w)
+        top = max(range(10), key=f.ewma.__getitem__)
+        print(f"{w:>8} {f.n:>6} {f.p_odd():>6.3f} {f.p_over(4):>6.3f} {f.p_under(5):>6.3f} {f.flip_rate():>6.3f} "
+              f"{f.repeat_rate():>6.3f} {top:>4}={f.ewma[top]:.3f} {f.mean_parity_run():>10.2f}")
+    print(f"streaks: digit {engine.streak} | parity {engine.parity_streak} | high/low {engine.half_streak}")
+
+
+if __name__ == "__main__":
+    main()
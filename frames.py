@@ -0,0 +1,108 @@
+"""
+frames.py
+
+Cheap decoding of inbound API frames for the tick hot path.
+- classify(raw) -> (msg_type, body): ticks come back as their "tick" body, anything
+  else as the full parsed dict; error frames are tagged "error" whatever their msg_type
+- Without a fast JSON backend, tick frames in the server's compact key order are
+  matched by one anchored regex and only quote / epoch / symbol / pip_size / req_id /
+  subscription id are sliced out (TickFrame); no dict is built. Only frames whose tail
+  looks like a tick body try the regex, so other frames pay two short string checks
+- With orjson installed it is used for every frame, since it beats the regex path
+- loads() / dumps() are the chosen backend, for the rest of the bot
+"""
+
+import json
+import re
+from typing import Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    loads = json.loads
+    dumps = json.dumps
+
+BACKEND = "orjson" if orjson is not None else "json"
+FAST_TICKS = orjson is None
+
+_TICK_AT = '"msg_type":"tick"'
+# sorted keys make "tick" the last key and "symbol" the last field of its body, so a tick
+# frame ends with "symbol":"R_10"}}; checking the tail keeps other frames off the regex
+_TICK_TAIL = '"symbol":"'
+_TICK = re.compile(
+    r'"msg_type":"tick"(?:,"req_id":(\d+))?(?:,"subscription":\{"id":"([^"]*)"\})?,'
+    r'"tick":\{(?:"ask":[^,]*,)?(?:"bid":[^,]*,)?"epoch":(\d+),(?:"id":"[^"]*",)?'
+    r'(?:"pip_size":(\d+),)?"quote":([^,}]+),"symbol":"([^"]*)"')
+
+
+class TickFrame:
+    """The fields of a tick frame the bots use; reads like the "tick" body dict."""
+    __slots__ = ("symbol", "epoch", "quote", "quote_text", "pip_size", "req_id", "sub_id")
+
+    def __init__(self, symbol, epoch, quote, quote_text, pip_size, req_id, sub_id):
+        self.symbol = symbol
+        self.epoch = epoch
+        self.quote = quote
+        self.quote_text = quote_text
+        self.pip_size = pip_size
+        self.req_id = req_id
+        self.sub_id = sub_id
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def __repr__(self):
+        return f"TickFrame({self.symbol} {self.epoch} {self.quote_text})"
+
+
+def parse_tick(raw: str) -> Optional[TickFrame]:
+    """TickFrame for an error-free tick frame in the usual layout, None for anything else."""
+    at = raw.find(_TICK_AT)
+    if at < 0 or '"error"' in raw:
+        return None
+    m = _TICK.match(raw, at)
+    if m is None:
+        return None
+    req_id, sub_id, epoch, pip, quote, symbol = m.groups()
+    try:
+        return TickFrame(symbol, int(epoch), float(quote), quote, int(pip) if pip else None,
+                         int(req_id) if req_id else None, sub_id)
+    except ValueError:
+        return None
+
+
+def classify(raw: Union[str, bytes]) -> Tuple[Optional[str], Union[TickFrame, dict, None]]:
+    """("tick", tick body) for ticks, ("error", frame dict) for errors, (msg_type, frame dict)
+    for the rest and (None, None) on bad JSON."""
+    if FAST_TICKS and isinstance(raw, str) and raw.endswith('"}}') and raw.find(_TICK_TAIL, -40) >= 0:
+        tick = parse_tick(raw)
+        if tick is not None:
+            return "tick", tick
+    try:
+        data = loads(raw)
+    except ValueError:
+        return None, None
+    if not isinstance(data, dict):
+        return None, None
+    if data.get("error"):
+        return "error", data
+    msg = data.get("msg_type")
+    if msg == "tick" and isinstance(data.get("tick"), dict):
+        return "tick", data["tick"]
+    return msg, data
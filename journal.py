@@ -0,0 +1,161 @@
+"""
+journal.py
+
+Background trade journal: callers hand rows to a bounded queue and return at once;
+one writer thread appends them to disk in batches.
+- write() never blocks; when the queue is full the row is dropped and counted
+- fsync policy: "always" (every batch), "interval" (at most every fsync_interval s) or "never"
+- Rotation by size and/or calendar day: the full file is renamed to
+  <name>.<YYYYmmdd-HHMMSS><ext> and a fresh one (with header) is started
+- Flushed and closed at interpreter exit if the bot never calls close()
+"""
+
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+from typing import List, Optional, Sequence
+
+_STOP = object()
+
+
+class JournalWriter:
+    def __init__(self, path: str, header: Optional[Sequence[str]] = None, max_queue: int = 10000,
+                 batch: int = 256, flush_interval: float = 1.0, fsync: str = "interval",
+                 fsync_interval: float = 5.0, rotate_bytes: Optional[int] = 64 << 20,
+                 rotate_daily: bool = False):
+        if fsync not in ("always", "interval", "never"):
+            raise ValueError(f"unknown fsync policy {fsync!r}")
+        self.path = path
+        self.header = list(header) if header else None
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self._q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._f = None
+        self._day = None
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"journal:{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # caller side
+    def write(self, row: Sequence) -> bool:
+        try:
+            self._q.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def summary(self) -> dict:
+        return {"written": self.written, "dropped": self.dropped, "queued": self._q.qsize(),
+                "batches": self.batches, "rotations": self.rotations}
+
+    # writer thread
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                item = self._q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._idle()
+                continue
+            rows = []
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                rows.append(item)
+                if len(rows) >= self.batch:
+                    break
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+            if rows:
+                try:
+                    self._write(rows)
+                except Exception as e:
+                    print("[JOURNAL] write error:", e)
+        self._finish()
+
+    def _write(self, rows: List[Sequence]) -> None:
+        self._maybe_rotate()
+        if self._f is None:
+            self._open()
+        self._write_rows(rows)
+        self._f.flush()
+        self.written += len(rows)
+        self.batches += 1
+        self._sync()
+
+    def _sync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if force or self.fsync == "always" or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval):
+            if self.fsync != "never":
+                os.fsync(self._f.fileno())
+            self._last_fsync = now
+
+    def _maybe_rotate(self) -> None:
+        day = time.strftime("%Y%m%d")
+        if not os.path.exists(self.path):
+            self._day = day
+            return
+        if self._day is None:
+            # an existing file counts as written on its last-modified day
+            self._day = time.strftime("%Y%m%d", time.localtime(os.path.getmtime(self.path)))
+        size = self._f.tell() if self._f is not None else os.path.getsize(self.path)
+        if not ((self.rotate_daily and day != self._day) or (self.rotate_bytes and size >= self.rotate_bytes)):
+            return
+        if self._f is not None:
+            self._sync(force=True)
+            self._f.close()
+            self._f = None
+        base, ext = os.path.splitext(self.path)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        target, n = f"{base}.{stamp}{ext}", 1
+        while os.path.exists(target):
+            target, n = f"{base}.{stamp}-{n}{ext}", n + 1
+        os.replace(self.path, target)
+        self.rotations += 1
+        self._day = day
+
+    # file format (CSV); subclasses can store rows differently
+    def _idle(self) -> None:
+        pass
+
+    def _finish(self) -> None:
+        if self._f is not None:
+            self._sync(force=True)
+            self._f.close()
+            self._f = None
+
+    def _open(self) -> None:
+        self._f = open(self.path, "a", newline="")
+        self._csv = csv.writer(self._f)
+        if self.header and self._f.tell() == 0:
+            self._csv.writerow(self.header)
+
+    def _write_rows(self, rows: List[Sequence]) -> None:
+        self._csv.writerows(rows)
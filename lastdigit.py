@@ -0,0 +1,123 @@
+"""
+lastdigit.py
+
+Exact last-digit decoding for tick quotes, with no float -> string round trip.
+- The contract digit is the last one at the symbol's pip size: round(quote * 10**decimals) % 10
+- Pip sizes come from config (SYMBOL_DECIMALS), tick / history frames ("pip_size")
+  or an active_symbols reply ("pip"); recorded .csv/.bin files default to R_10's (FILE_DECIMALS)
+- digit_from_text reads the raw JSON number text; zeros the JSON encoder dropped are implied,
+  extra decimals are rounded like last_digit
+- digits_batch / digits_array decode ticks_history price lists and numpy arrays in one go
+"""
+
+import math
+from typing import Iterable, List, Optional
+
+# quote decimals (pip size) of the usual synthetic indices
+SYMBOL_DECIMALS = {"R_10": 3, "R_25": 3, "R_50": 4, "R_75": 4, "R_100": 2}
+DEFAULT_DECIMALS = 2
+# recorded .csv/.bin quotes carry no pip size; the tools assume the symbol every bot trades
+DEFAULT_SYMBOL = "R_10"
+FILE_DECIMALS = SYMBOL_DECIMALS[DEFAULT_SYMBOL]
+
+_SCALES = [10 ** d for d in range(16)]
+
+
+def decimals_for(symbol: Optional[str], default: int = DEFAULT_DECIMALS) -> int:
+    return SYMBOL_DECIMALS.get(symbol, default)
+
+
+def pip_to_decimals(pip: float) -> int:
+    """0.001 -> 3"""
+    return max(0, round(-math.log10(float(pip))))
+
+
+def update_pips(active_symbols: Iterable[dict]) -> int:
+    """Load pip sizes from an active_symbols reply; returns how many symbols were updated."""
+    n = 0
+    for row in active_symbols or ():
+        try:
+            SYMBOL_DECIMALS[row["symbol"]] = pip_to_decimals(row["pip"])
+            n += 1
+        except (KeyError, TypeError, ValueError):
+            continue
+    return n
+
+
+def scaled_quote(q: float, decimals: int) -> int:
+    """Quote as an exact integer number of pips."""
+    return round(q * _SCALES[decimals])
+
+
+def last_digit(q: float, decimals: int = DEFAULT_DECIMALS) -> int:
+    return round(q * _SCALES[decimals]) % 10
+
+
+def digit_from_text(text: str, decimals: int = DEFAULT_DECIMALS) -> int:
+    """Digit straight from JSON number text, e.g. "6543.21" -> 1 at 2 decimals, 0 at 3.
+
+    Text with more decimals than the pip size (or an exponent) is rounded through
+    last_digit, so both always agree.
+    """
+    if "e" in text or "E" in text:
+        return last_digit(float(text), decimals)
+    dot = text.find(".")
+    if dot < 0:
+        return ord(text[-1]) - 48 if decimals == 0 else 0
+    i = dot + decimals
+    n = len(text)
+    if i < n - 1:
+        return last_digit(float(text), decimals)
+    return ord(text[i]) - 48 if i < n else 0
+
+
+def digits_batch(quotes: Iterable[float], decimals: int = DEFAULT_DECIMALS) -> List[int]:
+    scale = _SCALES[decimals]
+    return [round(q * scale) % 10 for q in quotes]
+
+
+def digits_array(quotes, decimals: int = DEFAULT_DECIMALS):
+    """numpy uint8 digits for an array of quotes."""
+    import numpy as np
+    return (np.rint(np.asarray(quotes, dtype=np.float64) * _SCALES[decimals]).astype(np.int64) % 10).astype(np.uint8)
+
+
+class DigitDecoder:
+    """Per-symbol decoder; follows the "pip_size" the API sends with ticks and history."""
+    __slots__ = ("decimals", "scale")
+
+    def __init__(self, symbol: Optional[str] = None, decimals: Optional[int] = None):
+        self.set_decimals(decimals_for(symbol) if decimals is None else decimals)
+
+    def set_decimals(self, decimals: int) -> None:
+        self.decimals = int(decimals)
+        self.scale = _SCALES[self.decimals]
+
+    def observe(self, frame: dict) -> None:
+        """Pick up "pip_size" from a tick or history frame."""
+        pip = frame.get("pip_size")
+        if pip is not None and pip != self.decimals:
+            self.set_decimals(pip)
+
+    def __call__(self, q: float) -> int:
+        return round(q * self.scale) % 10
+
+    def decode(self, tick: dict) -> Optional[int]:
+        """Digit of a tick frame body ({"quote": ..., "pip_size": ...}), None without a quote."""
+        q = tick.get("quote")
+        if q is None:
+            return None
+        pip = tick.get("pip_size")
+        if pip is not None and pip != self.decimals:
+            self.set_decimals(pip)
+        return round(float(q) * self.scale) % 10
+
+    def from_text(self, text: str) -> int:
+        return digit_from_text(text, self.decimals)
+
+    def batch(self, quotes: Iterable[float]) -> List[int]:
+        scale = self.scale
+        return [round(float(q) * scale) % 10 for q in quotes]
+
+    def array(self, quotes):
+        return digits_array(quotes, self.decimals)
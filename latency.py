@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+latency.py
+
+Where the time goes between a tick and a settled contract.
+- Histogram: HDR-style log-linear buckets over integer microseconds (128 sub-buckets per
+  power of two, exact below 256us, under 0.8% error), O(1) record, fixed memory, mergeable
+- LatencyRecorder keeps one histogram per (symbol, strategy, stage) and prints
+  p50/p99/p999 every report_interval seconds, dumping the same numbers plus the raw
+  buckets to a JSON file
+- Timeline follows one decision: mark(stage) records the time since the previous mark,
+  so the stages of a trade (tick_age, eval, proposal, buy, settle) add up to its total
+
+usage: python latency.py latency_zscore.json
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+now = time.monotonic
+
+_SUB_BITS = 8     # 2**(_SUB_BITS - 1) = 128 sub-buckets per power of two
+_SUB = 1 << _SUB_BITS
+
+
+def _index(v: int) -> int:
+    if v < _SUB:
+        return v
+    shift = v.bit_length() - _SUB_BITS
+    return (shift << (_SUB_BITS - 1)) + (v >> shift)
+
+
+def _bounds(i: int) -> Tuple[int, int]:
+    """Lowest and highest value that land in bucket i."""
+    if i < _SUB:
+        return i, i
+    shift = (i >> (_SUB_BITS - 1)) - 1
+    m = i - (shift << (_SUB_BITS - 1))
+    return m << shift, ((m + 1) << shift) - 1
+
+
+class Histogram:
+    __slots__ = ("counts", "n", "total", "min", "max")
+
+    def __init__(self, max_us: int = 120_000_000):
+        self.counts = [0] * (_index(max_us) + 1)
+        self.n = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, us: int) -> None:
+        if us < 0:
+            us = 0
+        i = _index(us)
+        if i >= len(self.counts):
+            i = len(self.counts) - 1
+        self.counts[i] += 1
+        if not self.n or us < self.min:
+            self.min = us
+        if us > self.max:
+            self.max = us
+        self.n += 1
+        self.total += us
+
+    def percentile(self, q: float) -> int:
+        """Highest value equivalent to the q-th percentile (0 < q <= 100), in microseconds."""
+        if not self.n:
+            return 0
+        target = max(1, -int(-q * self.n // 100))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(_bounds(i)[1], self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+
+    def merge(self, other: "Histogram") -> None:
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[min(i, len(self.counts) - 1)] += c
+        if other.n and (not self.n or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.n += other.n
+        self.total += other.total
+
+    def buckets(self) -> List[List[int]]:
+        """Non-empty buckets as [lowest value, count]."""
+        return [[_bounds(i)[0], c] for i, c in enumerate(self.counts) if c]
+
+    def stats(self) -> dict:
+        return {"n": self.n, "mean_ms": self.mean() / 1000.0, "min_ms": self.min / 1000.0,
+                "p50_ms": self.percentile(50) / 1000.0, "p99_ms": self.percentile(99) / 1000.0,
+                "p999_ms": self.percentile(99.9) / 1000.0, "max_ms": self.max / 1000.0}
+
+
+Key = Tuple[str, str, str]   # (symbol, strategy, stage)
+
+
+class Timeline:
+    __slots__ = ("rec", "symbol", "strategy", "t0", "last")
+
+    def __init__(self, rec: "LatencyRecorder", symbol: str, strategy: str, t0: Optional[float] = None):
+        self.rec = rec
+        self.symbol = symbol
+        self.strategy = strategy
+        self.t0 = self.last = now() if t0 is None else t0
+
+    def mark(self, stage: str, t: Optional[float] = None) -> float:
+        """Record the time since the previous mark under stage; returns the stamp."""
+        t = now() if t is None else t
+        self.rec.record(stage, t - self.last, self.symbol, self.strategy)
+        self.last = t
+        return t
+
+    def total(self, stage: str, t: Optional[float] = None) -> None:
+        """Record the time since tick receipt under stage."""
+        t = now() if t is None else t
+        self.rec.record(stage, t - self.t0, self.symbol, self.strategy)
+
+
+class LatencyRecorder:
+    def __init__(self, report_interval: float = 60.0, dump_path: Optional[str] = None):
+        self.report_interval = report_interval
+        self.dump_path = dump_path
+        self._lock = threading.Lock()
+        self._hists: Dict[Key, Histogram] = {}
+        self._next_report = now() + report_interval
+
+    def record(self, stage: str, seconds: float, symbol: str = "", strategy: str = "") -> None:
+        key = (symbol, strategy, stage)
+        us = int(seconds * 1e6)
+        with self._lock:
+            h = self._hists.get(key)
+            if h is None:
+                h = self._hists[key] = Histogram()
+            h.record(us)
+
+    def timeline(self, symbol: str, strategy: str, t0: Optional[float] = None) -> Timeline:
+        return Timeline(self, symbol, strategy, t0)
+
+    def snapshot(self) -> Dict[Key, dict]:
+        with self._lock:
+            return {k: h.stats() for k, h in sorted(self._hists.items())}
+
+    def report(self) -> str:
+        lines = [f"{'symbol':<8} {'strategy':<12} {'stage':<12} {'n':>7} {'p50':>9} {'p99':>9} {'p999':>9} {'max':>9}  (ms)"]
+        for (symbol, strategy, stage), s in self.snapshot().items():
+            lines.append(f"{symbol:<8} {strategy:<12} {stage:<12} {s['n']:>7} {s['p50_ms']:>9.2f} "
+                         f"{s['p99_ms']:>9.2f} {s['p999_ms']:>9.2f} {s['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        path = path or self.dump_path
+        if not path:
+            return None
+        with self._lock:
+            rows = [dict(symbol=k[0], strategy=k[1], stage=k[2], **h.stats(), buckets_us=h.buckets())
+                    for k, h in sorted(self._hists.items())]
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"ts": time.time(), "unit": "ms", "histograms": rows}, f)
+        os.replace(tmp, path)
+        return path
+
+    def maybe_report(self, t: Optional[float] = None) -> bool:
+        """Print and dump once every report_interval; cheap to call from a hot loop."""
+        t = now() if t is None else t
+        if t < self._next_report:
+            return False
+        self._next_report = t + self.report_interval
+        print("[LATENCY]\n" + self.report())
+        try:
+            self.dump()
+        except OSError as e:
+            print("[LATENCY] dump failed:", e)
+        return True
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python latency.py <dump.json>")
+        sys.exit(1)
+    with open(sys.argv[1]) as f:
+        data = json.load(f)
+    print(f"[LATENCY] {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(data['ts']))}")
+    for r in data["histograms"]:
+        print(f"{r['symbol']:<8} {r['strategy']:<12} {r['stage']:<12} n={r['n']:<7} p50={r['p50_ms']:.2f} "
+              f"p99={r['p99_ms']:.2f} p999={r['p999_ms']:.2f} max={r['max_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+mockderiv.py
+
+Local stand-in for the Deriv WebSocket API, for load and latency tests without a token.
+- Speaks the subset the bots use: authorize, ping, website_status, active_symbols, ticks,
+  ticks_history, proposal (one-shot and streamed), buy (by proposal id or with inline
+  parameters, with the price guard), proposal_open_contract (one contract or all of them)
+  and forget
+- Seeded random-walk quotes per symbol; the same seed gives the same tick sequence
+- --tick-rate runs the market faster than real time (epochs are simulated seconds, so
+  they stay unique and increasing at any rate)
+- Latency and jitter are added to every frame; --error-rate answers that share of the
+  requests with an error; --drop-every closes each connection after that many seconds
+- Frames are sorted, compact JSON like the real server's, so frames.py takes its fast path
+- Session/Market hold no socket state beyond emit(), so bench.py reuses them in-process
+
+usage: python mockderiv.py --port 8765 --tick-rate 100 --latency 20 --jitter 5 --seed 1
+       DERIV_WS_URL=ws://127.0.0.1:8765 python Bot.py
+pip install websockets
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+PIP = {"R_10": 3, "R_25": 3, "R_50": 4, "R_75": 4, "R_100": 2, "1HZ10V": 2, "1HZ100V": 2}
+HISTORY = 5000
+KEEP_PROPOSALS = 1000   # unspent proposal ids per connection
+KEEP_SOLD = 1000        # settled contracts still answerable by contract_id
+_ids = itertools.count(10_000_001)
+
+
+def dumps(frame: dict) -> str:
+    return json.dumps(frame, sort_keys=True, separators=(",", ":"))
+
+
+def win_probability(contract_type: str, barrier) -> Optional[float]:
+    try:
+        b = int(barrier) if barrier not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+    p = {"DIGITOVER": None if b is None else (9 - b) / 10, "DIGITUNDER": None if b is None else b / 10,
+         "DIGITMATCH": 0.1, "DIGITDIFF": 0.9, "DIGITODD": 0.5, "DIGITEVEN": 0.5,
+         "CALL": 0.5, "PUT": 0.5}.get(contract_type)
+    return p if p is not None and 0 < p < 1 else None
+
+
+def wins(contract_type: str, barrier, entry: float, exit_: float, digit: int) -> bool:
+    if contract_type == "DIGITOVER": return digit > int(barrier)
+    if contract_type == "DIGITUNDER": return digit < int(barrier)
+    if contract_type == "DIGITMATCH": return digit == int(barrier)
+    if contract_type == "DIGITDIFF": return digit != int(barrier)
+    if contract_type == "DIGITODD": return digit % 2 == 1
+    if contract_type == "DIGITEVEN": return digit % 2 == 0
+    if contract_type == "CALL": return exit_ >= entry
+    return exit_ <= entry
+
+
+class Market:
+    """Seeded random walk for one symbol; epochs advance one simulated second per tick."""
+
+    def __init__(self, symbol: str, seed: int):
+        self.symbol = symbol
+        self.pip = PIP.get(symbol, 2)
+        self.rng = random.Random(f"{seed}:{symbol}")
+        self.quote = round(1000.0 + self.rng.random() * 9000.0, self.pip)
+        self.epoch = int(time.time())
+        self.history: deque = deque(maxlen=HISTORY)
+        for _ in range(HISTORY):
+            self.step()
+
+    def step(self) -> Tuple[int, float]:
+        self.epoch += 1
+        self.quote = round(self.quote + self.rng.gauss(0.0, self.quote * 1e-4), self.pip)
+        self.history.append((self.epoch, self.quote))
+        return self.epoch, self.quote
+
+    def digit(self, quote: float) -> int:
+        return int(round(quote * 10 ** self.pip)) % 10
+
+
+class Contract:
+    __slots__ = ("id", "params", "buy_price", "payout", "ticks_left", "entry", "exit", "sold", "profit", "bought_at")
+
+    def __init__(self, params: dict, buy_price: float, payout: float):
+        self.id = next(_ids)
+        self.params = params
+        self.buy_price = buy_price
+        self.payout = payout
+        self.ticks_left = int(params.get("duration", 1))
+        self.entry: Optional[Tuple[int, float]] = None
+        self.exit: Optional[Tuple[int, float]] = None
+        self.sold = False
+        self.profit = 0.0
+        self.bought_at = int(time.time())
+
+    def state(self) -> dict:
+        status = "open" if not self.sold else ("won" if self.profit > 0 else "lost")
+        out = {"contract_id": self.id, "buy_price": self.buy_price, "payout": self.payout,
+               "contract_type": self.params["contract_type"], "underlying": self.params["symbol"],
+               "currency": self.params.get("currency", "USD"), "is_sold": int(self.sold), "status": status,
+               "profit": round(self.profit, 2) if self.sold else 0.0,
+               "date_start": self.bought_at}
+        if self.params.get("barrier") not in (None, ""):
+            out["barrier"] = str(self.params["barrier"])
+        if self.entry: out["entry_tick"], out["entry_tick_time"] = self.entry[1], self.entry[0]
+        if self.exit: out["exit_tick"], out["exit_tick_time"] = self.exit[1], self.exit[0]
+        if self.sold: out["sell_price"] = round(self.buy_price + self.profit, 2)
+        return out
+
+
+class Session:
+    def __init__(self, server: "MockServer", ws):
+        self.server = server
+        self.ws = ws
+        self.rng = random.Random(f"{server.seed}:conn{next(server.connections)}")
+        self.authorized = False
+        self.balance = server.balance
+        self.tick_subs: Dict[str, Tuple[str, dict]] = {}            # sub id -> (symbol, request)
+        self.proposal_subs: Dict[str, dict] = {}                    # sub id -> request
+        self.proposals: Dict[str, Tuple[dict, float, float]] = {}   # id -> (params, ask, payout)
+        self.contracts: Dict[int, Contract] = {}
+        self.open: Set[int] = set()
+        self.sold: deque = deque()
+        self.poc_subs: Dict[str, Optional[int]] = {}                # sub id -> contract id (None: all)
+        self.closed = False
+
+    # output
+    async def _emit(self, text: str) -> None:
+        delay = max(0.0, self.server.latency + self.rng.uniform(-self.server.jitter, self.server.jitter))
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            await self.ws.send(text)
+        except Exception:
+            self.closed = True
+
+    def emit(self, frame: dict) -> None:
+        if not self.closed:
+            asyncio.ensure_future(self._emit(dumps(frame)))
+
+    def reply(self, req: dict, msg_type: str, body, subscription: Optional[str] = None) -> None:
+        frame = {"echo_req": req, "msg_type": msg_type}
+        if body is not None:
+            frame[msg_type] = body
+        for k in ("req_id", "passthrough"):
+            if k in req:
+                frame[k] = req[k]
+        if subscription:
+            frame["subscription"] = {"id": subscription}
+        self.emit(frame)
+
+    def error(self, req: dict, msg_type: str, code: str, message: str) -> None:
+        frame = {"echo_req": req, "msg_type": msg_type, "error": {"code": code, "message": message}}
+        for k in ("req_id", "passthrough"):
+            if k in req:
+                frame[k] = req[k]
+        self.emit(frame)
+
+    # requests
+    def handle(self, req: dict) -> None:
+        kind = next((k for k in HANDLERS if k in req), None)
+        if kind is None:
+            return self.error(req, "error", "UnrecognisedRequest", "Unrecognised request")
+        if kind not in ("authorize", "ping", "forget") and self.rng.random() < self.server.error_rate:
+            self.server.errors += 1
+            return self.error(req, kind, "RateLimit", "You have reached the rate limit for " + kind + ".")
+        if kind in ("buy", "proposal_open_contract") and not self.authorized:
+            return self.error(req, kind, "AuthorizationRequired", "Please log in.")
+        self.server.requests += 1
+        getattr(self, "on_" + kind)(req)
+
+    def on_authorize(self, req):
+        self.authorized = True
+        self.reply(req, "authorize", {"loginid": "VRTC0000001", "balance": self.balance, "currency": "USD",
+                                      "is_virtual": 1, "email": "mock@localhost"})
+
+    def on_ping(self, req):
+        self.reply(req, "ping", "pong")
+
+    def on_website_status(self, req):
+        lim = {"hourly": 14400, "minutely": 300}
+        self.reply(req, "website_status", {"api_call_limits": {
+            "max_proposal_subscription": {"max": 100}, "max_requestes_general": dict(lim),
+            "max_requests_outcome": dict(lim), "max_requests_pricing": dict(lim)}, "site_status": "up"})
+
+    def on_active_symbols(self, req):
+        self.reply(req, "active_symbols", [{"symbol": s, "pip": 10 ** -m.pip, "market": "synthetic_index",
+                                            "exchange_is_open": 1} for s, m in self.server.markets.items()])
+
+    def _market(self, req, msg_type, symbol):
+        m = self.server.markets.get(symbol)
+        if m is None:
+            self.error(req, msg_type, "InvalidSymbol", f"Symbol {symbol} is invalid.")
+        return m
+
+    def _tick(self, m: Market, epoch: int, quote: float) -> dict:
+        spread = 10 ** -m.pip
+        return {"ask": round(quote + spread, m.pip), "bid": round(quote - spread, m.pip), "epoch": epoch,
+                "id": "", "pip_size": m.pip, "quote": quote, "symbol": m.symbol}
+
+    def on_ticks(self, req):
+        m = self._market(req, "tick", req["ticks"])
+        if m is None: return
+        epoch, quote = m.history[-1]
+        sub = None
+        if req.get("subscribe"):        # like the real API: a bare {"ticks": symbol} gets one tick
+            sub = str(uuid.uuid4())
+            self.tick_subs[sub] = (m.symbol, req)
+        body = self._tick(m, epoch, quote)
+        body["id"] = sub or ""
+        self.reply(req, "tick", body, sub)
+
+    def on_ticks_history(self, req):
+        m = self._market(req, "history", req["ticks_history"])
+        if m is None: return
+        start = int(req.get("start") or 0)
+        end = req.get("end", "latest")
+        end = m.epoch if end == "latest" else int(end)
+        rows = [(e, q) for e, q in m.history if start <= e <= end][-int(req.get("count") or 5000):]
+        frame = {"echo_req": req, "msg_type": "history", "pip_size": m.pip,
+                 "history": {"prices": [q for _, q in rows], "times": [e for e, _ in rows]}}
+        if "req_id" in req: frame["req_id"] = req["req_id"]
+        self.emit(frame)
+
+    def _price(self, params: dict) -> Optional[Tuple[float, float]]:
+        p = win_probability(params.get("contract_type"), params.get("barrier"))
+        if p is None:
+            return None
+        keep = 1.0 - self.server.margin
+        amount = float(params.get("amount", 0))
+        if params.get("basis", "stake") == "payout":
+            return round(amount * p / keep, 2), round(amount, 2)
+        return round(amount, 2), round(amount * keep / p, 2)
+
+    def _quote(self, req: dict) -> Optional[dict]:
+        priced = self._price(req)
+        if priced is None or req.get("symbol") not in self.server.markets:
+            return None
+        ask, payout = priced
+        pid = str(uuid.uuid4())
+        self.proposals[pid] = (req, ask, payout)
+        if len(self.proposals) > KEEP_PROPOSALS:
+            self.proposals.pop(next(iter(self.proposals)))
+        return {"id": pid, "ask_price": ask, "payout": payout, "display_value": f"{ask:.2f}",
+                "spot": self.server.markets[req["symbol"]].quote, "spot_time": self.server.markets[req["symbol"]].epoch,
+                "longcode": f"{req.get('contract_type')} {req.get('barrier', '')} on {req.get('symbol')}"}
+
+    def on_proposal(self, req):
+        body = self._quote(req)
+        if body is None:
+            return self.error(req, "proposal", "ContractCreationFailure", "Invalid barrier or contract type.")
+        sub = None
+        if req.get("subscribe"):
+            sub = str(uuid.uuid4())
+            self.proposal_subs[sub] = req
+        self.reply(req, "proposal", body, sub)
+
+    def on_buy(self, req):
+        if req["buy"] == 1 and isinstance(req.get("parameters"), dict):
+            params = req["parameters"]
+            priced = self._price(params)
+            if priced is None or params.get("symbol") not in self.server.markets:
+                return self.error(req, "buy", "ContractCreationFailure", "Invalid barrier or contract type.")
+        else:
+            entry = self.proposals.pop(str(req["buy"]), None)
+            if entry is None:
+                return self.error(req, "buy", "InvalidContractProposal", "Unknown contract proposal.")
+            params, priced = entry[0], entry[1:]
+        ask, payout = priced
+        if ask > float(req.get("price", 0)) + 1e-9:
+            return self.error(req, "buy", "ContractBuyValidationError",
+                              "Contract's stake amount is more than the maximum purchase price.")
+        if ask > self.balance:
+            return self.error(req, "buy", "InsufficientBalance", "Your account balance is insufficient.")
+        c = Contract(params, ask, payout)
+        self.balance = round(self.balance - ask, 2)
+        self.contracts[c.id] = c
+        self.open.add(c.id)
+        self.server.bought += 1
+        self.reply(req, "buy", {"contract_id": c.id, "buy_price": ask, "payout": payout,
+                                "balance_after": self.balance, "start_time": c.bought_at,
+                                "transaction_id": c.id * 2, "longcode": f"{params.get('contract_type')} "
+                                f"{params.get('barrier', '')} on {params.get('symbol')}"})
+
+    def on_proposal_open_contract(self, req):
+        cid = req.get("contract_id")
+        sub = str(uuid.uuid4()) if req.get("subscribe") else None
+        if cid is None:
+            if sub: self.poc_subs[sub] = None
+            return self.reply(req, "proposal_open_contract", {}, sub)
+        c = self.contracts.get(int(cid))
+        if c is None:
+            return self.error(req, "proposal_open_contract", "InvalidContractId", "Contract not found.")
+        if sub and not c.sold: self.poc_subs[sub] = c.id
+        self.reply(req, "proposal_open_contract", c.state(), sub)
+
+    def on_forget(self, req):
+        sub = req["forget"]
+        found = False
+        for subs in (self.tick_subs, self.proposal_subs, self.poc_subs):
+            if sub in subs:
+                del subs[sub]
+                found = True
+        self.reply(req, "forget", int(found))
+
+    # market
+    def on_tick(self, m: Market, epoch: int, quote: float) -> None:
+        for sub, (symbol, req) in list(self.tick_subs.items()):
+            if symbol == m.symbol:
+                body = self._tick(m, epoch, quote)
+                body["id"] = sub
+                self.reply(req, "tick", body, sub)
+        for sub, req in list(self.proposal_subs.items()):
+            if req.get("symbol") == m.symbol:
+                body = self._quote(req)
+                if body is not None:
+                    self.reply(req, "proposal", body, sub)
+        for cid in list(self.open):
+            c = self.contracts[cid]
+            if c.params.get("symbol") != m.symbol:
+                continue
+            if c.entry is None:
+                c.entry = (epoch, quote)
+            c.ticks_left -= 1
+            if c.ticks_left > 0:
+                continue
+            c.exit = (epoch, quote)
+            won = wins(c.params["contract_type"], c.params.get("barrier"), c.entry[1], quote, m.digit(quote))
+            c.profit = c.payout - c.buy_price if won else -c.buy_price
+            c.sold = True
+            self.balance = round(self.balance + c.buy_price + c.profit, 2)
+            self.open.discard(cid)
+            self.sold.append(cid)
+            if len(self.sold) > KEEP_SOLD:
+                self.contracts.pop(self.sold.popleft(), None)
+            self.server.settled += 1
+            for sub, target in list(self.poc_subs.items()):
+                if target is None or target == cid:
+                    self.reply({"proposal_open_contract": 1, "contract_id": cid, "subscribe": 1},
+                               "proposal_open_contract", c.state(), sub)
+                    if target == cid:
+                        del self.poc_subs[sub]
+
+
+HANDLERS = ("authorize", "ping", "website_status", "active_symbols", "ticks_history", "ticks",
+            "proposal_open_contract", "proposal", "buy", "forget")
+
+
+class MockServer:
+    def __init__(self, symbols: List[str], tick_rate: float = 1.0, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 1, margin: float = 0.05, balance: float = 10000.0,
+                 drop_every: float = 0.0):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.margin = margin
+        self.balance = balance
+        self.drop_every = drop_every
+        self.markets = {s: Market(s, seed) for s in symbols}
+        self.sessions: Set[Session] = set()
+        self.connections = itertools.count(1)
+        self.requests = self.errors = self.bought = self.settled = self.ticks = 0
+
+    async def _ticker(self, m: Market) -> None:
+        period = 1.0 / self.tick_rate
+        nxt = time.monotonic()
+        while True:
+            nxt += period
+            await asyncio.sleep(max(0.0, nxt - time.monotonic()))
+            epoch, quote = m.step()
+            self.ticks += 1
+            for s in list(self.sessions):
+                s.on_tick(m, epoch, quote)
+
+    async def _dropper(self, session: Session) -> None:
+        await asyncio.sleep(self.drop_every)
+        print(f"[MOCK] dropping a connection after {self.drop_every:.0f}s")
+        await session.ws.close()
+
+    async def handler(self, ws, *_):
+        session = Session(self, ws)
+        self.sessions.add(session)
+        dropper = asyncio.ensure_future(self._dropper(session)) if self.drop_every else None
+        try:
+            async for raw in ws:
+                try:
+                    req = json.loads(raw)
+                except ValueError:
+                    session.error({}, "error", "InputValidationFailed", "Invalid JSON.")
+                    continue
+                session.handle(req)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            session.closed = True
+            self.sessions.discard(session)
+            if dropper: dropper.cancel()
+
+    async def _report(self, every: float) -> None:
+        while True:
+            await asyncio.sleep(every)
+            print(f"[MOCK] clients {len(self.sessions)} | ticks {self.ticks} | requests {self.requests} | "
+                  f"injected errors {self.errors} | bought {self.bought} | settled {self.settled}")
+
+    async def serve(self, host: str, port: int, report_every: float = 10.0) -> None:
+        if websockets is None:
+            raise RuntimeError("pip install websockets")
+        async with websockets.serve(self.handler, host, port, max_size=None):
+            print(f"[MOCK] ws://{host}:{port} | {', '.join(self.markets)} at {self.tick_rate:g} ticks/s | "
+                  f"latency {self.latency * 1000:.0f}±{self.jitter * 1000:.0f}ms | errors {self.error_rate:.1%}")
+            await asyncio.gather(*(self._ticker(m) for m in self.markets.values()), self._report(report_every))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local mock of the Deriv WebSocket API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--symbols", default="R_10", help="comma separated")
+    ap.add_argument("--tick-rate", type=float, default=1.0, help="ticks per second per symbol")
+    ap.add_argument("--latency", type=float, default=0.0, help="ms added to every frame")
+    ap.add_argument("--jitter", type=float, default=0.0, help="± ms around --latency")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    ap.add_argument("--drop-every", type=float, default=0.0, help="close each connection after this many seconds")
+    ap.add_argument("--margin", type=float, default=0.05, help="house margin in the payouts")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    if websockets is None:
+        print("pip install websockets")
+        sys.exit(1)
+    server = MockServer(args.symbols.split(","), args.tick_rate, args.latency, args.jitter, args.error_rate,
+                        args.seed, args.margin, drop_every=args.drop_every)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+orders.py
+
+Order submission shared by the bots: one round trip per buy whenever possible.
+- buy_parameters(): the inline "buy": 1 + "parameters" payload (no proposal first)
+- OrderRouter.submit() picks the cheapest path per order:
+    "proposal": a fresh, unspent proposal id (from a scan or the proposal book)
+    "direct":   a parameterized buy for the payout last quoted for the same leg, with
+                "price" as the max-price guard; the server refuses it if the stake needed
+                for that payout has moved above the guard
+- With p_win given, the guard is also capped at the break-even stake p_win * payout, so a
+  direct buy can never fill at a negative expected value
+- note() remembers the payout of every quote seen; payouts older than payout_max_age
+  are not used, and the caller prices the leg again
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from proposal_book import Key, ProposalBook
+
+Request = Callable[[dict, float], Optional[dict]]
+
+
+def buy_parameters(contract_type: str, symbol: str, stake: float, duration: int, barrier=None,
+                   basis: str = "stake", amount: Optional[float] = None, max_price: Optional[float] = None,
+                   currency: str = "USD", duration_unit: str = "t", **extra) -> dict:
+    """A direct buy; amount is the stake (basis "stake") or the payout (basis "payout")."""
+    params = {"amount": round(float(stake if amount is None else amount), 2), "basis": basis,
+              "contract_type": contract_type, "currency": currency, "duration": int(duration),
+              "duration_unit": duration_unit, "symbol": symbol}
+    if barrier is not None:
+        params["barrier"] = str(barrier)
+    params.update(extra)
+    return {"buy": 1, "price": round(float(stake if max_price is None else max_price), 2), "parameters": params}
+
+
+class OrderRouter:
+    def __init__(self, request: Request, symbol: str, book: Optional[ProposalBook] = None,
+                 currency: str = "USD", payout_max_age: float = 30.0, slippage: float = 0.0):
+        self.request = request
+        self.symbol = symbol
+        self.book = book
+        self.currency = currency
+        self.payout_max_age = payout_max_age
+        self.slippage = slippage
+        self._payouts: Dict[Key, Tuple[float, float]] = {}   # key -> (payout, seen at)
+        self._lock = threading.Lock()
+        self.sent = {"proposal": 0, "direct": 0}
+        self.filled = {"proposal": 0, "direct": 0}
+        self.rtt = {"proposal": 0.0, "direct": 0.0}
+
+    def note(self, key: Key, proposal: Optional[dict]) -> None:
+        try:
+            payout = float(proposal["payout"])
+        except (TypeError, KeyError, ValueError):
+            return
+        with self._lock:
+            self._payouts[key] = (payout, time.monotonic())
+
+    def payout(self, key: Key) -> Optional[float]:
+        """Last quoted payout for key, None once it is older than payout_max_age."""
+        seen = self._payouts.get(key)
+        if seen is None or time.monotonic() - seen[1] > self.payout_max_age:
+            return None
+        return seen[0]
+
+    def guard(self, stake: float, payout: float, p_win: Optional[float] = None) -> float:
+        price = stake * (1.0 + self.slippage)
+        if p_win is not None:
+            price = min(price, p_win * payout)
+        return round(price, 2)
+
+    def submit(self, key: Key, p_win: Optional[float] = None, proposal: Optional[dict] = None,
+               timeout: float = 6.0) -> Optional[str]:
+        """Buy the leg key = (contract_type, barrier, duration, stake); returns the contract id."""
+        contract_type, barrier, duration, stake = key
+        if (proposal is None or not proposal.get("id")) and self.book is not None:
+            proposal = self.book.take(key)
+        if proposal is not None and proposal.get("id"):
+            path = "proposal"
+            self.note(key, proposal)
+            payload = {"buy": proposal["id"], "price": round(stake * (1.0 + self.slippage), 2)}
+        else:
+            payout = self.payout(key)
+            if payout is None:
+                return None
+            path = "direct"
+            payload = buy_parameters(contract_type, self.symbol, stake, duration, barrier or None,
+                                     basis="payout", amount=payout,
+                                     max_price=self.guard(stake, payout, p_win), currency=self.currency)
+        t0 = time.monotonic()
+        self.sent[path] += 1
+        buy = self.request(payload, timeout)
+        if not buy:
+            if path == "direct":
+                # refused (price moved) or lost: price the leg again before the next direct buy
+                with self._lock:
+                    self._payouts.pop(key, None)
+            return None
+        self.filled[path] += 1
+        self.rtt[path] += time.monotonic() - t0
+        cid = buy.get("contract_id")
+        return str(cid) if cid else None
+
+    def summary(self) -> dict:
+        out = {}
+        for path in ("proposal", "direct"):
+            n = self.filled[path]
+            out[path] = {"sent": self.sent[path], "filled": n,
+                         "avg_rtt_ms": (self.rtt[path] / n * 1000.0) if n else 0.0}
+        return out
@@ -0,0 +1,245 @@
+"""
+outbound.py
+
+Rate-limit-aware send scheduler for bots that fire several requests per tick.
+- One sender thread drains a priority queue: buys first, pings last
+- A token bucket per request class (buy, proposal, ticks_history, ...) keeps each class
+  under its limit; a class that is out of tokens never holds up the others
+- Limits start from LIMITS and follow the server's website_status api_call_limits once
+  apply_limits() is fed them
+- Requests still queued after their max_delay are dropped (a late buy is a different trade)
+- submit_basket() queues legs that only make sense together (a hedge, a multi-leg entry):
+  they take their tokens at once and go out back to back, or expire and are skipped together
+- Template pre-serializes a payload once and only formats the fields that change
+- Queueing delay per class goes into latency.Histogram; report() prints p50/p99
+"""
+
+import heapq
+import itertools
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from latency import Histogram
+
+# class -> (tokens per second, burst)
+LIMITS: Dict[str, Tuple[float, float]] = {
+    "buy": (2.0, 8.0),
+    "proposal": (5.0, 10.0),
+    "ticks_history": (1.0, 2.0),
+    "general": (5.0, 10.0),
+}
+PRIORITY = {"buy": 0, "sell": 0, "proposal": 1, "proposal_open_contract": 2, "forget": 3,
+            "ticks_history": 4, "ticks": 4, "ping": 9}
+_OUTCOME = ("buy", "sell")
+_PRICING = ("proposal",)
+
+
+def request_class(payload: dict) -> str:
+    for key in PRIORITY:
+        if key in payload:
+            return key
+    return "general"
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+    def _fill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def take(self, now: float, n: int = 1) -> float:
+        """0 and n tokens spent, or the seconds until they are available.
+
+        n above the burst waits for a full bucket and borrows the rest, so the bucket goes
+        negative and later requests pay it back; the long-run rate still holds.
+        """
+        self._fill(now)
+        need = min(float(n), self.burst)
+        if self.tokens >= need:
+            self.tokens -= n
+            return 0.0
+        return (need - self.tokens) / self.rate if self.rate > 0 else 1.0
+
+
+class Template:
+    """A payload serialized once; render() fills the named fields in the cached text."""
+
+    def __init__(self, payload: dict, *fields: str):
+        marked = dict(payload)
+        for i, name in enumerate(fields):
+            marked[name] = f"\x00{i}\x00"
+        text = json.dumps(marked, separators=(",", ":"))
+        self.fields = fields
+        self._parts: List[str] = []
+        self._order: List[int] = []
+        pos = 0
+        markers = [json.dumps(f"\x00{i}\x00") for i in range(len(fields))]
+        for at, i in sorted((text.index(m), i) for i, m in enumerate(markers)):
+            self._parts.append(text[pos:at])
+            self._order.append(i)
+            pos = at + len(markers[i])
+        self._parts.append(text[pos:])
+
+    def render(self, *values) -> str:
+        out = [self._parts[0]]
+        for i, part in zip(self._order, self._parts[1:]):
+            out.append(json.dumps(values[i]))
+            out.append(part)
+        return "".join(out)
+
+
+class Outbound:
+    def __init__(self, send_raw: Callable[[str], None], limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_delay: float = 2.0, report_interval: float = 60.0):
+        self.send_raw = send_raw
+        self.max_delay = max_delay
+        self.report_interval = report_interval
+        self.buckets = {cls: TokenBucket(*lim) for cls, lim in (limits or LIMITS).items()}
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition(threading.Lock())
+        self.sent: Dict[str, int] = {}
+        self.dropped: Dict[str, int] = {}
+        self.skipped: Dict[str, int] = {}     # baskets dropped whole
+        self.failed = 0
+        self.delays: Dict[str, Histogram] = {}
+        self._next_report = time.monotonic() + report_interval
+        self._thread = threading.Thread(target=self._run, name="outbound", daemon=True)
+        self._thread.start()
+
+    def _bucket(self, cls: str) -> TokenBucket:
+        return self.buckets.get(cls) or self.buckets["general"]
+
+    def apply_limits(self, api_call_limits: dict) -> None:
+        """Size the buckets from website_status.api_call_limits (hourly/minutely maxima)."""
+        def fit(lim):
+            try:
+                minutely, hourly = float(lim["minutely"]), float(lim["hourly"])
+            except (KeyError, TypeError, ValueError):
+                return None
+            rate = min(minutely / 60.0, hourly / 3600.0)
+            return rate, max(1.0, minutely - rate * 60.0)
+        groups = (("max_requests_outcome", _OUTCOME), ("max_requests_pricing", _PRICING),
+                  ("max_requestes_general", ("general", "ticks_history")))
+        with self._cond:
+            for name, classes in groups:
+                fitted = fit(api_call_limits.get(name) or {})
+                if fitted is None:
+                    continue
+                for cls in classes:
+                    self.buckets[cls] = TokenBucket(*fitted)
+
+    def submit(self, payload: dict, cls: Optional[str] = None, priority: Optional[int] = None,
+               max_delay: Optional[float] = None) -> None:
+        cls = cls or request_class(payload)
+        self.submit_raw(json.dumps(payload), cls, priority, max_delay)
+
+    def submit_raw(self, raw: str, cls: str = "general", priority: Optional[int] = None,
+                   max_delay: Optional[float] = None) -> None:
+        """Queue pre-serialized text; never blocks the caller."""
+        self._push((raw,), cls, priority, max_delay)
+
+    def submit_basket(self, raws, cls: str = "buy", priority: Optional[int] = None,
+                      max_delay: Optional[float] = None) -> None:
+        """Queue requests that go out all together or not at all.
+
+        The basket waits until its class has a token for every leg, then the legs are sent
+        back to back; if max_delay passes first, every leg is dropped and the basket is
+        counted as skipped.
+        """
+        raws = tuple(raws)
+        if raws:
+            self._push(raws, cls, priority, max_delay)
+
+    def _push(self, raws: tuple, cls: str, priority: Optional[int], max_delay: Optional[float]) -> None:
+        prio = PRIORITY.get(cls, 5) if priority is None else priority
+        now = time.monotonic()
+        deadline = now + (self.max_delay if max_delay is None else max_delay)
+        with self._cond:
+            heapq.heappush(self._heap, (prio, next(self._seq), now, deadline, cls, raws))
+            self._cond.notify()
+
+    def _pick(self, now: float) -> Tuple[Optional[tuple], float]:
+        """Best queued item whose class has a token per leg; else (None, seconds to wait)."""
+        wait = 1.0
+        waiting = []
+        blocked = set()     # a class waiting on a basket serves nothing behind it
+        picked = None
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            cls, raws = item[4], item[5]
+            if item[3] < now:
+                self.dropped[cls] = self.dropped.get(cls, 0) + len(raws)
+                if len(raws) > 1:
+                    self.skipped[cls] = self.skipped.get(cls, 0) + 1
+                    print(f"[OUT] {cls} basket of {len(raws)} skipped: no tokens within {item[3] - item[2]:.2f}s")
+                continue
+            if cls in blocked:
+                waiting.append(item)
+                continue
+            need = self._bucket(cls).take(now, len(raws))
+            if need == 0.0:
+                picked = item
+                break
+            wait = min(wait, need, item[3] - now)   # wake at its deadline to skip it on time
+            blocked.add(cls)
+            waiting.append(item)
+        for item in waiting:
+            heapq.heappush(self._heap, item)
+        return picked, wait
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    item, wait = self._pick(time.monotonic())
+                    if item is not None:
+                        break
+                    self._cond.wait(wait if self._heap else None)
+                _, _, queued, _, cls, raws = item
+                h = self.delays.get(cls)
+                if h is None:
+                    h = self.delays[cls] = Histogram()
+                h.record(int((time.monotonic() - queued) * 1e6))
+            for raw in raws:
+                try:
+                    self.send_raw(raw)
+                    self.sent[cls] = self.sent.get(cls, 0) + 1
+                except Exception as e:
+                    self.failed += 1
+                    print("[OUT] send failed:", e)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def report(self) -> str:
+        with self._cond:
+            rows = []
+            for cls in sorted(set(self.delays) | set(self.dropped)):
+                h = self.delays.get(cls) or Histogram()
+                rows.append((cls, self.sent.get(cls, 0), self.dropped.get(cls, 0), self.skipped.get(cls, 0),
+                             h.percentile(50) / 1000.0, h.percentile(99) / 1000.0))
+            queued = len(self._heap)
+        lines = [f"[OUT] queued {queued} | send failures {self.failed}"]
+        for cls, sent, dropped, skipped, p50, p99 in rows:
+            basket = f" ({skipped} baskets)" if skipped else ""
+            lines.append(f"  {cls:<14} sent {sent:>7} | dropped {dropped:>5}{basket} | "
+                         f"queue delay p50 {p50:.1f}ms p99 {p99:.1f}ms")
+        return "\n".join(lines)
+
+    def maybe_report(self) -> bool:
+        now = time.monotonic()
+        if now < self._next_report:
+            return False
+        self._next_report = now + self.report_interval
+        print(self.report())
+        return True
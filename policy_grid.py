@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+policy_grid.py
+
+Compare the bots' stake/recovery policies over many recorded sessions, in parallel.
+- Policies come from staking.py (Bot3.py streak recovery, Bot2.py / Bot3.3.py martingale),
+  optionally with a grid of multiplier / max-stake overrides
+- Tick digits are written once to a flat uint8 file and memory-mapped read-only by every
+  worker, so the data is shared through the page cache instead of being pickled per task
+- Work is split into (policy, contract, session chunk) tasks on a ProcessPoolExecutor
+- Reports ruin probability and the PnL distribution per policy
+
+usage: python policy_grid.py ticks.csv --contract DIGITEVEN --contract DIGITOVER:4 --session 2000
+pip install numpy
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except Exception:
+    print("pip install numpy")
+    sys.exit(1)
+
+from backtest import load_ticks, win_probability, wins
+from lastdigit import FILE_DECIMALS
+from staking import BOT_POLICIES
+
+_digits: Optional["np.ndarray"] = None
+
+
+def write_digits(path: str, out_path: str, decimals: int = FILE_DECIMALS) -> int:
+    digits = np.fromiter((d for _, _, d in load_ticks(path, decimals)), dtype=np.uint8)
+    digits.tofile(out_path)
+    return len(digits)
+
+
+def _init_worker(digits_path: str) -> None:
+    global _digits
+    _digits = np.memmap(digits_path, dtype=np.uint8, mode="r")
+
+
+def simulate(task) -> List[Tuple[float, bool, float]]:
+    """One (policy, contract) over a chunk of sessions -> [(pnl, ruined, max_drawdown)]."""
+    kind, params, contract, barrier, starts, length, every, balance0, margin = task
+    cls, defaults = BOT_POLICIES[kind]
+    cfg = dict(defaults, **params)
+    mult = (1.0 - margin) / win_probability(contract, barrier)
+    out = []
+    for start in starts:
+        digits = _digits[start:start + length].tolist()
+        policy = cls(**cfg)
+        balance = balance0
+        peak = balance0
+        max_dd = 0.0
+        ruined = False
+        for i in range(0, len(digits) - 1, every):
+            stake = policy.next_stake(balance)
+            if stake > balance or balance <= 0:
+                ruined = True
+                break
+            profit = stake * mult - stake if wins(contract, barrier, digits[i + 1]) else -stake
+            balance += profit
+            policy.on_result(profit)
+            if balance > peak: peak = balance
+            elif peak - balance > max_dd: max_dd = peak - balance
+        out.append((balance - balance0, ruined, max_dd))
+    return out
+
+
+def parse_contract(spec: str) -> Tuple[str, Optional[str]]:
+    ctype, _, barrier = spec.partition(":")
+    return ctype.upper(), (barrier or None)
+
+
+def policy_grid(kinds, multipliers, max_stakes) -> List[Tuple[str, Dict]]:
+    out = []
+    for kind in kinds:
+        for m, cap in itertools.product(multipliers or [None], max_stakes or [None]):
+            params = {}
+            if m is not None: params["multiplier"] = m
+            if cap is not None: params["max_stake"] = cap
+            out.append((kind, params))
+    return out
+
+
+def run_grid(digits_path: str, n_ticks: int, policies, contracts, session: int, every: int,
+             balance: float, margin: float, workers: int, chunk: int) -> Dict:
+    starts = list(range(0, n_ticks - session + 1, session))
+    if not starts:
+        raise ValueError(f"need at least {session} ticks, have {n_ticks}")
+    tasks, keys = [], []
+    for (kind, params), (ctype, barrier) in itertools.product(policies, contracts):
+        for i in range(0, len(starts), chunk):
+            tasks.append((kind, params, ctype, barrier, starts[i:i + chunk], session, every, balance, margin))
+            keys.append((kind, tuple(sorted(params.items())), ctype, barrier))
+    results: Dict = {}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(digits_path,)) as pool:
+        for key, res in zip(keys, pool.map(simulate, tasks)):
+            results.setdefault(key, []).extend(res)
+    return results
+
+
+def summarize(results: Dict) -> List[Dict]:
+    rows = []
+    for (kind, params, ctype, barrier), res in results.items():
+        pnl = np.array([r[0] for r in res])
+        dd = np.array([r[2] for r in res])
+        p5, p25, p50, p75, p95 = np.percentile(pnl, [5, 25, 50, 75, 95])
+        rows.append({"policy": kind + "".join(f" {k}={v}" for k, v in params),
+                     "contract": ctype + (f":{barrier}" if barrier else ""), "sessions": len(res),
+                     "ruin": sum(r[1] for r in res) / len(res), "mean": float(pnl.mean()),
+                     "p5": p5, "p25": p25, "p50": p50, "p75": p75, "p95": p95,
+                     "max_dd_mean": float(dd.mean())})
+    rows.sort(key=lambda r: (r["contract"], r["ruin"], -r["mean"]))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parallel comparison of stake/recovery policies.")
+    ap.add_argument("ticks", help="tick file (.csv epoch,quote, .bin packed <qd or .ticks archive)")
+    ap.add_argument("--policy", choices=sorted(BOT_POLICIES), action="append", help="default: all")
+    ap.add_argument("--multiplier", type=float, nargs="+", help="override grid for the recovery multiplier")
+    ap.add_argument("--max-stake", type=float, nargs="+", help="override grid for the stake cap")
+    ap.add_argument("--contract", action="append", help="TYPE[:BARRIER], e.g. DIGITOVER:4 (default DIGITEVEN)")
+    ap.add_argument("--session", type=int, default=2000, help="ticks per session")
+    ap.add_argument("--every", type=int, default=1, help="trade every N ticks")
+    ap.add_argument("--balance", type=float, default=100.0, help="starting balance per session")
+    ap.add_argument("--margin", type=float, default=0.05)
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--chunk", type=int, default=64, help="sessions per task")
+    ap.add_argument("--decimals", type=int, default=FILE_DECIMALS,
+                    help="quote decimals (pip size) of .csv/.bin input (default: R_10's 3); .ticks files carry their own")
+    args = ap.parse_args()
+
+    policies = policy_grid(args.policy or sorted(BOT_POLICIES), args.multiplier, args.max_stake)
+    contracts = [parse_contract(c) for c in (args.contract or ["DIGITEVEN"])]
+    fd, digits_path = tempfile.mkstemp(suffix=".u8")
+    os.close(fd)
+    try:
+        n = write_digits(args.ticks, digits_path, args.decimals)
+        t0 = time.perf_counter()
+        results = run_grid(digits_path, n, policies, contracts, args.session, args.every,
+                           args.balance, args.margin, args.workers, args.chunk)
+        took = time.perf_counter() - t0
+    finally:
+        os.unlink(digits_path)
+    rows = summarize(results)
+    print(f"[GRID] {len(rows)} policy/contract pairs x {rows[0]['sessions']} sessions "
+          f"on {args.workers} workers in {took:.2f}s")
+    for r in rows:
+        print(f"{r['contract']:<12} {r['policy']:<36} ruin={r['ruin']*100:6.2f}% mean={r['mean']:+9.2f} "
+              f"p5={r['p5']:+9.2f} p50={r['p50']:+9.2f} p95={r['p95']:+9.2f} dd={r['max_dd_mean']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+proposal_book.py
+
+Live payout table fed by persistent proposal subscriptions.
+- Subscribes ("subscribe": 1) once per (contract_type, barrier, duration, stake)
+- Every streamed update overwrites its row in place; lookups are a single dict read
+- A proposal id is handed out once (take), the next update makes the row buyable again
+- Number of streams is capped; the least recently used one is forgotten first
+- resubscribe() reopens every stream on a new connection
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+Key = Tuple[str, str, int, float]
+
+
+def book_key(contract_type: str, barrier, duration: int, stake: float) -> Key:
+    return (contract_type, str(barrier), int(duration), round(float(stake), 2))
+
+
+class _Row:
+    __slots__ = ("proposal", "sub_id", "ts", "used")
+
+    def __init__(self):
+        self.proposal: Optional[dict] = None
+        self.sub_id: Optional[str] = None
+        self.ts = 0.0
+        self.used = False
+
+
+class ProposalBook:
+    def __init__(self, send: Callable[[dict], None], symbol: str, currency: str = "USD",
+                 max_streams: int = 32, max_age: float = 2.0):
+        self.send = send
+        self.symbol = symbol
+        self.currency = currency
+        self.max_streams = max_streams
+        self.max_age = max_age
+        self._rows: "OrderedDict[Key, _Row]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def _payload(self, key: Key) -> dict:
+        contract_type, barrier, duration, stake = key
+        return {"proposal": 1, "subscribe": 1, "amount": stake, "basis": "stake",
+                "contract_type": contract_type, "currency": self.currency,
+                "duration": duration, "duration_unit": "t", "symbol": self.symbol,
+                "barrier": barrier}
+
+    def ensure(self, key: Key) -> None:
+        """Open the stream for key if it isn't open yet."""
+        forget = None
+        with self._lock:
+            if key in self._rows:
+                self._rows.move_to_end(key)
+                return
+            self._rows[key] = _Row()
+            if len(self._rows) > self.max_streams:
+                _, old = self._rows.popitem(last=False)
+                forget = old.sub_id
+        if forget:
+            self.send({"forget": forget})
+        self.send(self._payload(key))
+
+    def on_frame(self, data: dict) -> bool:
+        """Feed a proposal frame from on_message; True if it belonged to a stream."""
+        sub = data.get("subscription")
+        echo = data.get("echo_req") or {}
+        if not sub or not echo.get("subscribe"):
+            return False
+        try:
+            key = book_key(echo["contract_type"], echo.get("barrier", ""), echo["duration"], echo["amount"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        stale = None
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                stale = sub.get("id")
+            else:
+                row.proposal = data.get("proposal")
+                row.sub_id = sub.get("id")
+                row.ts = time.monotonic()
+                row.used = False
+                self.updates += 1
+        if stale:
+            self.send({"forget": stale})
+        return True
+
+    def on_error(self, data: dict) -> bool:
+        """Drop the row of a stream the server refused so ensure() can retry it."""
+        echo = data.get("echo_req") or {}
+        if not echo.get("proposal") or not echo.get("subscribe"):
+            return False
+        try:
+            key = book_key(echo["contract_type"], echo.get("barrier", ""), echo["duration"], echo["amount"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        with self._lock:
+            self._rows.pop(key, None)
+        return True
+
+    def get(self, key: Key, max_age: Optional[float] = None) -> Optional[dict]:
+        row = self._rows.get(key)
+        age = self.max_age if max_age is None else max_age
+        if row is None or row.proposal is None or row.used or time.monotonic() - row.ts > age:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row.proposal
+
+    def take(self, key: Key, max_age: Optional[float] = None) -> Optional[dict]:
+        """Like get(), but marks the id as spent until the stream sends a new one."""
+        with self._lock:
+            prop = self.get(key, max_age)
+            if prop is not None:
+                self._rows[key].used = True
+            return prop
+
+    def resubscribe(self) -> int:
+        """Drop the quotes of a dead connection and open every stream again."""
+        with self._lock:
+            keys = list(self._rows)
+            for row in self._rows.values():
+                row.proposal = None
+                row.sub_id = None
+        for key in keys:
+            self.send(self._payload(key))
+        return len(keys)
+
+    def forget_all(self) -> None:
+        with self._lock:
+            subs = [r.sub_id for r in self._rows.values() if r.sub_id]
+            self._rows.clear()
+        for sub_id in subs:
+            self.send({"forget": sub_id})
+
+    def summary(self) -> dict:
+        return {"streams": len(self._rows), "updates": self.updates,
+                "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,100 @@
+"""
+registry.py
+
+Bounded map for state keyed by request or contract id, so long sessions keep flat memory.
+- Entries expire ttl seconds after they were put; the size cap drops the oldest first
+- Insertion order is age order, so expiry only ever looks at the front: put() and
+  sweep() cost O(1) per evicted entry, lookups are a plain dict read
+- on_evict(key, value) runs for every entry dropped by age or size (not for pop), so the
+  owner can release a waiter or log a contract that never settled
+- Not locked; owners that share it between threads hold their own lock around it
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+
+class Registry:
+    def __init__(self, ttl: Optional[float] = None, maxsize: Optional[int] = None,
+                 on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._items: "OrderedDict[Hashable, tuple]" = OrderedDict()   # key -> (put at, value)
+        self.added = 0
+        self.removed = 0
+        self.expired = 0
+        self.evicted = 0
+        self.peak = 0
+
+    def put(self, key: Hashable, value: Any, now: Optional[float] = None) -> None:
+        """Insert or refresh key; a refreshed key starts a new ttl at the back of the queue."""
+        now = time.monotonic() if now is None else now
+        if self._items.pop(key, None) is None:
+            self.added += 1
+        self._items[key] = (now, value)
+        self._trim(now)
+
+    __setitem__ = put
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._items.get(key)
+        return default if entry is None else entry[1]
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._items[key][1]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return default
+        self.removed += 1
+        return entry[1]
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Evict what has expired; put() does this too, call it when nothing is being added."""
+        return self._trim(time.monotonic() if now is None else now)
+
+    def _trim(self, now: float) -> int:
+        dropped = []
+        items = self._items
+        if self.ttl is not None:
+            while items:
+                key, (stamp, value) = next(iter(items.items()))
+                if now - stamp <= self.ttl:
+                    break
+                items.popitem(last=False)
+                self.expired += 1
+                dropped.append((key, value))
+        if self.maxsize is not None:
+            while len(items) > self.maxsize:
+                key, (_, value) = items.popitem(last=False)
+                self.evicted += 1
+                dropped.append((key, value))
+        if len(items) > self.peak:
+            self.peak = len(items)
+        if self.on_evict is not None:
+            for key, value in dropped:
+                self.on_evict(key, value)
+        return len(dropped)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._items))
+
+    def values(self) -> list:
+        return [value for _, value in self._items.values()]
+
+    def clear(self) -> None:
+        self.removed += len(self._items)
+        self._items.clear()
+
+    def summary(self) -> dict:
+        return {"size": len(self._items), "peak": self.peak, "added": self.added, "removed": self.removed,
+                "expired": self.expired, "evicted": self.evicted}
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+runner.py
+
+Run many strategies over many symbols on one connection (or a small pool of them).
+- One tick stream per symbol; each tick goes to the strategies registered for
+  that symbol through a single dict lookup
+- Orders are bought with inline parameters; orders with a payout floor are priced first
+- Settlement results are fed back to the strategy that placed the order
+- Periodic per-strategy throughput report (ticks/s, CPU per tick, orders, PnL)
+- pip install websockets
+"""
+
+import asyncio
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from aio_client import ApiError, DerivAsyncClient, run_bots, websockets
+from lastdigit import DigitDecoder
+from strategies import FixedBasket, OddEven, Order, TickStrategy, ZScoreOverUnder
+
+# CONFIG
+APP_ID = "PUT ID HERE"
+API_TOKEN = "PUT TOKEN HERE"
+WS_URL = f"wss://ws.derivws.com/websockets/v3?app_id={APP_ID}"
+SYMBOLS = ["R_10", "R_25", "R_50", "R_75", "R_100"]
+POOL_SIZE = 1               # connections; symbols are spread round-robin
+REPORT_INTERVAL = 30.0
+CURRENCY = "USD"
+
+
+class StrategyStats:
+    __slots__ = ("ticks", "busy", "orders", "skipped", "errors", "wins", "losses", "pnl", "_last_ticks")
+
+    def __init__(self):
+        self.ticks = 0
+        self.busy = 0.0
+        self.orders = 0
+        self.skipped = 0
+        self.errors = 0
+        self.wins = 0
+        self.losses = 0
+        self.pnl = 0.0
+        self._last_ticks = 0
+
+
+class MultiRunner:
+    def __init__(self, url: str = WS_URL, token: Optional[str] = API_TOKEN, pool_size: int = POOL_SIZE,
+                 report_interval: float = REPORT_INTERVAL, currency: str = CURRENCY):
+        self.url = url
+        self.token = token
+        self.pool_size = max(1, pool_size)
+        self.report_interval = report_interval
+        self.currency = currency
+        self.routes: Dict[str, List[Tuple[TickStrategy, StrategyStats]]] = defaultdict(list)
+        self.stats: Dict[str, StrategyStats] = {}
+        self._inflight = set()
+
+    def register(self, symbol: str, strategy: TickStrategy, label: Optional[str] = None) -> StrategyStats:
+        label = label or f"{strategy.name}@{symbol}"
+        st = StrategyStats()
+        self.stats[label] = st
+        self.routes[symbol].append((strategy, st))
+        return st
+
+    async def run(self) -> None:
+        clients = [DerivAsyncClient(self.url, self.token) for _ in range(self.pool_size)]
+        for c in clients:
+            await c.connect()
+        try:
+            pumps = [self._pump(clients[i % len(clients)], sym) for i, sym in enumerate(self.routes)]
+            await run_bots(*pumps, self._report())
+        finally:
+            for c in clients:
+                await c.close()
+
+    async def _pump(self, client: DerivAsyncClient, symbol: str) -> None:
+        routes = self.routes[symbol]
+        decode = DigitDecoder(symbol)
+        async for tick in await client.ticks(symbol):
+            try:
+                quote = float(tick["quote"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            decode.observe(tick)
+            digit = decode(quote)
+            epoch = int(tick.get("epoch") or 0)
+            for strat, st in routes:
+                t0 = time.perf_counter()
+                orders = strat.on_tick(quote, digit, epoch)
+                st.busy += time.perf_counter() - t0
+                st.ticks += 1
+                for order in orders:
+                    st.orders += 1
+                    task = asyncio.create_task(self._execute(client, symbol, strat, st, order))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+
+    def _parameters(self, symbol: str, order: Order) -> dict:
+        params = {"amount": order.stake, "basis": "stake", "contract_type": order.contract_type,
+                  "currency": self.currency, "duration": order.duration, "duration_unit": "t",
+                  "symbol": symbol}
+        if order.barrier is not None:
+            params["barrier"] = order.barrier
+        return params
+
+    async def _execute(self, client: DerivAsyncClient, symbol: str, strat: TickStrategy,
+                       st: StrategyStats, order: Order) -> None:
+        params = self._parameters(symbol, order)
+        try:
+            if order.min_payout is not None:
+                prop = await client.request({"proposal": 1, **params})
+                if float(prop.get("payout", 0)) < order.min_payout:
+                    st.skipped += 1
+                    return
+                buy = await client.request({"buy": prop["id"], "price": order.stake})
+            else:
+                buy = await client.request({"buy": 1, "price": order.stake, "parameters": params})
+            sub = await client.subscribe({"proposal_open_contract": 1, "contract_id": buy["contract_id"]})
+            async for poc in sub:
+                if poc.get("is_sold"):
+                    profit = float(poc.get("profit") or 0.0)
+                    st.pnl += profit
+                    if profit > 0: st.wins += 1
+                    else: st.losses += 1
+                    strat.on_settle(order, profit)
+                    break
+            await sub.forget()
+        except (ApiError, asyncio.TimeoutError, ConnectionError, KeyError) as e:
+            st.errors += 1
+            print(f"[RUNNER] {strat.name}@{symbol} {order.contract_type} failed: {e}")
+
+    def report(self, elapsed: float) -> None:
+        print(f"=== runner report ({len(self.stats)} strategies, {len(self._inflight)} orders in flight) ===")
+        for label, st in self.stats.items():
+            rate = (st.ticks - st._last_ticks) / elapsed if elapsed > 0 else 0.0
+            st._last_ticks = st.ticks
+            us = st.busy / st.ticks * 1e6 if st.ticks else 0.0
+            print(f"{label:<18} ticks/s={rate:6.2f} us/tick={us:7.1f} orders={st.orders} skipped={st.skipped} "
+                  f"errors={st.errors} W/L={st.wins}/{st.losses} pnl={st.pnl:+.2f}")
+
+    async def _report(self) -> None:
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self.report_interval)
+            now = time.monotonic()
+            self.report(now - last)
+            last = now
+
+
+if __name__ == "__main__":
+    if websockets is None:
+        print("pip install websockets")
+        sys.exit(1)
+    runner = MultiRunner()
+    for sym in SYMBOLS:
+        runner.register(sym, ZScoreOverUnder())
+        runner.register(sym, OddEven())
+        runner.register(sym, FixedBasket())
+    try:
+        asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        runner.report(REPORT_INTERVAL)
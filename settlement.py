@@ -0,0 +1,200 @@
+"""
+settlement.py
+
+Contract settlement tracking for the threaded bots, without polling.
+- mode "all": one proposal_open_contract subscription without contract_id streams every
+  open contract of the account; mode "each": one subscription per bought contract,
+  forgotten as soon as it is sold
+- track(contract_id, callback) returns at once; the socket thread resolves the contract
+  and runs its callback the moment an is_sold update arrives
+- Contracts sold before track() was called (1-tick contracts on the shared stream) are
+  kept briefly (keep_unclaimed of them, for at most unclaimed_ttl seconds) and matched
+  when they are tracked
+- Any number of contracts in flight; expire() gives up on the ones that never settle
+- start() again after a reconnect reopens the stream and asks for every contract still
+  open, so one sold while the socket was down settles too
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from registry import Registry
+
+Callback = Callable[["Contract"], None]
+
+
+def sold_profit(poc: dict) -> Optional[float]:
+    """profit of a sold contract, else sell_price - buy_price, else None (never a made-up 0)."""
+    try:
+        return float(poc["profit"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return round(float(poc["sell_price"]) - float(poc["buy_price"]), 2)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class Contract:
+    __slots__ = ("contract_id", "meta", "callback", "event", "profit", "poc", "tracked_at", "done_at")
+
+    def __init__(self, contract_id: str, meta: Any = None, callback: Optional[Callback] = None):
+        self.contract_id = contract_id
+        self.meta = meta
+        self.callback = callback
+        self.event = threading.Event()
+        self.profit: Optional[float] = None
+        self.poc: Optional[dict] = None
+        self.tracked_at = time.monotonic()
+        self.done_at: Optional[float] = None
+
+    @property
+    def settled(self) -> bool:
+        return self.profit is not None
+
+    def wait(self, timeout: float) -> Optional[float]:
+        """Profit once sold, None on timeout or expiry."""
+        self.event.wait(timeout)
+        return self.profit
+
+
+class SettlementTracker:
+    def __init__(self, send: Callable[[dict], None], mode: str = "all", timeout: float = 90.0,
+                 keep_unclaimed: int = 256, unclaimed_ttl: float = 60.0):
+        if mode not in ("all", "each"):
+            raise ValueError(f"unknown settlement mode {mode!r}")
+        self.send = send
+        self.mode = mode
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._open: Dict[str, Contract] = {}
+        self._sold = Registry(unclaimed_ttl, keep_unclaimed)    # sold before track(): cid -> poc
+        self._subs: Dict[str, str] = {}                         # contract_id -> sub id ("each")
+        self.stream_id: Optional[str] = None
+        self.settled = 0
+        self.expired = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Open the shared stream (mode "all"); call after authorize and after reconnects."""
+        with self._lock:
+            self._subs.clear()          # subscriptions die with the socket
+            self.stream_id = None
+            open_ids = list(self._open)
+        if self.mode == "all":
+            self.send({"proposal_open_contract": 1, "subscribe": 1})
+        for cid in open_ids:
+            req = {"proposal_open_contract": 1, "contract_id": int(cid) if cid.isdigit() else cid}
+            if self.mode == "each":
+                req["subscribe"] = 1
+            self.send(req)
+
+    def track(self, contract_id, callback: Optional[Callback] = None, meta: Any = None) -> Contract:
+        cid = str(contract_id)
+        c = Contract(cid, meta, callback)
+        with self._lock:
+            poc = self._sold.pop(cid, None)
+            if poc is None:
+                self._open[cid] = c
+        if poc is not None:
+            self._settle(c, poc)
+        elif self.mode == "each":
+            self.send({"proposal_open_contract": 1, "contract_id": int(cid) if cid.isdigit() else cid,
+                       "subscribe": 1})
+        return c
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._open)
+
+    def on_frame(self, data: dict) -> bool:
+        """Feed proposal_open_contract frames; True when the frame was a contract update."""
+        poc = data.get("proposal_open_contract")
+        if not isinstance(poc, dict):
+            return False
+        sub_id = (data.get("subscription") or {}).get("id")
+        cid = poc.get("contract_id")
+        if cid is None:
+            # the empty first frame of the all-contracts stream carries only the subscription
+            if sub_id and self.mode == "all":
+                self.stream_id = sub_id
+            return True
+        cid = str(cid)
+        if self.mode == "each" and sub_id:
+            with self._lock:
+                self._subs.setdefault(cid, sub_id)
+        elif sub_id and self.stream_id is None:
+            self.stream_id = sub_id
+        if not poc.get("is_sold"):
+            return True
+        with self._lock:
+            c = self._open.pop(cid, None)
+            if c is None:
+                self._sold[cid] = poc
+            sub = self._subs.pop(cid, None)
+        if sub:
+            self.send({"forget": sub})
+        if c is not None:
+            self._settle(c, poc)
+        return True
+
+    def _settle(self, c: Contract, poc: dict) -> None:
+        c.profit = sold_profit(poc)
+        if c.profit is None:
+            print(f"[SETTLE] {c.contract_id} sold without a usable profit or prices; left unsettled")
+        c.poc = poc
+        c.done_at = time.monotonic()
+        lag = c.done_at - c.tracked_at
+        with self._lock:
+            self.settled += 1
+            self.total_lag += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+        c.event.set()
+        if c.callback is not None:
+            try:
+                c.callback(c)
+            except Exception as e:
+                print("[SETTLE] callback error:", e)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop contracts open longer than timeout; their callbacks run with profit None."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._sold.sweep(now)
+            stale = [c for c in self._open.values() if now - c.tracked_at > self.timeout]
+            for c in stale:
+                del self._open[c.contract_id]
+            subs = [self._subs.pop(c.contract_id) for c in stale if c.contract_id in self._subs]
+            self.expired += len(stale)
+        for sub in subs:
+            self.send({"forget": sub})
+        for c in stale:
+            c.done_at = now
+            c.event.set()
+            if c.callback is not None:
+                try:
+                    c.callback(c)
+                except Exception as e:
+                    print("[SETTLE] callback error:", e)
+        return len(stale)
+
+    def forget_all(self) -> None:
+        with self._lock:
+            subs = list(self._subs.values())
+            self._subs.clear()
+        if self.stream_id:
+            subs.append(self.stream_id)
+            self.stream_id = None
+        for sub in subs:
+            self.send({"forget": sub})
+
+    def summary(self) -> dict:
+        with self._lock:
+            n = self.settled
+            return {"in_flight": len(self._open), "settled": n, "expired": self.expired,
+                    "unclaimed": len(self._sold), "unclaimed_dropped": self._sold.expired + self._sold.evicted,
+                    "avg_lag_ms": (self.total_lag / n * 1000.0) if n else 0.0,
+                    "max_lag_ms": self.max_lag * 1000.0}
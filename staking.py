@@ -0,0 +1,86 @@
+"""
+staking.py
+
+Stake / loss-recovery policies used by the bots, as plain functions plus small stateful
+wrappers for simulations.
+- streak_recovery_stake: Bot3.py (multiplier ** loss streak, capped by MAX_STAKE and % of balance)
+- martingale_stake: Bot2.py weighted_stake and Bot3.3.py (x multiplier after a loss, reset on a win)
+"""
+
+import random
+from abc import ABC, abstractmethod
+
+
+def streak_recovery_stake(base: float, loss_streak: int, balance: float, multiplier: float = 1.2,
+                          max_stake: float = 50.0, max_pct_bal: float = 0.02, min_stake: float = 0.5,
+                          jitter: float = 0.0, rng=random) -> float:
+    stake = base
+    if loss_streak > 0:
+        stake = min(base * multiplier ** loss_streak, max_stake)
+    stake = min(stake, balance * max_pct_bal)
+    stake = max(stake, min_stake)
+    if jitter:
+        stake += rng.uniform(-jitter, jitter)
+    return round(stake, 2)
+
+
+def martingale_stake(last_win: bool, last_stake: float, base: float, multiplier: float = 1.5,
+                     max_stake: float = 50.0) -> float:
+    if last_win:
+        return base
+    return min(last_stake * multiplier, max_stake)
+
+
+class StakePolicy(ABC):
+    name = "base"
+
+    @abstractmethod
+    def next_stake(self, balance: float) -> float:
+        """Stake for the next trade at this balance."""
+
+    def on_result(self, profit: float) -> None:
+        pass
+
+
+class StreakRecovery(StakePolicy):
+    name = "streak"
+
+    def __init__(self, base: float = 10.0, multiplier: float = 1.2, max_stake: float = 50.0,
+                 max_pct_bal: float = 0.02, min_stake: float = 0.5):
+        self.base = base
+        self.multiplier = multiplier
+        self.max_stake = max_stake
+        self.max_pct_bal = max_pct_bal
+        self.min_stake = min_stake
+        self.loss_streak = 0
+
+    def next_stake(self, balance):
+        return streak_recovery_stake(self.base, self.loss_streak, balance, self.multiplier,
+                                     self.max_stake, self.max_pct_bal, self.min_stake)
+
+    def on_result(self, profit):
+        self.loss_streak = 0 if profit > 0 else self.loss_streak + 1
+
+
+class Martingale(StakePolicy):
+    name = "martingale"
+
+    def __init__(self, base: float = 1.0, multiplier: float = 1.5, max_stake: float = 50.0):
+        self.base = base
+        self.multiplier = multiplier
+        self.max_stake = max_stake
+        self.stake = base
+
+    def next_stake(self, balance):
+        return self.stake
+
+    def on_result(self, profit):
+        self.stake = martingale_stake(profit > 0, self.stake, self.base, self.multiplier, self.max_stake)
+
+
+# the policies as configured in each bot
+BOT_POLICIES = {
+    "bot3": (StreakRecovery, {"base": 10.0, "multiplier": 1.2, "max_stake": 50.0, "max_pct_bal": 0.02, "min_stake": 0.5}),
+    "bot2": (Martingale, {"base": 1.0, "multiplier": 1.5, "max_stake": 50.0}),
+    "bot33": (Martingale, {"base": 1.0, "multiplier": 1.5, "max_stake": 10.0}),
+}
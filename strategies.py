@@ -0,0 +1,267 @@
+"""
+strategies.py
+
+Transport-free decision logic shared by the bots, the multi-symbol runner and offline tools.
+- DigitWindow / Strategy: the z-score Over/Under scan from Bot.py
+- digit counts for every strategy come from digitstats.DigitStats (O(1) per tick)
+- overunder_scan (Bot3.py), inverse_frequency_digit (Bot2.py), odd_even_choice (Bot3.3.py)
+- TickStrategy subclasses turn ticks into Orders for the runner and the backtester:
+  ZScoreOverUnder (Bot.py), DynamicOverUnder (Bot3.py), InverseFrequencyMatch (Bot2.py),
+  OddEven (Bot3.3.py), FixedBasket (Bot.A.py)
+- Cooldowns run on tick epochs, so replaying recorded ticks behaves like live
+"""
+
+import random
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from digitstats import DigitSnapshot, DigitStats
+from staking import martingale_stake, streak_recovery_stake
+
+
+def z_score(p_hat: float, p0: float, n: int) -> float:
+    if n <= 0: return 0.0
+    var = p0 * (1 - p0) / n
+    if var <= 0: return 0.0
+    return (p_hat - p0) / (var ** 0.5)
+
+class DigitWindow(DigitStats):
+    def __init__(self, size:int):
+        super().__init__((size,))
+        self.size = size
+    add = DigitStats.push
+    def freq(self): return self.counts(self.size), self.n(self.size)
+
+@dataclass
+class Candidate:
+    side: str
+    threshold:int
+    p_hat:float
+    p0:float
+    z:float
+    edge:float
+    fair_b:float
+    fair_ev:float
+
+class Strategy:
+    def __init__(self, window: DigitWindow, warmup: int = 10, z_threshold: float = 1.64, min_edge: float = 0.01):
+        self.window = window
+        self.warmup = warmup
+        self.z_threshold = z_threshold
+        self.min_edge = min_edge
+    def find_best(self) -> Optional[Candidate]:
+        best=None
+        for cand in self.candidates():
+            if best is None or cand.fair_ev > best.fair_ev: best=cand
+        return best
+    def candidates(self) -> List[Candidate]:
+        counts, n = self.window.freq()
+        if n < self.warmup: return []
+        freq = [c / n for c in counts]
+        pref=[0.0]*11; s=0.0
+        for i in range(10):
+            s+=freq[i]; pref[i+1]=s
+        out=[]
+        for t in range(0,9):
+            p_over_hat = pref[10] - pref[t+1]
+            p_over0 = (9-t)/10.0
+            z_over = z_score(p_over_hat,p_over0,n)
+            edge_over = p_over_hat - p_over0
+            fair_b_over = (1.0/p_over_hat - 1.0) if p_over_hat>0 else 0.0
+            fair_ev_over = (p_over_hat*fair_b_over) - (1-p_over_hat)
+
+            p_under_hat = pref[t]
+            p_under0 = t/10.0
+            z_under = z_score(p_under_hat,p_under0,n)
+            edge_under = p_under_hat - p_under0
+            fair_b_under = (1.0/p_under_hat - 1.0) if p_under_hat>0 else 0.0
+            fair_ev_under = (p_under_hat*fair_b_under) - (1-p_under_hat)
+
+            for side,p_hat,p0,z,edge,fair_b,fair_ev in [
+                ("over",p_over_hat,p_over0,z_over,edge_over,fair_b_over,fair_ev_over),
+                ("under",p_under_hat,p_under0,z_under,edge_under,fair_b_under,fair_ev_under),
+            ]:
+                if edge < self.min_edge: continue
+                if z < self.z_threshold: continue
+                if fair_ev <= 0: continue
+                out.append(Candidate(side,t,p_hat,p0,z,edge,fair_b,fair_ev))
+        return out
+
+
+def overunder_scan(snap: DigitSnapshot, thresholds) -> List[Tuple[str, int, float]]:
+    """Bot3.py scan: (side, threshold, p_win) for every threshold; DIGITOVER t wins on d>t, DIGITUNDER t on d<t."""
+    out = []
+    for t in thresholds:
+        out.append(("over", t, snap.p_over(t)))
+        out.append(("under", t, snap.p_under(t)))
+    return out
+
+
+def inverse_frequency_digit(counts, n: int, rng=random) -> int:
+    """Bot2.py rule: pick a DIGITMATCH digit in 1..8, weighted towards the rarest ones."""
+    if n < 5:
+        # not enough data, pick random
+        return rng.randint(1, 8)
+    max_freq = max(counts[d] for d in range(1, 9))
+    digits = list(range(1, 9))
+    weights = [max_freq - counts[d] + 1 for d in digits]  # inverse frequency weight
+    return rng.choices(digits, weights)[0]
+
+
+def odd_even_choice(odd_count: int, total: int, flip_prob: float = 0.05, rng=random) -> str:
+    """Bot3.3.py rule: back the more frequent parity, with an occasional anti-trap flip."""
+    odd_prob = odd_count / total if total else 0.5
+    choice = "DIGITODD" if odd_prob > 1 - odd_prob else "DIGITEVEN"
+    if rng.random() < flip_prob:
+        choice = "DIGITODD" if choice == "DIGITEVEN" else "DIGITEVEN"
+    return choice
+
+
+@dataclass
+class Order:
+    contract_type: str
+    barrier: Optional[str]
+    stake: float
+    duration: int = 1
+    min_payout: Optional[float] = None  # set when the order must be priced before buying
+
+
+class TickStrategy:
+    name = "base"
+
+    def on_tick(self, quote: float, digit: int, epoch: int) -> List[Order]:
+        return []
+
+    def on_settle(self, order: Order, profit: float) -> None:
+        pass
+
+
+class ZScoreOverUnder(TickStrategy):
+    name = "zscore"
+
+    def __init__(self, window: int = 50, warmup: int = 10, z_threshold: float = 1.64, min_edge: float = 0.01,
+                 min_payout_ratio: float = 0.9, stake: float = 1.0, durations=(1, 2), cooldown: float = 0.25, rng=random):
+        self.dwin = DigitWindow(window)
+        self.strategy = Strategy(self.dwin, warmup, z_threshold, min_edge)
+        self.min_payout_ratio = min_payout_ratio
+        self.stake = stake
+        self.durations = durations
+        self.cooldown = cooldown
+        self.rng = rng
+        self.last_order_ts = 0.0
+
+    def on_tick(self, quote, digit, epoch):
+        self.dwin.add(digit)
+        if epoch - self.last_order_ts < self.cooldown: return []
+        cand = self.strategy.find_best()
+        if cand is None: return []
+        self.last_order_ts = epoch
+        # platform EV > 0 and payout ratio both reduce to a payout floor
+        floor = self.stake / max(1e-12, cand.p_hat) * max(1.0, self.min_payout_ratio)
+        ctype = "DIGITOVER" if cand.side == "over" else "DIGITUNDER"
+        return [Order(ctype, str(cand.threshold), self.stake, self.rng.choice(self.durations), floor)]
+
+
+class DynamicOverUnder(TickStrategy):
+    name = "overunder"
+
+    def __init__(self, window: int = 1000, min_ticks: int = 10, thresholds=range(1, 9), base_stake: float = 10.0,
+                 recovery_multiplier: float = 1.2, max_stake: float = 50.0, cooldown: float = 0.05):
+        self.window = window
+        self.stats = DigitStats((window,))
+        self.min_ticks = min_ticks
+        self.thresholds = list(thresholds)
+        self.base_stake = base_stake
+        self.recovery_multiplier = recovery_multiplier
+        self.max_stake = max_stake
+        self.cooldown = cooldown
+        self.loss_streak = 0
+        self.last_order_ts = 0.0
+
+    def on_tick(self, quote, digit, epoch):
+        self.stats.push(digit)
+        if self.stats.n(self.window) < self.min_ticks or epoch - self.last_order_ts < self.cooldown: return []
+        snap = self.stats.snapshot(self.window)
+        side, t, p = max(overunder_scan(snap, self.thresholds), key=lambda c: c[2])
+        if p <= 0: return []
+        self.last_order_ts = epoch
+        # balance cap left out: the strategy doesn't see the account
+        stake = streak_recovery_stake(self.base_stake, self.loss_streak, float("inf"),
+                                      self.recovery_multiplier, self.max_stake)
+        # Bot3.py buys when p*net_b-(1-p) > 0, i.e. payout > stake/p
+        return [Order("DIGITOVER" if side == "over" else "DIGITUNDER", str(t), stake, 1, stake / p)]
+
+    def on_settle(self, order, profit):
+        self.loss_streak = 0 if profit > 0 else self.loss_streak + 1
+
+
+class InverseFrequencyMatch(TickStrategy):
+    name = "match"
+
+    def __init__(self, window: int = 50, base_stake: float = 1.0, multiplier: float = 1.5,
+                 max_stake: float = 50.0, rng=random):
+        self.window = window
+        self.stats = DigitStats((window,))
+        self.base_stake = base_stake
+        self.multiplier = multiplier
+        self.max_stake = max_stake
+        self.stake = base_stake
+        self.rng = rng
+
+    def on_tick(self, quote, digit, epoch):
+        if 1 <= digit <= 8:
+            self.stats.push(digit)
+        d = inverse_frequency_digit(self.stats.counts(self.window), self.stats.n(self.window), self.rng)
+        return [Order("DIGITMATCH", str(d), self.stake)]
+
+    def on_settle(self, order, profit):
+        self.stake = martingale_stake(profit > 0, self.stake, self.base_stake, self.multiplier, self.max_stake)
+
+
+class OddEven(TickStrategy):
+    name = "oddeven"
+
+    def __init__(self, window: int = 1000, min_ticks: int = 100, interval: float = 3.0,
+                 base_stake: float = 1.0, multiplier: float = 1.5, max_stake: float = 10.0, rng=random):
+        self.rng = rng
+        self.window = window
+        self.stats = DigitStats((window,))
+        self.min_ticks = min_ticks
+        self.interval = interval
+        self.base_stake = base_stake
+        self.multiplier = multiplier
+        self.max_stake = max_stake
+        self.stake = base_stake
+        self.last_order_ts = 0.0
+
+    def on_tick(self, quote, digit, epoch):
+        self.stats.push(digit)
+        if self.stats.n(self.window) < self.min_ticks or epoch - self.last_order_ts < self.interval: return []
+        self.last_order_ts = epoch
+        snap = self.stats.snapshot(self.window)
+        return [Order(odd_even_choice(snap.odd, snap.n, rng=self.rng), None, self.stake)]
+
+    def on_settle(self, order, profit):
+        self.stake = martingale_stake(profit > 0, self.stake, self.base_stake, self.multiplier, self.max_stake)
+
+
+class FixedBasket(TickStrategy):
+    name = "basket"
+
+    DIGIT_CONTRACTS = [
+        {"type": "DIGITUNDER", "barrier": 3, "stake": 1.00},
+        {"type": "DIGITUNDER", "barrier": 6, "stake": 0.50},
+        {"type": "DIGITOVER",  "barrier": 5, "stake": 0.75},
+        {"type": "DIGITUNDER", "barrier": 7, "stake": 1.25},
+    ]
+
+    def __init__(self, contracts=None, cooldown: float = 1.0, duration: int = 1):
+        self.contracts = contracts or self.DIGIT_CONTRACTS
+        self.cooldown = cooldown
+        self.duration = duration
+        self.last_order_ts = 0.0
+
+    def on_tick(self, quote, digit, epoch):
+        if epoch - self.last_order_ts < self.cooldown: return []
+        self.last_order_ts = epoch
+        return [Order(c["type"], str(c["barrier"]), c["stake"], self.duration) for c in self.contracts]
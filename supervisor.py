@@ -0,0 +1,114 @@
+"""
+supervisor.py
+
+Keeps a websocket-client connection alive for the threaded bots.
+- Supervisor reopens the socket whenever run_forever returns, with exponential backoff
+  and jitter, until stop() is called
+- The delay starts over once a connection has stayed up for reset_after seconds
+- on_down(reason) runs before every reconnect so the bot can fail in-flight requests
+  and note where its tick stream stopped; re-authorizing and resubscribing stay in the
+  bot's own on_open / authorize handlers, which run again on the new socket
+- gap_request() / gap_ticks(): ticks_history backfill of the ticks missed while down
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class Backoff:
+    def __init__(self, initial: float = 1.0, maximum: float = 30.0, factor: float = 2.0, jitter: float = 0.25):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self._next = initial
+
+    def next(self) -> float:
+        delay = self._next
+        self._next = min(self.maximum, self._next * self.factor)
+        return delay * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+    def reset(self) -> None:
+        self._next = self.initial
+
+
+class Supervisor:
+    def __init__(self, make_app: Callable[[], Any], on_down: Optional[Callable[[str], None]] = None,
+                 backoff: Optional[Backoff] = None, reset_after: float = 30.0, **run_kw):
+        self.make_app = make_app
+        self.on_down = on_down
+        self.backoff = backoff or Backoff()
+        self.reset_after = reset_after
+        self.run_kw = run_kw
+        self.app = None
+        self.reconnects = 0
+        self.waited = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self) -> None:
+        """Blocks until stop(); each pass builds a fresh app with make_app()."""
+        while not self._stop.is_set():
+            self.app = self.make_app()
+            up = time.monotonic()
+            reason = "closed"
+            try:
+                self.app.run_forever(**self.run_kw)
+            except Exception as e:
+                reason = f"error: {e}"
+            if self._stop.is_set():
+                break
+            if time.monotonic() - up >= self.reset_after:
+                self.backoff.reset()
+            if self.on_down is not None:
+                try:
+                    self.on_down(reason)
+                except Exception as e:
+                    print("[RECONNECT] on_down failed:", e)
+            delay = self.backoff.next()
+            print(f"[RECONNECT] connection {reason}; retrying in {delay:.1f}s")
+            down = time.monotonic()
+            self._stop.wait(delay)
+            self.waited += time.monotonic() - down
+            self.reconnects += 1
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self.run, name="ws-supervisor", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        try:
+            if self.app is not None:
+                self.app.close()
+        except Exception:
+            pass
+
+    def summary(self) -> dict:
+        return {"reconnects": self.reconnects, "waited_s": self.waited}
+
+
+def gap_request(symbol: str, since_epoch: int, count: int = 5000) -> dict:
+    """ticks_history request for everything after since_epoch."""
+    return {"ticks_history": symbol, "start": int(since_epoch) + 1, "end": "latest",
+            "count": int(count), "style": "ticks"}
+
+
+def gap_ticks(history: dict, since_epoch: int, until_epoch: Optional[int] = None) -> List[Tuple[int, float]]:
+    """(epoch, quote) of a ticks_history body with since_epoch < epoch < until_epoch."""
+    out = []
+    for epoch, price in zip(history.get("times") or [], history.get("prices") or []):
+        try:
+            epoch, price = int(epoch), float(price)
+        except (TypeError, ValueError):
+            continue
+        if epoch > since_epoch and (until_epoch is None or epoch < until_epoch):
+            out.append((epoch, price))
+    return out
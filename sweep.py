@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+sweep.py
+
+Vectorized parameter sweep of the Bot.py z-score rule (WINDOW / WARMUP / Z_THRESHOLD /
+MIN_EDGE / MIN_PAYOUT_RATIO) over a whole tick history.
+- Rolling digit counts for every tick come from one cumulative-sum array per WINDOW
+- Strategy.find_best is evaluated for every tick and every combination in batched NumPy,
+  using the same float operations in the same order, so picks match the scalar code
+- Every tick where the rule fires is a flat-stake bet settled on tick i+DURATION with the
+  backtest.py payout model (no one-trade-at-a-time blocking, no cooldown)
+
+usage: python sweep.py ticks.csv --window 30 50 100 --z 1.28 1.64 2.0 --edge 0.0 0.01 0.02
+pip install numpy
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+import time
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except Exception:
+    print("pip install numpy")
+    sys.exit(1)
+
+from backtest import load_ticks
+from lastdigit import FILE_DECIMALS
+
+N_LEGS = 18  # t = 0..8 x (over, under), in Strategy.candidates() order
+
+
+def leg_tables(digits: "np.ndarray", window: int):
+    """Per tick and leg: p_hat, z, edge, fair_ev of Strategy.candidates(), plus n per tick."""
+    n_ticks = len(digits)
+    onehot = np.zeros((n_ticks + 1, 10), dtype=np.int32)
+    onehot[np.arange(1, n_ticks + 1), digits] = 1
+    cum = np.cumsum(onehot, axis=0)
+    hi = np.arange(1, n_ticks + 1)
+    lo = np.maximum(hi - window, 0)
+    counts = cum[hi] - cum[lo]
+    n = (hi - lo).astype(np.float64)
+    freq = counts / n[:, None]
+    cs = np.cumsum(freq, axis=1)                  # cs[:, k] == pref[k+1]
+    pref = np.zeros((n_ticks, 11))
+    pref[:, 1:] = cs
+
+    t = np.arange(9)
+    p_over = pref[:, 10:11] - pref[:, t + 1]
+    p_under = pref[:, t]
+    p_hat = np.empty((n_ticks, N_LEGS))
+    p_hat[:, 0::2] = p_over
+    p_hat[:, 1::2] = p_under
+    p0 = np.empty(N_LEGS)
+    p0[0::2] = (9 - t) / 10.0
+    p0[1::2] = t / 10.0
+
+    var = p0 * (1 - p0) / n[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(var > 0, (p_hat - p0) / np.power(var, 0.5), 0.0)
+        fair_b = np.where(p_hat > 0, 1.0 / p_hat - 1.0, 0.0)
+    fair_ev = (p_hat * fair_b) - (1 - p_hat)
+    return p_hat, z, p_hat - p0, fair_ev, n
+
+
+def leg_outcomes(digits: "np.ndarray", duration: int) -> "np.ndarray":
+    """won[i, leg] for a bet placed on tick i; the last `duration` ticks never settle (False)."""
+    won = np.zeros((len(digits), N_LEGS), dtype=bool)
+    exit_d = digits[duration:, None]
+    t = np.arange(9)
+    won[:len(digits) - duration, 0::2] = exit_d > t
+    won[:len(digits) - duration, 1::2] = exit_d < t
+    return won
+
+
+def max_drawdown(pnl_steps: "np.ndarray") -> float:
+    curve = np.cumsum(pnl_steps)
+    peak = np.maximum.accumulate(np.concatenate(([0.0], curve)))[1:]
+    return float((peak - curve).max()) if len(curve) else 0.0
+
+
+def sweep(digits: Sequence[int], windows, warmups, z_thresholds, min_edges, payout_ratios,
+          duration: int = 1, margin: float = 0.05, stake: float = 1.0) -> List[Dict]:
+    digits = np.asarray(digits, dtype=np.int64)
+    won = leg_outcomes(digits, duration)
+    settles = np.zeros(len(digits), dtype=bool)
+    settles[:len(digits) - duration] = True
+    t = np.arange(9)
+    p0 = np.empty(N_LEGS)
+    p0[0::2] = (9 - t) / 10.0
+    p0[1::2] = t / 10.0
+    with np.errstate(divide="ignore"):
+        payout = np.where(p0 > 0, stake * (1.0 - margin) / p0, 0.0)   # backtest.PayoutModel
+    rows = np.arange(len(digits))
+    results = []
+    for window in windows:
+        p_hat, z, edge, fair_ev, n = leg_tables(digits, window)
+        for z_thr, min_edge in itertools.product(z_thresholds, min_edges):
+            ok = (edge >= min_edge) & (z >= z_thr) & (fair_ev > 0)
+            best = np.argmax(np.where(ok, fair_ev, -np.inf), axis=1)
+            fired = ok[rows, best] & settles
+            bp = p_hat[rows, best]
+            bpay = payout[best]
+            plat_ev = bp * ((bpay - stake) / stake) - (1 - bp)
+            ratio = bpay * bp / stake                       # payout / (stake / p_hat)
+            profit = np.where(won[rows, best], bpay - stake, -stake)
+            for warmup, min_ratio in itertools.product(warmups, payout_ratios):
+                steps = profit[fired & (n >= warmup) & (ratio >= min_ratio) & (plat_ev > 0)]
+                trades = len(steps)
+                wins_ = int((steps > 0).sum())
+                results.append({"window": window, "warmup": warmup, "z_threshold": z_thr,
+                                "min_edge": min_edge, "min_payout_ratio": min_ratio,
+                                "trades": trades, "wins": wins_,
+                                "hit_rate": wins_ / trades if trades else 0.0,
+                                "pnl": float(steps.sum()), "max_drawdown": max_drawdown(steps)})
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Vectorized sweep of the Bot.py z-score parameters.")
+    ap.add_argument("ticks", help="tick file (.csv epoch,quote, .bin packed <qd or .ticks archive)")
+    ap.add_argument("--window", type=int, nargs="+", default=[25, 50, 100, 200])
+    ap.add_argument("--warmup", type=int, nargs="+", default=[10])
+    ap.add_argument("--z", type=float, nargs="+", default=[1.28, 1.64, 1.96, 2.33])
+    ap.add_argument("--edge", type=float, nargs="+", default=[0.0, 0.01, 0.02, 0.05])
+    ap.add_argument("--payout-ratio", type=float, nargs="+", default=[0.9])
+    ap.add_argument("--duration", type=int, default=1)
+    ap.add_argument("--margin", type=float, default=0.05)
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--decimals", type=int, default=FILE_DECIMALS,
+                    help="quote decimals (pip size) of .csv/.bin input (default: R_10's 3); .ticks files carry their own")
+    ap.add_argument("--out", help="write every combination to this CSV")
+    args = ap.parse_args()
+
+    digits = np.fromiter((d for _, _, d in load_ticks(args.ticks, args.decimals)), dtype=np.int64)
+    t0 = time.perf_counter()
+    res = sweep(digits, args.window, args.warmup, args.z, args.edge, args.payout_ratio,
+                args.duration, args.margin)
+    took = time.perf_counter() - t0
+    print(f"[SWEEP] {len(res)} combinations x {len(digits)} ticks in {took:.2f}s")
+    res.sort(key=lambda r: r["pnl"], reverse=True)
+    for r in res[:args.top]:
+        print(f"W={r['window']:<4} warm={r['warmup']:<3} z={r['z_threshold']:<5} edge={r['min_edge']:<5} "
+              f"ratio={r['min_payout_ratio']:<4} trades={r['trades']:<7} hit={r['hit_rate']*100:6.2f}% "
+              f"pnl={r['pnl']:+10.2f} max_dd={r['max_drawdown']:.2f}")
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(res[0]))
+            w.writeheader()
+            w.writerows(res)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+tickmailbox.py
+
+Hand-off of ticks from the socket thread to a decision loop.
+- mode "latest": a one-slot mailbox; a tick that arrives before the last one was taken
+  replaces it (counted as coalesced), so the loop only ever sees the newest state
+- mode "fifo": the old bounded queue; ticks that do not fit are dropped and counted
+- Every tick is stamped with its monotonic receipt time; expired(stamp, max_age) lets the
+  loop skip decisions built on a tick that has gone stale, and counts them
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Optional, Tuple
+
+
+class TickMailbox:
+    def __init__(self, mode: str = "latest", maxsize: int = 200):
+        if mode not in ("latest", "fifo"):
+            raise ValueError(f"unknown mailbox mode {mode!r}")
+        self.mode = mode
+        self._items: deque = deque(maxlen=1 if mode == "latest" else None)
+        self.maxsize = 1 if mode == "latest" else maxsize
+        self._cond = threading.Condition(threading.Lock())
+        self.posted = 0
+        self.taken = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.stale = 0
+
+    def put(self, item: Any, stamp: Optional[float] = None) -> None:
+        """Never blocks; called from the socket thread."""
+        stamp = time.monotonic() if stamp is None else stamp
+        with self._cond:
+            self.posted += 1
+            if len(self._items) >= self.maxsize:
+                if self.mode == "fifo":
+                    self.dropped += 1
+                    return
+                self.coalesced += 1
+            self._items.append((stamp, item))
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[float, Any]]:
+        """(receipt stamp, item) of the next tick, or None when nothing arrived in time."""
+        with self._cond:
+            if not self._items and not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            self.taken += 1
+            return self._items.popleft()
+
+    def expired(self, stamp: float, max_age: Optional[float]) -> bool:
+        """True (and counted) when the tick received at stamp is older than max_age seconds."""
+        if not max_age or time.monotonic() - stamp <= max_age:
+            return False
+        with self._cond:
+            self.stale += 1
+        return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def summary(self) -> dict:
+        with self._cond:
+            return {"mode": self.mode, "posted": self.posted, "taken": self.taken,
+                    "coalesced": self.coalesced, "dropped": self.dropped, "stale": self.stale,
+                    "queued": len(self._items)}
@@ -0,0 +1,185 @@
+"""
+tickstore.py
+
+Append-only binary tick archive, one file per symbol, read back through mmap.
+- 16-byte header: magic b"DTK1" + quote decimals
+- 16-byte records "<IqB3x": epoch, quote scaled to an int by 10**decimals, last digit
+- Random access, epoch bisection and digit slices straight from the mapped file,
+  so warm-up and replay need no network fetch
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from lastdigit import decimals_for
+
+MAGIC = b"DTK1"
+HEADER = struct.Struct("<4sB11x")
+RECORD = struct.Struct("<IqB3x")
+
+Tick = Tuple[int, float, int]  # epoch, quote, digit
+
+
+def _read_header(f) -> int:
+    raw = f.read(HEADER.size)
+    magic, decimals = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{getattr(f, 'name', 'file')}: not a tick store file")
+    return decimals
+
+
+class TickWriter:
+    def __init__(self, path: str, decimals: int, flush_every: int = 64):
+        self.path = path
+        self.flush_every = flush_every
+        self._buf = bytearray()
+        self._pending = 0
+        self.last_epoch = 0
+        exists = os.path.exists(path) and os.path.getsize(path) >= HEADER.size
+        if exists:
+            with open(path, "rb") as f:
+                decimals = _read_header(f)
+                size = os.path.getsize(path)
+                tail = (size - HEADER.size) // RECORD.size
+                if tail:
+                    f.seek(HEADER.size + (tail - 1) * RECORD.size)
+                    self.last_epoch = RECORD.unpack(f.read(RECORD.size))[0]
+        self.decimals = decimals
+        self._scale = 10 ** decimals
+        self._f = open(path, "ab")
+        if not exists:
+            self._f.write(HEADER.pack(MAGIC, decimals))
+            self._f.flush()
+
+    def append(self, epoch: int, quote: float, digit: Optional[int] = None) -> bool:
+        """Add one tick; ticks not newer than the last stored epoch are ignored."""
+        if epoch <= self.last_epoch:
+            return False
+        scaled = round(quote * self._scale)
+        self._buf += RECORD.pack(epoch, scaled, scaled % 10 if digit is None else digit)
+        self.last_epoch = epoch
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        if self._buf:
+            self._f.write(self._buf)
+            self._f.flush()
+            self._buf.clear()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._f.close()
+
+
+class TickReader:
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        self.decimals = _read_header(self._f)
+        self._scale = 10 ** self.decimals
+        self._mm: Optional[mmap.mmap] = None
+        self._n = 0
+        self.refresh()
+
+    def refresh(self) -> int:
+        """Remap after the writer has appended; returns the record count."""
+        size = os.fstat(self._f.fileno()).st_size
+        n = (size - HEADER.size) // RECORD.size
+        if n != self._n or self._mm is None:
+            if self._mm is not None:
+                self._mm.close()
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if n else None
+            self._n = n
+        return n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Tick:
+        if i < 0: i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        epoch, scaled, digit = RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+        return epoch, scaled / self._scale, digit
+
+    def epoch_at(self, i: int) -> int:
+        return struct.unpack_from("<I", self._mm, HEADER.size + i * RECORD.size)[0]
+
+    def find_epoch(self, epoch: int) -> int:
+        """Index of the first tick with epoch >= the given one."""
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.epoch_at(mid) < epoch: lo = mid + 1
+            else: hi = mid
+        return lo
+
+    def digits(self, start: int = 0, stop: Optional[int] = None) -> bytes:
+        stop = self._n if stop is None else min(stop, self._n)
+        if start >= stop:
+            return b""
+        base = HEADER.size + 12
+        return self._mm[base + start * RECORD.size: base + stop * RECORD.size: RECORD.size]
+
+    def iter_ticks(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tick]:
+        stop = self._n if stop is None else min(stop, self._n)
+        if start >= stop:
+            return
+        scale = self._scale
+        view = memoryview(self._mm)[HEADER.size + start * RECORD.size: HEADER.size + stop * RECORD.size]
+        try:
+            for epoch, scaled, digit in RECORD.iter_unpack(view):
+                yield epoch, scaled / scale, digit
+        finally:
+            view.release()
+
+    def tail(self, n: int) -> List[Tick]:
+        return list(self.iter_ticks(max(0, self._n - n)))
+
+    def as_array(self):
+        """numpy structured view (epoch, quote, digit) over the mapped records."""
+        import numpy as np
+        dtype = np.dtype({"names": ["epoch", "quote", "digit"], "formats": ["<u4", "<i8", "u1"],
+                          "offsets": [0, 4, 12], "itemsize": RECORD.size})
+        return np.frombuffer(self._mm, dtype=dtype, count=self._n, offset=HEADER.size)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._f.close()
+
+
+class TickStore:
+    def __init__(self, root: str = "ticks"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol}.ticks")
+
+    def writer(self, symbol: str, decimals: Optional[int] = None) -> TickWriter:
+        return TickWriter(self.path(symbol), decimals_for(symbol) if decimals is None else decimals)
+
+    def reader(self, symbol: str) -> Optional[TickReader]:
+        p = self.path(symbol)
+        if not os.path.exists(p) or os.path.getsize(p) < HEADER.size:
+            return None
+        return TickReader(p)
+
+    def warm(self, symbol: str, n: int, max_age: float, now: float) -> List[Tick]:
+        """Last n stored ticks, or [] if the newest one is older than max_age seconds."""
+        r = self.reader(symbol)
+        if r is None:
+            return []
+        try:
+            if not len(r) or now - r.epoch_at(len(r) - 1) > max_age:
+                return []
+            return r.tail(n)
+        finally:
+            r.close()